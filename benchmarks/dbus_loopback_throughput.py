@@ -0,0 +1,243 @@
+# vim: set fileencoding=utf-8
+"""
+benchmarks/dbus_loopback_throughput.py
+
+This script measures emitting and receiving d-bus events through the loopback bus.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import asyncio
+from dbus_next import BusType
+from pythoneda.shared import attribute, Event
+from pythoneda.shared.infrastructure.dbus import (
+    DbusLoopbackBus,
+    DbusLoopbackDaemon,
+    DbusSignalEmitter,
+    DbusSignalListener,
+    SchemaDbusEvent,
+    WireFormat,
+)
+import time
+
+
+class SampleHappened(Event):
+    """
+    The event used in the benchmark.
+    """
+
+    def __init__(self, name: str, count: int, payload: str):
+        """
+        Creates a new SampleHappened instance.
+        :param name: A name.
+        :type name: str
+        :param count: A number.
+        :type count: int
+        :param payload: Some text.
+        :type payload: str
+        """
+        super().__init__()
+        self._name = name
+        self._count = count
+        self._payload = payload
+
+    @property
+    @attribute
+    def name(self) -> str:
+        """
+        Retrieves the name.
+        :return: Such name.
+        :rtype: str
+        """
+        return self._name
+
+    @property
+    @attribute
+    def count(self) -> int:
+        """
+        Retrieves the number.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._count
+
+    @property
+    @attribute
+    def payload(self) -> str:
+        """
+        Retrieves the text.
+        :return: Such text.
+        :rtype: str
+        """
+        return self._payload
+
+
+class DbusSampleHappened(SchemaDbusEvent):
+    """
+    The d-bus adapter of SampleHappened.
+    """
+
+    def __init__(self):
+        """
+        Creates a new DbusSampleHappened instance.
+        """
+        super().__init__("/pythoneda/benchmarks/sample")
+
+    @classmethod
+    @property
+    def name(cls) -> str:
+        """
+        Retrieves the d-bus interface name.
+        :return: Such value.
+        :rtype: str
+        """
+        return "SampleHappened"
+
+    @classmethod
+    def event_class(cls):
+        """
+        Retrieves the specific event class.
+        :return: Such class.
+        :rtype: type(pythoneda.shared.Event)
+        """
+        return SampleHappened
+
+
+class BenchmarkEmitter(DbusSignalEmitter):
+    """
+    Emits the benchmark events.
+    """
+
+    @classmethod
+    def event_packages(cls):
+        """
+        Retrieves the packages of the supported events.
+        :return: None, since events are configured explicitly.
+        :rtype: List[str]
+        """
+        return None
+
+
+class BenchmarkListener(DbusSignalListener):
+    """
+    Counts the benchmark events, instead of passing them to an application.
+    """
+
+    def __init__(self, expected: int):
+        """
+        Creates a new BenchmarkListener instance.
+        :param expected: The number of events to wait for.
+        :type expected: int
+        """
+        super().__init__()
+        self._expected = expected
+        self._received = 0
+        self._done = asyncio.Event()
+
+    @classmethod
+    def event_packages(cls):
+        """
+        Retrieves the packages of the supported events.
+        :return: No packages, since events are configured explicitly.
+        :rtype: List[str]
+        """
+        return []
+
+    async def listen(self, event: Event):
+        """
+        Counts given event.
+        :param event: The event.
+        :type event: pythoneda.shared.Event
+        """
+        self._received += 1
+        if self._received >= self._expected:
+            self._done.set()
+
+    async def done(self):
+        """
+        Waits until all events have been received.
+        """
+        await self._done.wait()
+
+
+async def measure(events: int, payloadSize: int, wireFormat: WireFormat) -> float:
+    """
+    Emits and receives given number of events through the loopback bus.
+    :param events: The number of events.
+    :type events: int
+    :param payloadSize: The size of the text in each event.
+    :type payloadSize: int
+    :param wireFormat: The wire format.
+    :type wireFormat: pythoneda.shared.infrastructure.dbus.WireFormat
+    :return: The elapsed seconds.
+    :rtype: float
+    """
+    DbusLoopbackDaemon.reset()
+    configured = [{"event-class": DbusSampleHappened, "bus-type": BusType.SESSION}]
+    BenchmarkEmitter._connection_pool = None
+    BenchmarkListener._connection_pool = None
+    BenchmarkEmitter.enable(
+        events=configured, bus_factory=DbusLoopbackBus, wire_format=wireFormat
+    )
+    BenchmarkListener.enable(events=configured, bus_factory=DbusLoopbackBus)
+    emitter = BenchmarkEmitter()
+    listener = BenchmarkListener(events)
+    listening = asyncio.create_task(listener.entrypoint(None))
+    while not listener._accepting:
+        await asyncio.sleep(0)
+    payload = "x" * payloadSize
+    samples = [SampleHappened(f"sample-{i}", i, payload) for i in range(events)]
+    start = time.perf_counter()
+    await emitter.emit_many(samples)
+    await listener.done()
+    result = time.perf_counter() - start
+    await listener.stop()
+    await listening
+    await BenchmarkEmitter.shutdown()
+
+    return result
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("-n", "--events", type=int, default=10000, help="Events")
+    parser.add_argument(
+        "-s", "--payload-size", type=int, default=256, help="Bytes of text per event"
+    )
+    args = parser.parse_args()
+
+    for wire_format in WireFormat:
+        seconds = asyncio.run(measure(args.events, args.payload_size, wire_format))
+        print(
+            f"{wire_format.value}: {args.events / seconds:.0f} events/s "
+            f"({seconds * 1e6 / args.events:.1f} us/event)"
+        )
+
+
+if __name__ == "__main__":
+    main()
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,155 @@
+# vim: set fileencoding=utf-8
+"""
+benchmarks/dbus_parse_offload.py
+
+This script measures how long the event loop is blocked while parsing expensive events.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import asyncio
+from dbus_loopback_throughput import (
+    BenchmarkEmitter,
+    BenchmarkListener,
+    DbusSampleHappened,
+    SampleHappened,
+)
+from dbus_next import BusType, Message
+import json
+from pythoneda.shared import PythonedaApplication
+from pythoneda.shared.infrastructure.dbus import (
+    DbusLoopbackBus,
+    DbusLoopbackDaemon,
+    DbusLoopLagMonitor,
+    ParseExecutor,
+    WireFormat,
+)
+import time
+from typing import Tuple
+
+
+class DbusExpensiveSampleHappened(DbusSampleHappened):
+    """
+    A d-bus adapter of SampleHappened whose parse() takes a while.
+    """
+
+    # Where to parse, changed for each run.
+    executor = ParseExecutor.LOOP
+
+    # The document deserialized for each event.
+    document = json.dumps([{"id": i, "tags": ["a", "b", "c"]} for i in range(2000)])
+
+    @classmethod
+    def parse_executor(cls) -> ParseExecutor:
+        """
+        Retrieves where to parse incoming signals of this class.
+        :return: Such executor.
+        :rtype: pythoneda.shared.infrastructure.dbus.ParseExecutor
+        """
+        return cls.executor
+
+    @classmethod
+    def parse(
+        cls, message: Message, app: PythonedaApplication
+    ) -> Tuple[str, SampleHappened]:
+        """
+        Parses given d-bus message, after deserializing a large document.
+        :param message: The message.
+        :type message: dbus_next.Message
+        :param app: The application.
+        :type app: pythoneda.shared.PythonedaApplication
+        :return: A tuple with the invariants and the specific event.
+        :rtype: Tuple[str, SampleHappened]
+        """
+        json.loads(cls.document)
+        return super().parse(message, app)
+
+
+async def measure(
+    events: int, executor: ParseExecutor
+) -> Tuple[float, DbusLoopLagMonitor]:
+    """
+    Emits and receives given number of events through the loopback bus,
+    measuring the loop lag meanwhile.
+    :param events: The number of events.
+    :type events: int
+    :param executor: Where to parse them.
+    :type executor: pythoneda.shared.infrastructure.dbus.ParseExecutor
+    :return: The elapsed seconds, and the loop lag metrics.
+    :rtype: Tuple[float, pythoneda.shared.infrastructure.dbus.DbusLoopLagMonitor]
+    """
+    DbusLoopbackDaemon.reset()
+    DbusExpensiveSampleHappened.executor = executor
+    configured = [
+        {"event-class": DbusExpensiveSampleHappened, "bus-type": BusType.SESSION}
+    ]
+    BenchmarkEmitter._connection_pool = None
+    BenchmarkListener._connection_pool = None
+    BenchmarkEmitter.enable(
+        events=configured, bus_factory=DbusLoopbackBus, wire_format=WireFormat.TEXT
+    )
+    BenchmarkListener.enable(
+        events=configured, bus_factory=DbusLoopbackBus, loop_lag_interval=0.001
+    )
+    emitter = BenchmarkEmitter()
+    listener = BenchmarkListener(events)
+    listening = asyncio.create_task(listener.entrypoint(None))
+    while not listener._accepting:
+        await asyncio.sleep(0)
+    # Starts the workers beforehand.
+    BenchmarkListener.parse_executor(executor)
+    listener.loop_lag.reset()
+    start = time.perf_counter()
+    for i in range(events):
+        await emitter.emit(SampleHappened(f"sample-{i}", i, "x"))
+        await asyncio.sleep(0.001)
+    await listener.done()
+    result = time.perf_counter() - start, listener.loop_lag
+    await listener.stop()
+    await listening
+    await BenchmarkEmitter.shutdown()
+
+    return result
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("-n", "--events", type=int, default=500, help="Events")
+    args = parser.parse_args()
+
+    for executor in ParseExecutor:
+        seconds, lag = asyncio.run(measure(args.events, executor))
+        print(
+            f"{executor.value}: {args.events / seconds:.0f} events/s, loop lag "
+            f"mean {lag.mean * 1000:.2f} ms, p99 {lag.percentile(0.99) * 1000:.2f} ms, "
+            f"max {lag.max * 1000:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,111 @@
+# vim: set fileencoding=utf-8
+"""
+benchmarks/dbus_signals_discovery.py
+
+This script compares cold and warm discovery of d-bus events.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Each measurement runs in a fresh interpreter, so that imports are not cached.
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from pythoneda.shared.infrastructure.dbus import DbusSignals
+ready = time.perf_counter()
+signals = DbusSignals(sys.argv[1], sys.argv[2]).signals()
+end = time.perf_counter()
+print(json.dumps({"seconds": end - ready, "signals": len(signals), "modules": len(sys.modules)}))
+"""
+
+
+def measure(package: str, manifestDir: str) -> dict:
+    """
+    Discovers the d-bus events of given package in a new interpreter.
+    :param package: The package.
+    :type package: str
+    :param manifestDir: The folder for discovery manifests.
+    :type manifestDir: str
+    :return: The elapsed seconds, the number of signals and of loaded modules.
+    :rtype: dict
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE, package, manifestDir],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def report(label: str, samples: list):
+    """
+    Prints a summary of given samples.
+    :param label: The label.
+    :type label: str
+    :param samples: The samples.
+    :type samples: list
+    """
+    seconds = [sample["seconds"] * 1000 for sample in samples]
+    print(
+        f"{label}: median {statistics.median(seconds):.2f} ms, "
+        f"min {min(seconds):.2f} ms, "
+        f"{samples[-1]['signals']} signal(s), {samples[-1]['modules']} module(s) loaded"
+    )
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("packages", nargs="+", help="The packages with d-bus events")
+    parser.add_argument("-r", "--runs", type=int, default=5, help="Runs per mode")
+    args = parser.parse_args()
+
+    for package in args.packages:
+        cold = []
+        warm = []
+        for run in range(args.runs):
+            manifest_dir = tempfile.mkdtemp(prefix="dbus-signals-")
+            try:
+                cold.append(measure(package, manifest_dir))
+                warm.append(measure(package, manifest_dir))
+            finally:
+                shutil.rmtree(manifest_dir, ignore_errors=True)
+        print(package)
+        report("  cold", cold)
+        report("  warm", warm)
+
+
+if __name__ == "__main__":
+    main()
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,160 @@
+# vim: set fileencoding=utf-8
+"""
+benchmarks/shared_memory_latency.py
+
+This script measures the delivery latency of signals through a shared memory ring.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import asyncio
+from dbus_next import BusType, Message
+import multiprocessing
+import os
+from pythoneda.shared.infrastructure.ipc import (
+    SharedMemoryPublisherBus,
+    SharedMemoryRing,
+    SharedMemorySubscriberBus,
+)
+import time
+
+INTERFACE = "pythoneda.benchmarks.Benchmark"
+
+
+def run_consumer(
+    ringName: str, signals: int, spinIterations: int, results: multiprocessing.Queue
+):
+    """
+    Receives given number of signals, in a separate process, measuring how
+    long each one took to arrive.
+    :param ringName: The name of the ring.
+    :type ringName: str
+    :param signals: The number of signals.
+    :type signals: int
+    :param spinIterations: The times to check the ring before sleeping.
+    :type spinIterations: int
+    :param results: Where to put "ready" first, and then the latencies, in nanoseconds.
+    :type results: multiprocessing.Queue
+    """
+
+    async def consume():
+        bus = await SharedMemorySubscriberBus(
+            BusType.SESSION, ring_name=ringName, spin_iterations=spinIterations
+        ).connect()
+        try:
+            latencies = []
+            done = asyncio.Event()
+
+            def handle(message: Message) -> bool:
+                if message.member == "Latency":
+                    latencies.append(time.perf_counter_ns() - message.body[0])
+                    if len(latencies) >= signals:
+                        done.set()
+                return True
+
+            bus.add_message_handler(handle)
+            results.put("ready")
+            await done.wait()
+            results.put(latencies)
+        finally:
+            # Unlinks the ring.
+            bus.disconnect()
+
+    asyncio.run(consume())
+
+
+async def produce(ringName: str, signals: int, interval: float):
+    """
+    Sends given number of signals, carrying the time they were sent.
+    :param ringName: The name of the ring.
+    :type ringName: str
+    :param signals: The number of signals.
+    :type signals: int
+    :param interval: The seconds between signals.
+    :type interval: float
+    """
+    bus = await SharedMemoryPublisherBus(BusType.SESSION, ring_name=ringName).connect()
+    try:
+        # Signals are dropped until the consumer has created the ring.
+        probe = Message.new_signal("/pythoneda/benchmarks", INTERFACE, "Probe", "x", [0])
+        while not bus.writer.attached:
+            await bus.send(probe)
+            await asyncio.sleep(0.01)
+        for _ in range(signals):
+            await bus.send(
+                Message.new_signal(
+                    "/pythoneda/benchmarks",
+                    INTERFACE,
+                    "Latency",
+                    "x",
+                    [time.perf_counter_ns()],
+                )
+            )
+            await asyncio.sleep(interval)
+    finally:
+        bus.disconnect()
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("-n", "--signals", type=int, default=1000, help="Signals")
+    parser.add_argument(
+        "-i",
+        "--interval",
+        type=float,
+        default=0.001,
+        help="Seconds between signals",
+    )
+    args = parser.parse_args()
+
+    for spin_iterations in (0, 100):
+        ring_name = f"pythoneda-benchmark-{os.getpid()}"
+        results = multiprocessing.Queue()
+        consumer = multiprocessing.Process(
+            target=run_consumer,
+            args=(ring_name, args.signals, spin_iterations, results),
+        )
+        consumer.start()
+        try:
+            results.get(timeout=10)
+            asyncio.run(produce(ring_name, args.signals, args.interval))
+            latencies = sorted(results.get(timeout=60))
+        finally:
+            consumer.join(timeout=5)
+            if consumer.is_alive():
+                consumer.terminate()
+            # In case the consumer could not remove it.
+            SharedMemoryRing.remove(f"{ring_name}-{BusType.SESSION.name.lower()}")
+        print(
+            f"spin {spin_iterations}: p50 {latencies[len(latencies) // 2] / 1000:.1f} us, "
+            f"p99 {latencies[int(len(latencies) * 0.99)] / 1000:.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
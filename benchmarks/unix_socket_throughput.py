@@ -0,0 +1,155 @@
+# vim: set fileencoding=utf-8
+"""
+benchmarks/unix_socket_throughput.py
+
+This script measures emitting d-bus events to a listener process over a Unix socket.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import asyncio
+from dbus_loopback_throughput import (
+    BenchmarkEmitter,
+    BenchmarkListener,
+    DbusSampleHappened,
+    SampleHappened,
+)
+from dbus_next import BusType
+import functools
+import multiprocessing
+import os
+from pythoneda.shared.infrastructure.dbus import WireFormat
+from pythoneda.shared.infrastructure.ipc import (
+    UnixSocketHub,
+    UnixSocketPublisherBus,
+    UnixSocketSubscriberBus,
+)
+import tempfile
+import time
+
+CONFIGURED = [{"event-class": DbusSampleHappened, "bus-type": BusType.SESSION}]
+
+
+def run_listener(socketPath: str, events: int, finished: multiprocessing.Queue):
+    """
+    Receives given number of events, in a separate process.
+    :param socketPath: The path of the socket.
+    :type socketPath: str
+    :param events: The number of events.
+    :type events: int
+    :param finished: Where to put the time the last event was received.
+    :type finished: multiprocessing.Queue
+    """
+
+    async def listen():
+        BenchmarkListener.enable(
+            events=CONFIGURED,
+            bus_factory=functools.partial(
+                UnixSocketSubscriberBus,
+                socket_path=socketPath,
+                reconnect_interval=0.01,
+            ),
+        )
+        listener = BenchmarkListener(events)
+        listening = asyncio.create_task(listener.entrypoint(None))
+        await listener.done()
+        finished.put(time.perf_counter())
+        await listener.stop()
+        await listening
+
+    asyncio.run(listen())
+
+
+async def emit(
+    socketPath: str, events: int, payloadSize: int, wireFormat: WireFormat
+) -> float:
+    """
+    Emits given number of events, once the listener has subscribed.
+    :param socketPath: The path of the socket.
+    :type socketPath: str
+    :param events: The number of events.
+    :type events: int
+    :param payloadSize: The size of the text in each event.
+    :type payloadSize: int
+    :param wireFormat: The wire format.
+    :type wireFormat: pythoneda.shared.infrastructure.dbus.WireFormat
+    :return: The time the first event was emitted.
+    :rtype: float
+    """
+    BenchmarkEmitter._connection_pool = None
+    BenchmarkEmitter.enable(
+        events=CONFIGURED,
+        bus_factory=functools.partial(UnixSocketPublisherBus, socket_path=socketPath),
+        wire_format=wireFormat,
+    )
+    emitter = BenchmarkEmitter()
+    await BenchmarkEmitter.connection_pool().connection(BusType.SESSION)
+    hub = UnixSocketHub.instance(socketPath)
+    while hub.subscribers == 0:
+        await asyncio.sleep(0.01)
+    # Give the listener time to send its match rules.
+    await asyncio.sleep(0.2)
+    payload = "x" * payloadSize
+    samples = [SampleHappened(f"sample-{i}", i, payload) for i in range(events)]
+    result = time.perf_counter()
+    for start in range(0, events, 1000):
+        await emitter.emit_many(samples[start : start + 1000])
+    await asyncio.sleep(0.5)
+    await BenchmarkEmitter.shutdown()
+
+    return result
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("-n", "--events", type=int, default=50000, help="Events")
+    parser.add_argument(
+        "-s", "--payload-size", type=int, default=256, help="Bytes of text per event"
+    )
+    args = parser.parse_args()
+
+    for wire_format in WireFormat:
+        socket_path = os.path.join(tempfile.mkdtemp(), "events.sock")
+        finished = multiprocessing.Queue()
+        listener = multiprocessing.Process(
+            target=run_listener, args=(socket_path, args.events, finished)
+        )
+        listener.start()
+        started = asyncio.run(
+            emit(socket_path, args.events, args.payload_size, wire_format)
+        )
+        seconds = finished.get() - started
+        listener.join()
+        print(
+            f"{wire_format.value}: {args.events / seconds:.0f} events/s "
+            f"({seconds * 1e6 / args.events:.1f} us/event)"
+        )
+
+
+if __name__ == "__main__":
+    main()
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -21,7 +21,28 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 __path__ = __import__("pkgutil").extend_path(__path__, __name__)
 
+from .compression import Compression
+from .discovery_mode import DiscoveryMode
+from .overflow_policy import OverflowPolicy
+from .parse_executor import ParseExecutor
+from .wire_format import WireFormat
+from .dbus_loopback_daemon import DbusLoopbackDaemon
+from .dbus_loopback_bus import DbusLoopbackBus
+from .dbus_connection_pool import DbusConnectionPool
+from .dbus_dedup_window import DbusDedupWindow
+from .dbus_memfd_payload import DbusMemfdPayload
+from .dbus_message_compressor import DbusMessageCompressor
+from .dbus_keyed_scheduler import DbusKeyedScheduler
+from .dbus_loop_lag_monitor import DbusLoopLagMonitor
+from .dbus_outbox import DbusOutbox
+from .dbus_work_queue import DbusWorkQueue
+from .dbus_event_registry import DbusEventRegistry
+from .dbus_event_reference import DbusEventReference
+from .dbus_event_scanner import DbusEventScanner
 from .dbus_event import DbusEvent
+from .dbus_event_codec import DbusEventCodec
+from .schema_dbus_event import SchemaDbusEvent
+from .dbus_emission_record import DbusEmissionRecord
 from .dbus_signals import DbusSignals
 from .dbus_signal_emitter import DbusSignalEmitter
 from .dbus_signal_listener import DbusSignalListener
@@ -0,0 +1,177 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/dbus/dbus_connection_pool.py
+
+This file defines the DbusConnectionPool class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from dbus_next import BusType
+from dbus_next.aio import MessageBus
+from dbus_next.service import ServiceInterface
+from pythoneda.shared import BaseObject
+from typing import Callable, Set
+
+
+class DbusConnectionPool(BaseObject):
+    """
+    Keeps one long-lived d-bus connection per bus type.
+
+    Class name: DbusConnectionPool
+
+    Responsibilities:
+        - Connect lazily to each bus type, and reuse the connection afterwards.
+        - Reconnect when a connection is found to be broken.
+        - Export each interface only once per path and connection.
+        - Close all connections on shutdown.
+
+    Collaborators:
+        - dbus_next.aio.MessageBus: The underlying connections.
+    """
+
+    def __init__(
+        self,
+        busFactory: Callable[[BusType], MessageBus] = None,
+        negotiateUnixFd: bool = False,
+    ):
+        """
+        Creates a new DbusConnectionPool instance.
+        :param busFactory: The function to create a (not yet connected) bus for a given bus type.
+        :type busFactory: Callable[[dbus_next.BusType], dbus_next.aio.MessageBus]
+        :param negotiateUnixFd: Whether buses can send and receive file descriptors. If so, custom factories get negotiate_unix_fd=True as well.
+        :type negotiateUnixFd: bool
+        """
+        super().__init__()
+        if busFactory is None:
+            busFactory = lambda busType: MessageBus(
+                bus_type=busType, negotiate_unix_fd=negotiateUnixFd
+            )
+        elif negotiateUnixFd:
+            custom_factory = busFactory
+            busFactory = lambda busType: custom_factory(
+                busType, negotiate_unix_fd=True
+            )
+        self._bus_factory = busFactory
+        self._buses = {}
+        self._exported = {}
+        self._locks = {}
+
+    @property
+    def bus_factory(self) -> Callable[[BusType], MessageBus]:
+        """
+        Retrieves the function used to create new buses.
+        :return: Such function.
+        :rtype: Callable[[dbus_next.BusType], dbus_next.aio.MessageBus]
+        """
+        return self._bus_factory
+
+    @property
+    def bus_types(self) -> Set[BusType]:
+        """
+        Retrieves the bus types with an open connection.
+        :return: Such bus types.
+        :rtype: Set[dbus_next.BusType]
+        """
+        return set(self._buses.keys())
+
+    async def connection(self, busType: BusType) -> MessageBus:
+        """
+        Retrieves the connection for given bus type, connecting if necessary.
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        :return: The connected bus.
+        :rtype: dbus_next.aio.MessageBus
+        """
+        result = self._buses.get(busType, None)
+        if result is None or not result.connected:
+            lock = self._locks.get(busType, None)
+            if lock is None:
+                lock = asyncio.Lock()
+                self._locks[busType] = lock
+            async with lock:
+                result = self._buses.get(busType, None)
+                if result is None or not result.connected:
+                    if result is not None:
+                        DbusConnectionPool.logger().info(
+                            f"Connection to {busType} lost, reconnecting"
+                        )
+                        self.invalidate(busType)
+                    result = await self._bus_factory(busType).connect()
+                    self._buses[busType] = result
+                    self._exported[busType] = set()
+                    DbusConnectionPool.logger().debug(f"Connected to {busType}")
+
+        return result
+
+    def export(self, busType: BusType, path: str, interface: ServiceInterface):
+        """
+        Exports given interface on given path, unless it's already exported.
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        :param path: The d-bus path.
+        :type path: str
+        :param interface: The interface.
+        :type interface: dbus_next.service.ServiceInterface
+        """
+        bus = self._buses.get(busType, None)
+        if bus is not None:
+            exported = self._exported[busType]
+            key = (path, interface.name)
+            if key not in exported:
+                bus.export(path, interface)
+                exported.add(key)
+
+    def invalidate(self, busType: BusType):
+        """
+        Discards the connection for given bus type, so that the next request reconnects.
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        """
+        bus = self._buses.pop(busType, None)
+        self._exported.pop(busType, None)
+        if bus is not None:
+            try:
+                bus.disconnect()
+            except Exception as err:
+                DbusConnectionPool.logger().debug(
+                    f"Error disconnecting from {busType}: {err}"
+                )
+
+    async def close(self):
+        """
+        Closes all connections.
+        """
+        buses = list(self._buses.items())
+        for bus_type, bus in buses:
+            self.invalidate(bus_type)
+        for bus_type, bus in buses:
+            try:
+                await bus.wait_for_disconnect()
+            except Exception as err:
+                DbusConnectionPool.logger().debug(
+                    f"Error waiting for {bus_type} to disconnect: {err}"
+                )
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,139 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/dbus/dbus_dedup_window.py
+
+This file defines the DbusDedupWindow class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from collections import OrderedDict
+from pythoneda.shared import BaseObject
+import time
+from typing import Hashable
+
+
+class DbusDedupWindow(BaseObject):
+    """
+    Remembers the keys seen recently, to discard duplicates.
+
+    Class name: DbusDedupWindow
+
+    Responsibilities:
+        - Tell whether a key was seen within its time to live.
+        - Forget expired keys, and the oldest ones once full.
+        - Count hits (duplicates) and misses.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.dbus.DbusSignalListener: Discards duplicate signals with it.
+    """
+
+    def __init__(self, maxSize: int = 10000, ttl: float = 60.0):
+        """
+        Creates a new DbusDedupWindow instance.
+        :param maxSize: The maximum number of keys remembered.
+        :type maxSize: int
+        :param ttl: How long each key is remembered, in seconds.
+        :type ttl: float
+        """
+        super().__init__()
+        self._max_size = maxSize
+        self._ttl = ttl
+        # Keys and their expiration, in insertion (and thus expiration) order.
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evicted = 0
+
+    @property
+    def size(self) -> int:
+        """
+        Retrieves the number of keys remembered.
+        :return: Such number.
+        :rtype: int
+        """
+        return len(self._entries)
+
+    @property
+    def hits(self) -> int:
+        """
+        Retrieves the number of duplicates found.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """
+        Retrieves the number of keys seen for the first time.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._misses
+
+    @property
+    def evicted(self) -> int:
+        """
+        Retrieves the number of keys forgotten before expiring, to stay within
+        the maximum size.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._evicted
+
+    def seen(self, key: Hashable) -> bool:
+        """
+        Checks whether given key was seen within its time to live, and
+        remembers it otherwise.
+        :param key: The key.
+        :type key: Hashable
+        :return: True if it's a duplicate.
+        :rtype: bool
+        """
+        now = time.monotonic()
+        entries = self._entries
+        while entries:
+            oldest, expiration = next(iter(entries.items()))
+            if expiration > now:
+                break
+            del entries[oldest]
+        result = key in entries
+        if result:
+            self._hits += 1
+        else:
+            self._misses += 1
+            entries[key] = now + self._ttl
+            if len(entries) > self._max_size:
+                entries.popitem(last=False)
+                self._evicted += 1
+
+        return result
+
+    def clear(self):
+        """
+        Forgets all keys.
+        """
+        self._entries.clear()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
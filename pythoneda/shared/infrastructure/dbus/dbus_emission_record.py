@@ -0,0 +1,184 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/dbus/dbus_emission_record.py
+
+This file defines the DbusEmissionRecord class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from .compression import Compression
+from dbus_next import BusType, Message
+from .dbus_event import DbusEvent
+from .wire_format import WireFormat
+from pythoneda.shared import BaseObject, Event, full_class_name
+from typing import Tuple, Type
+
+
+class DbusEmissionRecord(BaseObject):
+    """
+    Everything needed to emit a given kind of event, computed only once.
+
+    Class name: DbusEmissionRecord
+
+    Responsibilities:
+        - Keep the d-bus event instance, the interface and member names, and the signature.
+        - Build the d-bus signal for a domain event.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.dbus.DbusEvent: The adapter.
+        - pythoneda.shared.infrastructure.dbus.DbusSignalEmitter: Uses this class.
+    """
+
+    def __init__(
+        self,
+        dbusEventClass: Type[DbusEvent],
+        busType: BusType,
+        wireFormat: WireFormat = WireFormat.TEXT,
+    ):
+        """
+        Creates a new DbusEmissionRecord instance.
+        :param dbusEventClass: The d-bus event class.
+        :type dbusEventClass: Type[pythoneda.shared.infrastructure.dbus.DbusEvent]
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        :param wireFormat: The preferred format, if the d-bus event class supports it.
+        :type wireFormat: pythoneda.shared.infrastructure.dbus.WireFormat
+        """
+        super().__init__()
+        dbusEventClass.compile()
+        self._dbus_event_class = dbusEventClass
+        self._bus_type = busType
+        self._instance = dbusEventClass()
+        self._interface = full_class_name(dbusEventClass)
+        self._member = self._instance.name
+        self._fixed_signature = dbusEventClass.has_fixed_signature()
+        self._signature = None
+        self._compression = dbusEventClass.compression()
+        self._binary = wireFormat == WireFormat.BINARY and (
+            dbusEventClass.supports_wire_format(WireFormat.BINARY)
+        )
+
+    @property
+    def dbus_event_class(self) -> Type[DbusEvent]:
+        """
+        Retrieves the d-bus event class.
+        :return: Such class.
+        :rtype: Type[pythoneda.shared.infrastructure.dbus.DbusEvent]
+        """
+        return self._dbus_event_class
+
+    @property
+    def bus_type(self) -> BusType:
+        """
+        Retrieves the bus type.
+        :return: Such bus type.
+        :rtype: dbus_next.BusType
+        """
+        return self._bus_type
+
+    @property
+    def instance(self) -> DbusEvent:
+        """
+        Retrieves the d-bus event instance.
+        :return: Such instance.
+        :rtype: pythoneda.shared.infrastructure.dbus.DbusEvent
+        """
+        return self._instance
+
+    @property
+    def interface(self) -> str:
+        """
+        Retrieves the d-bus interface name.
+        :return: Such name.
+        :rtype: str
+        """
+        return self._interface
+
+    @property
+    def member(self) -> str:
+        """
+        Retrieves the d-bus member name.
+        :return: Such name.
+        :rtype: str
+        """
+        return self._member
+
+    @property
+    def compression(self) -> Compression:
+        """
+        Retrieves the algorithm to compress large signals with.
+        :return: Such algorithm, or None if they are never compressed.
+        :rtype: pythoneda.shared.infrastructure.dbus.Compression
+        """
+        return self._compression
+
+    @property
+    def wire_format(self) -> WireFormat:
+        """
+        Retrieves the format of the signals.
+        :return: Such format.
+        :rtype: pythoneda.shared.infrastructure.dbus.WireFormat
+        """
+        return WireFormat.BINARY if self._binary else WireFormat.TEXT
+
+    def signature_for(self, event: Event) -> str:
+        """
+        Retrieves the signature of the signal for given event.
+        Fixed signatures are computed for the first event, and reused afterwards.
+        :param event: The domain event.
+        :type event: pythoneda.shared.Event
+        :return: The signature.
+        :rtype: str
+        """
+        result = self._signature
+        if result is None:
+            result = self._instance.sign(event)
+            if self._fixed_signature:
+                self._signature = result
+
+        return result
+
+    def build_signal(self, event: Event) -> Tuple[str, Message]:
+        """
+        Builds the d-bus signal for given event.
+        :param event: The domain event.
+        :type event: pythoneda.shared.Event
+        :return: The path and the message.
+        :rtype: Tuple[str, dbus_next.Message]
+        """
+        instance = self._instance
+        path = instance.build_path(event)
+        if self._binary:
+            signature = "ay"
+            body = [instance.to_binary(event)]
+        else:
+            signature = self.signature_for(event)
+            body = instance.transform(event)
+
+        return (
+            path,
+            Message.new_signal(path, self._interface, self._member, signature, body),
+        )
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
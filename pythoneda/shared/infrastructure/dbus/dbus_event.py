@@ -22,9 +22,15 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import abc
 from dbus_next import BusType, Message
 from dbus_next.service import ServiceInterface
+from .compression import Compression
+from .dbus_event_registry import DbusEventRegistry
+from .parse_executor import ParseExecutor
+from .wire_format import WireFormat
+import hashlib
 import json
+import logging
 from pythoneda.shared import BaseObject, Event, PythonedaApplication
-from typing import Callable, List, Tuple, Type
+from typing import Callable, Dict, Hashable, List, Tuple, Type
 
 
 class DbusEvent(BaseObject, ServiceInterface, abc.ABC):
@@ -40,6 +46,15 @@ class DbusEvent(BaseObject, ServiceInterface, abc.ABC):
         - None
     """
 
+    def __init_subclass__(cls, **kwargs):
+        """
+        Registers each subclass in the d-bus event registry.
+        :param kwargs: Additional keyword arguments.
+        :type kwargs: Dict
+        """
+        super().__init_subclass__(**kwargs)
+        DbusEventRegistry.register(cls)
+
     def __init__(self, path: str):
         """
         Creates a new DbusEvent.
@@ -66,7 +81,9 @@ class DbusEvent(BaseObject, ServiceInterface, abc.ABC):
         :return: Such value.
         :rtype: str
         """
-        DbusEvent.logger().debug(f"Path for event {event}: {self.path}")
+        logger = DbusEvent.logger()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Path for event {event}: {self.path}")
         return self.path
 
     def sanitize_path(self, path: str) -> str:
@@ -139,6 +156,131 @@ class DbusEvent(BaseObject, ServiceInterface, abc.ABC):
         """
         pass
 
+    @classmethod
+    def has_fixed_signature(cls) -> bool:
+        """
+        Checks whether sign() returns the same signature for every event.
+        If so, emitters compute it only once. Hand-written classes can opt in
+        by overriding it.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return False
+
+    @classmethod
+    def supports_wire_format(cls, wireFormat: WireFormat) -> bool:
+        """
+        Checks whether this class can lay out events in given format.
+        Hand-written classes support the text format only.
+        :param wireFormat: The format.
+        :type wireFormat: pythoneda.shared.infrastructure.dbus.WireFormat
+        :return: True in such case.
+        :rtype: bool
+        """
+        return wireFormat == WireFormat.TEXT
+
+    @classmethod
+    def to_binary(cls, event: Event) -> bytes:
+        """
+        Packs given event, and its invariants, in a binary envelope.
+        Only called if the binary format is supported.
+        :param event: The event.
+        :type event: pythoneda.shared.Event
+        :return: The envelope.
+        :rtype: bytes
+        """
+        raise NotImplementedError(f"{cls.__name__} does not support binary payloads")
+
+    @classmethod
+    def compression(cls) -> Compression:
+        """
+        Retrieves the algorithm to compress large signals of this class with.
+        Emitters compress them only above their configured threshold.
+        :return: Such algorithm, or None to never compress them.
+        :rtype: pythoneda.shared.infrastructure.dbus.Compression
+        """
+        return None
+
+    @classmethod
+    def parse_executor(cls) -> ParseExecutor:
+        """
+        Retrieves where to parse incoming signals of this class. Classes whose
+        parse() is expensive can move it out of the event loop, to a thread, or
+        to a process if it's CPU-bound and its messages can be pickled.
+        parse() then gets no application in another process.
+        :return: Such executor.
+        :rtype: pythoneda.shared.infrastructure.dbus.ParseExecutor
+        """
+        return ParseExecutor.LOOP
+
+    @classmethod
+    def compile(cls):
+        """
+        Prepares whatever is needed to encode and decode events, so that it's not
+        done for the first message. Emitters and listeners call it when enabled.
+        Does nothing by default.
+        """
+        pass
+
+    @classmethod
+    def ordering_key(cls, message: Message, event: Event) -> Hashable:
+        """
+        Retrieves the key of the events which must be processed in order with
+        given one, such as the identifier of the aggregate they belong to.
+        Listeners process events with the same key one after another, and events
+        with different keys concurrently.
+        :param message: The message.
+        :type message: dbus_next.Message
+        :param event: The parsed event.
+        :type event: pythoneda.shared.Event
+        :return: The key, or None if the event can be processed in any order.
+        :rtype: Hashable
+        """
+        return None
+
+    @classmethod
+    def transmits_id(cls) -> bool:
+        """
+        Checks whether signals of this class carry the id of their events, so
+        that parsed events keep the id they were emitted with.
+        :return: True in such case. False by default.
+        :rtype: bool
+        """
+        return False
+
+    @classmethod
+    def dedup_key(cls, message: Message, event: Event) -> Hashable:
+        """
+        Retrieves the key identifying duplicates of given event, for listeners
+        discarding them: its id, if transmitted. Otherwise, a hash of the
+        message contents, so identical but distinct events are taken as duplicates.
+        :param message: The message.
+        :type message: dbus_next.Message
+        :param event: The parsed event.
+        :type event: pythoneda.shared.Event
+        :return: The key, or None if the event cannot be deduplicated.
+        :rtype: Hashable
+        """
+        result = None
+        if cls.transmits_id():
+            result = (cls.name, event.id)
+        elif not message.unix_fds:
+            # Payloads passed as file descriptors are not in the message.
+            result = hashlib.blake2b(
+                repr(
+                    (
+                        message.interface,
+                        message.member,
+                        message.path,
+                        message.signature,
+                        message.body,
+                    )
+                ).encode("utf-8"),
+                digest_size=16,
+            ).digest()
+
+        return result
+
     @classmethod
     @abc.abstractmethod
     def event_class(cls) -> Type[Event]:
@@ -0,0 +1,379 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/dbus/dbus_event_codec.py
+
+This file defines the DbusEventCodec class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import inspect
+import json
+import operator
+from pythoneda.shared import BaseObject, Event
+import re
+import struct
+import typing
+from typing import Any, Callable, List, Tuple, Type
+
+
+class DbusEventCodec(BaseObject):
+    """
+    Encodes and decodes events as d-bus signal bodies, from their constructor.
+
+    Class name: DbusEventCodec
+
+    Responsibilities:
+        - Derive the fields of an event class: the constructor parameters with a matching property.
+        - Derive the d-bus signature from their type hints.
+        - Encode events, and decode signal bodies, without per-message reflection.
+        - Pack events and their invariants in a compact binary envelope.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.dbus.SchemaDbusEvent: Uses this class.
+    """
+
+    _codecs = {}
+
+    _native_signatures = {str: "s", int: "x", float: "d", bool: "b", bytes: "ay"}
+
+    # Parameters of pythoneda.shared.Event restoring what its properties return.
+    _property_aliases = {
+        "reconstructedId": "id",
+        "reconstructedPreviousEventIds": "previous_event_ids",
+    }
+
+    _binary_version = 1
+    _binary_header = struct.Struct("<BB")
+    _binary_fixed = {
+        "x": struct.Struct("<q"),
+        "d": struct.Struct("<d"),
+        "b": struct.Struct("<?"),
+    }
+
+    def __init__(self, eventClass: Type[Event]):
+        """
+        Creates a new DbusEventCodec instance.
+        :param eventClass: The event class.
+        :type eventClass: Type[pythoneda.shared.Event]
+        """
+        super().__init__()
+        self._event_class = eventClass
+        self._fields = self._derive_fields(eventClass)
+        self._signature = "".join(signature for _, _, signature, _, _ in self._fields)
+        self._parameters = [parameter for parameter, _, _, _, _ in self._fields]
+        properties = [name for _, name, _, _, _ in self._fields]
+        if len(properties) == 1:
+            getter = operator.attrgetter(properties[0])
+            self._get = lambda event: (getter(event),)
+        elif properties:
+            self._get = operator.attrgetter(*properties)
+        else:
+            self._get = lambda event: ()
+        self._encoders = [
+            (index, encode)
+            for index, (_, _, _, encode, _) in enumerate(self._fields)
+            if encode is not None
+        ]
+        self._decoders = [
+            (parameter, decode)
+            for parameter, _, _, _, decode in self._fields
+            if decode is not None
+        ]
+        # The invariants follow the fields, as a string.
+        self._packers = [
+            (self.__class__._binary_fixed.get(signature, None), signature == "s")
+            for signature in [signature for _, _, signature, _, _ in self._fields]
+            + ["s"]
+        ]
+
+    @classmethod
+    def for_event_class(cls, eventClass: Type[Event]) -> "DbusEventCodec":
+        """
+        Retrieves the codec for given event class, creating it the first time.
+        :param eventClass: The event class.
+        :type eventClass: Type[pythoneda.shared.Event]
+        :return: The codec.
+        :rtype: pythoneda.shared.infrastructure.dbus.DbusEventCodec
+        """
+        result = cls._codecs.get(eventClass, None)
+        if result is None:
+            result = cls(eventClass)
+            cls._codecs[eventClass] = result
+            DbusEventCodec.logger().debug(
+                f"Codec for {eventClass.__name__}: {result.signature} {result.fields}"
+            )
+
+        return result
+
+    @property
+    def event_class(self) -> Type[Event]:
+        """
+        Retrieves the event class.
+        :return: Such class.
+        :rtype: Type[pythoneda.shared.Event]
+        """
+        return self._event_class
+
+    @property
+    def signature(self) -> str:
+        """
+        Retrieves the d-bus signature of the encoded events.
+        :return: Such signature.
+        :rtype: str
+        """
+        return self._signature
+
+    @property
+    def fields(self) -> List[str]:
+        """
+        Retrieves the names of the constructor parameters, in encoding order.
+        :return: Such names.
+        :rtype: List[str]
+        """
+        return self._parameters
+
+    def encode(self, event: Event) -> List[Any]:
+        """
+        Encodes given event.
+        :param event: The event.
+        :type event: pythoneda.shared.Event
+        :return: The signal body.
+        :rtype: List[Any]
+        """
+        result = list(self._get(event))
+        for index, encode in self._encoders:
+            result[index] = encode(result[index])
+
+        return result
+
+    def decode(self, body: List[Any]) -> Event:
+        """
+        Decodes given signal body.
+        :param body: The signal body.
+        :type body: List[Any]
+        :return: The event.
+        :rtype: pythoneda.shared.Event
+        """
+        kwargs = dict(zip(self._parameters, body))
+        for parameter, decode in self._decoders:
+            kwargs[parameter] = decode(kwargs[parameter])
+
+        return self._event_class(**kwargs)
+
+    def encode_binary(self, event: Event, invariants: str) -> bytes:
+        """
+        Packs given event and invariants in a binary envelope: a version byte, a
+        flags byte, and then each field in order. Integers, floats and booleans
+        take a fixed size; strings and bytes are prefixed with their length, as a
+        varint (one byte up to 127).
+        :param event: The event.
+        :type event: pythoneda.shared.Event
+        :param invariants: The invariants, in JSON.
+        :type invariants: str
+        :return: The envelope.
+        :rtype: bytes
+        """
+        cls = self.__class__
+        parts = [cls._binary_header.pack(cls._binary_version, 0)]
+        values = self.encode(event)
+        values.append(invariants)
+        for (fixed, text), value in zip(self._packers, values):
+            if fixed is not None:
+                parts.append(fixed.pack(value))
+            else:
+                if text:
+                    value = value.encode("utf-8")
+                parts.append(cls._pack_length(len(value)))
+                parts.append(value)
+
+        return b"".join(parts)
+
+    def decode_binary(self, data: bytes) -> Tuple[str, Event]:
+        """
+        Unpacks given binary envelope.
+        :param data: The envelope.
+        :type data: bytes
+        :return: The invariants, and the event.
+        :rtype: Tuple[str, pythoneda.shared.Event]
+        """
+        cls = self.__class__
+        version, flags = cls._binary_header.unpack_from(data, 0)
+        if version != cls._binary_version or flags != 0:
+            raise ValueError(f"Unsupported envelope (version {version}, flags {flags})")
+        offset = cls._binary_header.size
+        values = []
+        for fixed, text in self._packers:
+            if fixed is not None:
+                values.append(fixed.unpack_from(data, offset)[0])
+                offset += fixed.size
+            else:
+                size, offset = cls._unpack_length(data, offset)
+                value = bytes(data[offset : offset + size])
+                offset += size
+                values.append(value.decode("utf-8") if text else value)
+        invariants = values.pop()
+
+        return invariants, self.decode(values)
+
+    @staticmethod
+    def _pack_length(length: int) -> bytes:
+        """
+        Packs given length as a varint: seven bits per byte, lowest first.
+        :param length: The length.
+        :type length: int
+        :return: The packed length.
+        :rtype: bytes
+        """
+        if length < 0x80:
+            result = bytes((length,))
+        else:
+            packed = bytearray()
+            while length >= 0x80:
+                packed.append((length & 0x7F) | 0x80)
+                length >>= 7
+            packed.append(length)
+            result = bytes(packed)
+
+        return result
+
+    @staticmethod
+    def _unpack_length(data: bytes, offset: int) -> Tuple[int, int]:
+        """
+        Unpacks a varint length.
+        :param data: The data.
+        :type data: bytes
+        :param offset: Where the length starts.
+        :type offset: int
+        :return: The length, and where the data after it starts.
+        :rtype: Tuple[int, int]
+        """
+        result = 0
+        shift = 0
+        while True:
+            byte = data[offset]
+            offset += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+
+        return result, offset
+
+    @classmethod
+    def _derive_fields(
+        cls, eventClass: Type[Event]
+    ) -> List[Tuple[str, str, str, Callable, Callable]]:
+        """
+        Derives the fields of given event class. Each constructor parameter is
+        read back through the property with the same name, in snake case, so
+        the event id travels as reconstructedId.
+        Parameters without such property are left out if they are optional.
+        :param eventClass: The event class.
+        :type eventClass: Type[pythoneda.shared.Event]
+        :return: For each field, the parameter, the property, the signature, and the encoder and decoder, if any.
+        :rtype: List[Tuple[str, str, str, Callable, Callable]]
+        """
+        result = []
+        try:
+            hints = typing.get_type_hints(eventClass.__init__)
+        except Exception:
+            hints = getattr(eventClass.__init__, "__annotations__", {})
+        parameters = list(inspect.signature(eventClass.__init__).parameters.values())
+        for parameter in parameters[1:]:
+            if parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+                continue
+            property_name = cls._property_for(eventClass, parameter.name)
+            if property_name is None:
+                if parameter.default is parameter.empty:
+                    raise ValueError(
+                        f"{eventClass.__name__}: no property for parameter {parameter.name}"
+                    )
+                DbusEventCodec.logger().debug(
+                    f"{eventClass.__name__}: skipping {parameter.name}, no property for it"
+                )
+                continue
+            hint = hints.get(parameter.name, None)
+            if hint is None:
+                hint = getattr(
+                    getattr(eventClass, property_name).fget, "__annotations__", {}
+                ).get("return", None)
+            signature, encode, decode = cls._converters(
+                hint, parameter.default is None
+            )
+            result.append((parameter.name, property_name, signature, encode, decode))
+
+        return result
+
+    @classmethod
+    def _property_for(cls, eventClass: Type[Event], parameter: str) -> str:
+        """
+        Finds the property for given constructor parameter.
+        :param eventClass: The event class.
+        :type eventClass: Type[pythoneda.shared.Event]
+        :param parameter: The parameter name, usually in camel case.
+        :type parameter: str
+        :return: The property name, or None if there's none.
+        :rtype: str
+        """
+        result = None
+        snake_case = re.sub(r"(?<!^)(?=[A-Z])", "_", parameter).lower()
+        alias = cls._property_aliases.get(parameter, snake_case)
+        for name in (alias, snake_case, parameter):
+            if isinstance(inspect.getattr_static(eventClass, name, None), property):
+                result = name
+                break
+
+        return result
+
+    @classmethod
+    def _converters(
+        cls, hint: Any, nullable: bool
+    ) -> Tuple[str, Callable[[Any], Any], Callable[[Any], Any]]:
+        """
+        Retrieves how to encode a field with given type hint.
+        Strings, integers, floats, booleans and bytes are sent natively. Anything
+        else, including values which can be None, is sent as JSON, using to_json()
+        and from_json() if the type provides them.
+        :param hint: The type hint.
+        :type hint: Any
+        :param nullable: Whether the value can be None.
+        :type nullable: bool
+        :return: The signature, the encoder and the decoder (None if the value needs no conversion).
+        :rtype: Tuple[str, Callable[[Any], Any], Callable[[Any], Any]]
+        """
+        signature = cls._native_signatures.get(hint, None)
+        if signature is not None and not nullable:
+            result = (signature, None, None)
+        elif inspect.isclass(hint) and callable(getattr(hint, "from_json", None)):
+            result = (
+                "s",
+                lambda value: "null" if value is None else value.to_json(),
+                lambda text: None if text == "null" else hint.from_json(text),
+            )
+        else:
+            result = ("s", json.dumps, json.loads)
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
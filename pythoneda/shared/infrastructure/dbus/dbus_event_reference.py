@@ -0,0 +1,177 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/dbus/dbus_event_reference.py
+
+This file defines the DbusEventReference class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import importlib
+from pythoneda.shared import BaseObject
+from typing import Type
+
+
+class DbusEventReference(BaseObject):
+    """
+    A d-bus event class which has not been imported yet.
+
+    Class name: DbusEventReference
+
+    Responsibilities:
+        - Describe a d-bus event class without importing it.
+        - Import it the first time it's needed.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.dbus.DbusSignals: Creates references.
+        - pythoneda.shared.infrastructure.dbus.DbusSignalEmitter: Resolves them when emitting.
+        - pythoneda.shared.infrastructure.dbus.DbusSignalListener: Resolves them when receiving.
+    """
+
+    def __init__(
+        self,
+        moduleName: str,
+        className: str,
+        eventClassName: str = None,
+        member: str = None,
+        path: str = None,
+    ):
+        """
+        Creates a new DbusEventReference instance.
+        :param moduleName: The module defining the d-bus event class.
+        :type moduleName: str
+        :param className: The name of the d-bus event class.
+        :type className: str
+        :param eventClassName: The fully-qualified name of the domain event class, if known.
+        :type eventClassName: str
+        :param member: The d-bus member name, if known.
+        :type member: str
+        :param path: The d-bus path, if known.
+        :type path: str
+        """
+        super().__init__()
+        self._module_name = moduleName
+        self._class_name = className
+        self._event_class_name = eventClassName
+        self._member = member
+        self._path = path
+        self._resolved = None
+
+    @property
+    def module_name(self) -> str:
+        """
+        Retrieves the module defining the d-bus event class.
+        :return: Such module.
+        :rtype: str
+        """
+        return self._module_name
+
+    @property
+    def class_name(self) -> str:
+        """
+        Retrieves the name of the d-bus event class.
+        :return: Such name.
+        :rtype: str
+        """
+        return self._class_name
+
+    @property
+    def interface(self) -> str:
+        """
+        Retrieves the d-bus interface name, i.e. the fully-qualified class name.
+        :return: Such name.
+        :rtype: str
+        """
+        return f"{self._module_name}.{self._class_name}"
+
+    @property
+    def event_class_name(self) -> str:
+        """
+        Retrieves the fully-qualified name of the domain event class, as imported
+        by the d-bus event module. It might be a re-export of the defining module.
+        :return: Such name, or None if unknown.
+        :rtype: str
+        """
+        return self._event_class_name
+
+    @property
+    def event_class_simple_name(self) -> str:
+        """
+        Retrieves the name of the domain event class, without its module.
+        :return: Such name, or None if unknown.
+        :rtype: str
+        """
+        result = None
+        if self._event_class_name is not None:
+            result = self._event_class_name.rsplit(".", 1)[-1]
+
+        return result
+
+    @property
+    def member(self) -> str:
+        """
+        Retrieves the d-bus member name.
+        :return: Such name, or None if unknown without importing the class.
+        :rtype: str
+        """
+        return self._member
+
+    @property
+    def path(self) -> str:
+        """
+        Retrieves the d-bus path.
+        :return: Such path, or None if unknown without importing the class.
+        :rtype: str
+        """
+        return self._path
+
+    @property
+    def resolved(self) -> bool:
+        """
+        Checks whether the class has been imported already.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._resolved is not None
+
+    def resolve(self) -> Type:
+        """
+        Imports the d-bus event class, the first time it's called.
+        :return: The class.
+        :rtype: Type[pythoneda.shared.infrastructure.dbus.DbusEvent]
+        """
+        if self._resolved is None:
+            module = importlib.import_module(self._module_name)
+            self._resolved = getattr(module, self._class_name)
+            DbusEventReference.logger().debug(f"Imported {self.interface}")
+        return self._resolved
+
+    def __repr__(self) -> str:
+        """
+        Provides a text representation of this instance.
+        :return: Such representation.
+        :rtype: str
+        """
+        return f"<{self.__class__.__name__} {self.interface}>"
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,96 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/dbus/dbus_event_registry.py
+
+This file defines the DbusEventRegistry class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared import BaseObject, full_class_name
+from typing import Type
+
+
+class DbusEventRegistry(BaseObject):
+    """
+    Index of the known d-bus event classes.
+
+    Class name: DbusEventRegistry
+
+    Responsibilities:
+        - Keep track of d-bus event classes as they get defined.
+        - Find d-bus event classes by interface name, or by class name.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.dbus.DbusEvent: Registers its subclasses.
+        - pythoneda.shared.infrastructure.dbus.DbusSignalListener: Finds the classes of incoming signals.
+    """
+
+    _by_interface = {}
+    _by_name = {}
+    _ambiguous_names = set()
+
+    @classmethod
+    def register(cls, dbusEventClass: Type):
+        """
+        Registers given d-bus event class.
+        :param dbusEventClass: The d-bus event class.
+        :type dbusEventClass: Type[pythoneda.shared.infrastructure.dbus.DbusEvent]
+        """
+        interface = full_class_name(dbusEventClass)
+        cls._by_interface[interface] = dbusEventClass
+        name = dbusEventClass.__name__
+        if name not in cls._ambiguous_names:
+            existing = cls._by_name.get(name, None)
+            if existing is None or full_class_name(existing) == interface:
+                cls._by_name[name] = dbusEventClass
+            else:
+                del cls._by_name[name]
+                cls._ambiguous_names.add(name)
+                DbusEventRegistry.logger().debug(
+                    f"{name} is defined in more than one module; it can only be found by interface"
+                )
+
+    @classmethod
+    def find_by_interface(cls, interface: str) -> Type:
+        """
+        Retrieves the d-bus event class for given interface.
+        :param interface: The interface, i.e. the fully-qualified class name.
+        :type interface: str
+        :return: The class, or None if not found.
+        :rtype: Type[pythoneda.shared.infrastructure.dbus.DbusEvent]
+        """
+        return cls._by_interface.get(interface, None)
+
+    @classmethod
+    def find_by_name(cls, className: str) -> Type:
+        """
+        Retrieves the d-bus event class with given name, unless it's ambiguous.
+        :param className: The class name.
+        :type className: str
+        :return: The class, or None if not found or ambiguous.
+        :rtype: Type[pythoneda.shared.infrastructure.dbus.DbusEvent]
+        """
+        return cls._by_name.get(className, None)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,369 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/dbus/dbus_event_scanner.py
+
+This file defines the DbusEventScanner class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import ast
+from .dbus_event_reference import DbusEventReference
+import os
+from pythoneda.shared import BaseObject
+from typing import Dict, List
+
+
+class DbusEventScanner(BaseObject):
+    """
+    Finds d-bus event classes by parsing source files, without importing them.
+
+    Class name: DbusEventScanner
+
+    Responsibilities:
+        - Parse the modules of a package, and resolve their imports.
+        - Find the concrete DbusEvent subclasses, and the event classes they adapt.
+        - Extract their member names and paths, when they are literals.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.dbus.DbusEventReference: The scan results.
+        - pythoneda.shared.infrastructure.dbus.DbusSignals: Uses this class.
+    """
+
+    _dbus_event_names = {
+        "pythoneda.shared.infrastructure.dbus.DbusEvent",
+        "pythoneda.shared.infrastructure.dbus.dbus_event.DbusEvent",
+        "pythoneda.shared.infrastructure.dbus.SchemaDbusEvent",
+        "pythoneda.shared.infrastructure.dbus.schema_dbus_event.SchemaDbusEvent",
+    }
+
+    def __init__(self, package: str, locations: List[str]):
+        """
+        Creates a new DbusEventScanner instance.
+        :param package: The package to scan.
+        :type package: str
+        :param locations: The package locations.
+        :type locations: List[str]
+        """
+        super().__init__()
+        self._package = package
+        self._locations = locations
+        self._classes = {}
+
+    def scan(self) -> List[DbusEventReference]:
+        """
+        Scans the package.
+        Classes count as d-bus events if their bases lead to DbusEvent through
+        classes defined in the package. They count as concrete if they, or such
+        bases, define event_class(), and they don't declare abstract methods.
+        :return: The references to the d-bus event classes found.
+        :rtype: List[pythoneda.shared.infrastructure.dbus.DbusEventReference]
+        """
+        self._classes = {}
+        for location in self._locations:
+            for folder, folders, files in os.walk(location):
+                folders[:] = [name for name in folders if name != "__pycache__"]
+                for name in sorted(files):
+                    if name.endswith(".py"):
+                        self._scan_file(location, os.path.join(folder, name))
+
+        result = []
+        for full_name, info in self._classes.items():
+            if info["abstract"] or not self._is_dbus_event(full_name, set()):
+                continue
+            event_class_name = self._inherited(full_name, "event_class", set())
+            if event_class_name is None:
+                DbusEventScanner.logger().debug(
+                    f"Skipping {full_name}: no event class found without importing it"
+                )
+            else:
+                module_name, class_name = full_name.rsplit(".", 1)
+                result.append(
+                    DbusEventReference(
+                        module_name,
+                        class_name,
+                        event_class_name,
+                        self._inherited(full_name, "member", set()),
+                        self._inherited(full_name, "path", set()),
+                    )
+                )
+
+        return result
+
+    def _module_name(self, location: str, filePath: str) -> str:
+        """
+        Retrieves the name of the module in given file.
+        :param location: The package location.
+        :type location: str
+        :param filePath: The file.
+        :type filePath: str
+        :return: The module name.
+        :rtype: str
+        """
+        relative = os.path.relpath(filePath, location)[: -len(".py")]
+        parts = [self._package] + relative.split(os.sep)
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+
+        return ".".join(parts)
+
+    def _scan_file(self, location: str, filePath: str):
+        """
+        Collects the classes defined in given file.
+        :param location: The package location.
+        :type location: str
+        :param filePath: The file.
+        :type filePath: str
+        """
+        module_name = self._module_name(location, filePath)
+        tree = None
+        try:
+            with open(filePath, "rb") as file:
+                tree = ast.parse(file.read(), filePath)
+        except (OSError, SyntaxError, ValueError) as err:
+            DbusEventScanner.logger().error(f"Could not parse {filePath}: {err}")
+
+        if tree is not None:
+            is_package = os.path.basename(filePath) == "__init__.py"
+            names = self._imported_names(tree, module_name, is_package)
+            classes = [node for node in tree.body if isinstance(node, ast.ClassDef)]
+            for node in classes:
+                names[node.name] = f"{module_name}.{node.name}"
+            for node in classes:
+                self._classes[f"{module_name}.{node.name}"] = self._class_info(
+                    node, names
+                )
+
+    def _imported_names(
+        self, tree: ast.Module, moduleName: str, isPackage: bool
+    ) -> Dict[str, str]:
+        """
+        Resolves the names imported by given module.
+        :param tree: The module syntax tree.
+        :type tree: ast.Module
+        :param moduleName: The module name.
+        :type moduleName: str
+        :param isPackage: Whether the module is a package's __init__.
+        :type isPackage: bool
+        :return: The fully-qualified name of each imported name.
+        :rtype: Dict[str, str]
+        """
+        result = {}
+        current_package = moduleName if isPackage else moduleName.rpartition(".")[0]
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.asname is None:
+                        head = alias.name.split(".")[0]
+                        result[head] = head
+                    else:
+                        result[alias.asname] = alias.name
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                if node.level > 0:
+                    parent = current_package.split(".")
+                    if node.level > 1:
+                        parent = parent[: -(node.level - 1)]
+                    base = ".".join(parent + ([base] if base else []))
+                for alias in node.names:
+                    if alias.name != "*":
+                        result[alias.asname or alias.name] = f"{base}.{alias.name}"
+
+        return result
+
+    def _resolve(self, node: ast.expr, names: Dict[str, str]) -> str:
+        """
+        Resolves given expression to a fully-qualified name.
+        :param node: The expression.
+        :type node: ast.expr
+        :param names: The names known in the module.
+        :type names: Dict[str, str]
+        :return: The fully-qualified name, or None if it cannot be resolved.
+        :rtype: str
+        """
+        result = None
+        if isinstance(node, ast.Name):
+            result = names.get(node.id, None)
+        elif isinstance(node, ast.Attribute):
+            head = self._resolve(node.value, names)
+            if head is not None:
+                result = f"{head}.{node.attr}"
+        elif isinstance(node, ast.Subscript):
+            result = self._resolve(node.value, names)
+
+        return result
+
+    def _class_info(self, node: ast.ClassDef, names: Dict[str, str]) -> Dict:
+        """
+        Extracts the relevant information of given class.
+        :param node: The class definition.
+        :type node: ast.ClassDef
+        :param names: The names known in the module.
+        :type names: Dict[str, str]
+        :return: The bases, the adapted event class, the member, the path, which
+        of those three it defines, and whether it declares abstract methods.
+        :rtype: Dict
+        """
+        result = {
+            "bases": [self._resolve(base, names) for base in node.bases],
+            "event_class": None,
+            "member": None,
+            "path": None,
+            "defined": set(),
+            "abstract": False,
+        }
+        for item in node.body:
+            if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                if any(
+                    (self._resolve(decorator, names) or "").endswith("abstractmethod")
+                    for decorator in item.decorator_list
+                ):
+                    result["abstract"] = True
+                elif item.name == "event_class":
+                    result["event_class"] = self._returned(item, names)
+                    result["defined"].add("event_class")
+                elif item.name == "name":
+                    result["member"] = self._returned_literal(item)
+                    result["defined"].add("member")
+                elif item.name == "__init__":
+                    result["path"] = self._super_init_literal(item)
+                    result["defined"].add("path")
+
+        return result
+
+    def _returned(self, function: ast.FunctionDef, names: Dict[str, str]) -> str:
+        """
+        Retrieves the fully-qualified name returned by given function.
+        :param function: The function.
+        :type function: ast.FunctionDef
+        :param names: The names known in the module.
+        :type names: Dict[str, str]
+        :return: Such name, or None if it's not a plain name.
+        :rtype: str
+        """
+        result = None
+        for node in ast.walk(function):
+            if isinstance(node, ast.Return) and node.value is not None:
+                result = self._resolve(node.value, names)
+                break
+
+        return result
+
+    def _returned_literal(self, function: ast.FunctionDef) -> str:
+        """
+        Retrieves the string literal returned by given function.
+        :param function: The function.
+        :type function: ast.FunctionDef
+        :return: Such literal, or None if it doesn't return one.
+        :rtype: str
+        """
+        result = None
+        for node in ast.walk(function):
+            if (
+                isinstance(node, ast.Return)
+                and isinstance(node.value, ast.Constant)
+                and isinstance(node.value.value, str)
+            ):
+                result = node.value.value
+                break
+
+        return result
+
+    def _super_init_literal(self, function: ast.FunctionDef) -> str:
+        """
+        Retrieves the string literal passed to super().__init__() in given function.
+        :param function: The function.
+        :type function: ast.FunctionDef
+        :return: Such literal, or None if there's none.
+        :rtype: str
+        """
+        result = None
+        for node in ast.walk(function):
+            if (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Attribute)
+                and node.func.attr == "__init__"
+                and isinstance(node.func.value, ast.Call)
+                and isinstance(node.func.value.func, ast.Name)
+                and node.func.value.func.id == "super"
+                and node.args
+                and isinstance(node.args[0], ast.Constant)
+                and isinstance(node.args[0].value, str)
+            ):
+                result = node.args[0].value
+                break
+
+        return result
+
+    def _is_dbus_event(self, fullName: str, visited: set) -> bool:
+        """
+        Checks whether given class leads to DbusEvent.
+        :param fullName: The fully-qualified class name.
+        :type fullName: str
+        :param visited: The classes already checked, to avoid cycles.
+        :type visited: set
+        :return: True in such case.
+        :rtype: bool
+        """
+        result = False
+        info = self._classes.get(fullName, None)
+        if info is not None and fullName not in visited:
+            visited.add(fullName)
+            for base in info["bases"]:
+                if base in self.__class__._dbus_event_names or (
+                    base is not None and self._is_dbus_event(base, visited)
+                ):
+                    result = True
+                    break
+
+        return result
+
+    def _inherited(self, fullName: str, key: str, visited: set) -> str:
+        """
+        Retrieves given information of given class, or of its closest base defining it.
+        Classes defining it with something other than a literal get None, so it's
+        found out by importing them.
+        :param fullName: The fully-qualified class name.
+        :type fullName: str
+        :param key: The information key.
+        :type key: str
+        :param visited: The classes already checked, to avoid cycles.
+        :type visited: set
+        :return: The information, or None if not found.
+        :rtype: str
+        """
+        result = None
+        info = self._classes.get(fullName, None)
+        if info is not None and fullName not in visited:
+            visited.add(fullName)
+            result = info[key]
+            if key not in info["defined"]:
+                for base in info["bases"]:
+                    if base is not None:
+                        result = self._inherited(base, key, visited)
+                        if result is not None:
+                            break
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
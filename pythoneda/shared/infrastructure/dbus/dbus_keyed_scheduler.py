@@ -0,0 +1,139 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/dbus/dbus_keyed_scheduler.py
+
+This file defines the DbusKeyedScheduler class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared import BaseObject
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class DbusKeyedScheduler(BaseObject):
+    """
+    Runs items with the same key one after another, and items with different keys concurrently.
+
+    Class name: DbusKeyedScheduler
+
+    Responsibilities:
+        - Serialize the processing of items sharing a key, in submission order.
+        - Let items with different keys, or no key at all, run concurrently.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.dbus.DbusSignalListener: Uses this class.
+    """
+
+    def __init__(self, handler: Callable[[Any], Awaitable]):
+        """
+        Creates a new DbusKeyedScheduler instance.
+        :param handler: The coroutine function processing each item.
+        :type handler: Callable[[Any], Awaitable]
+        """
+        super().__init__()
+        self._handler = handler
+        self._tails = {}
+        self._pending = 0
+
+    @property
+    def active_keys(self) -> int:
+        """
+        Retrieves the number of keys being processed.
+        :return: Such number.
+        :rtype: int
+        """
+        return len(self._tails)
+
+    @property
+    def pending(self) -> int:
+        """
+        Retrieves the number of items waiting for an earlier item with the same key.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._pending
+
+    async def run(self, key: Hashable, item: Any):
+        """
+        Processes given item, once the items with the same key submitted before
+        it are done. It returns only after processing it, so callers drawing
+        from a bounded queue keep holding their slot while they wait.
+        The turn is taken before the first suspension point, so items are
+        processed in the order in which run() is called.
+        :param key: The key, or None if the item can run concurrently with any other.
+        :type key: Hashable
+        :param item: The item.
+        :type item: Any
+        """
+        if key is None:
+            await self._handler(item)
+        else:
+            previous = self._tails.get(key, None)
+            done = asyncio.get_running_loop().create_future()
+            self._tails[key] = done
+            try:
+                if previous is not None:
+                    self._pending += 1
+                    try:
+                        await asyncio.shield(previous)
+                    finally:
+                        self._pending -= 1
+                await self._run_safely(key, item)
+            finally:
+                if previous is None or previous.done():
+                    self._release(key, done)
+                else:
+                    # Cancelled while waiting: the next item still waits for the
+                    # previous one.
+                    previous.add_done_callback(lambda _: self._release(key, done))
+
+    def _release(self, key: Hashable, done: asyncio.Future):
+        """
+        Lets the next item with given key run.
+        :param key: The key.
+        :type key: Hashable
+        :param done: The future the next item waits for.
+        :type done: asyncio.Future
+        """
+        done.set_result(None)
+        if self._tails.get(key, None) is done:
+            del self._tails[key]
+
+    async def _run_safely(self, key: Hashable, item: Any):
+        """
+        Processes given item, logging any error so that the key's backlog goes on.
+        :param key: The key.
+        :type key: Hashable
+        :param item: The item.
+        :type item: Any
+        """
+        try:
+            await self._handler(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            DbusKeyedScheduler.logger().error(f"Error processing item for {key}: {err}")
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
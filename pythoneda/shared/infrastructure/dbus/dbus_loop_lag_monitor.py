@@ -0,0 +1,148 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/dbus/dbus_loop_lag_monitor.py
+
+This file defines the DbusLoopLagMonitor class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from collections import deque
+from pythoneda.shared import BaseObject
+import time
+
+
+class DbusLoopLagMonitor(BaseObject):
+    """
+    Measures how late the event loop wakes up timers, i.e. how long it's blocked.
+
+    Class name: DbusLoopLagMonitor
+
+    Responsibilities:
+        - Sleep periodically, and record how much later than expected it woke up.
+        - Provide the maximum, mean and percentiles of the recent lags.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.dbus.DbusSignalListener: Monitors its loop.
+    """
+
+    def __init__(self, interval: float = 0.1, window: int = 1024):
+        """
+        Creates a new DbusLoopLagMonitor instance.
+        :param interval: How often to measure, in seconds.
+        :type interval: float
+        :param window: The number of recent lags kept for percentiles.
+        :type window: int
+        """
+        super().__init__()
+        self._interval = interval
+        self._lags = deque(maxlen=window)
+        self._samples = 0
+        self._total = 0.0
+        self._max = 0.0
+        self._task = None
+
+    @property
+    def samples(self) -> int:
+        """
+        Retrieves the number of measurements.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._samples
+
+    @property
+    def max(self) -> float:
+        """
+        Retrieves the largest lag measured.
+        :return: Such lag, in seconds.
+        :rtype: float
+        """
+        return self._max
+
+    @property
+    def mean(self) -> float:
+        """
+        Retrieves the mean lag.
+        :return: Such lag, in seconds.
+        :rtype: float
+        """
+        if self._samples == 0:
+            return 0.0
+        return self._total / self._samples
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Retrieves given percentile of the recent lags.
+        :param fraction: The percentile, between 0 and 1.
+        :type fraction: float
+        :return: Such lag, in seconds.
+        :rtype: float
+        """
+        result = 0.0
+        if self._lags:
+            lags = sorted(self._lags)
+            result = lags[min(int(len(lags) * fraction), len(lags) - 1)]
+
+        return result
+
+    def reset(self):
+        """
+        Discards the measurements so far.
+        """
+        self._lags.clear()
+        self._samples = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def start(self):
+        """
+        Starts measuring, in the running loop.
+        """
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        """
+        Stops measuring.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        """
+        Measures until stopped.
+        """
+        while True:
+            expected = time.perf_counter() + self._interval
+            await asyncio.sleep(self._interval)
+            lag = max(time.perf_counter() - expected, 0.0)
+            self._lags.append(lag)
+            self._samples += 1
+            self._total += lag
+            if lag > self._max:
+                self._max = lag
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
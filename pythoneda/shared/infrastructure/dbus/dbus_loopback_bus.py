@@ -0,0 +1,263 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/dbus/dbus_loopback_bus.py
+
+This file defines the DbusLoopbackBus class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from dbus_next import BusType, Message, MessageType
+from .dbus_loopback_daemon import DbusLoopbackDaemon
+from dbus_next.service import ServiceInterface
+from pythoneda.shared import BaseObject
+from typing import Callable
+
+
+class DbusLoopbackBus(BaseObject):
+    """
+    An in-process replacement for dbus_next.aio.MessageBus, with no d-bus daemon.
+
+    Class name: DbusLoopbackBus
+
+    Responsibilities:
+        - Offer the subset of the MessageBus API used by emitters and listeners.
+        - Send signals through the loopback daemon of its bus type.
+        - Deliver incoming signals to its handlers asynchronously, as a socket would.
+        - Pause delivering them when asked to, keeping them meanwhile.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.dbus.DbusLoopbackDaemon: Routes the signals.
+        - pythoneda.shared.infrastructure.dbus.DbusConnectionPool: Creates loopback buses through its bus factory.
+    """
+
+    def __init__(
+        self, bus_type: BusType = BusType.SESSION, negotiate_unix_fd: bool = False
+    ):
+        """
+        Creates a new DbusLoopbackBus instance.
+        Parameters are named after the ones of dbus_next.aio.MessageBus.
+        :param bus_type: The bus type.
+        :type bus_type: dbus_next.BusType
+        :param negotiate_unix_fd: Whether file descriptors can be passed.
+        :type negotiate_unix_fd: bool
+        """
+        super().__init__()
+        self._bus_type = bus_type
+        self._negotiate_unix_fd = negotiate_unix_fd
+        self._daemon = DbusLoopbackDaemon.instance(bus_type)
+        self._unique_name = None
+        self._handlers = []
+        self._exported = {}
+        self._serial = 0
+        self._paused = None
+        self._disconnected = None
+
+    @property
+    def unique_name(self) -> str:
+        """
+        Retrieves the unique name assigned by the loopback daemon.
+        :return: Such name, or None if not connected.
+        :rtype: str
+        """
+        return self._unique_name
+
+    @property
+    def connected(self) -> bool:
+        """
+        Checks whether the bus is connected.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._unique_name is not None
+
+    async def connect(self) -> "DbusLoopbackBus":
+        """
+        Connects to the loopback daemon.
+        :return: This bus.
+        :rtype: pythoneda.shared.infrastructure.dbus.DbusLoopbackBus
+        """
+        if self._unique_name is None:
+            self._unique_name = self._daemon.attach(self)
+            self._disconnected = asyncio.get_running_loop().create_future()
+        return self
+
+    def disconnect(self):
+        """
+        Disconnects from the loopback daemon.
+        """
+        if self._unique_name is not None:
+            self._daemon.detach(self._unique_name)
+            self._unique_name = None
+            if self._disconnected is not None and not self._disconnected.done():
+                self._disconnected.set_result(None)
+
+    async def wait_for_disconnect(self):
+        """
+        Waits until the bus is disconnected.
+        """
+        if self._disconnected is not None:
+            await self._disconnected
+
+    def export(self, path: str, interface: ServiceInterface):
+        """
+        Exports given interface. Loopback buses only keep track of it.
+        :param path: The d-bus path.
+        :type path: str
+        :param interface: The interface.
+        :type interface: dbus_next.service.ServiceInterface
+        """
+        self._exported[(path, interface.name)] = interface
+
+    def unexport(self, path: str, interface: ServiceInterface = None):
+        """
+        Unexports given interface, or all interfaces on given path.
+        :param path: The d-bus path.
+        :type path: str
+        :param interface: The interface, or None for all of them.
+        :type interface: dbus_next.service.ServiceInterface
+        """
+        for key in list(self._exported.keys()):
+            if key[0] == path and (interface is None or key[1] == interface.name):
+                del self._exported[key]
+
+    def add_message_handler(self, handler: Callable[[Message], bool]):
+        """
+        Adds a handler for incoming messages.
+        :param handler: The handler.
+        :type handler: Callable[[dbus_next.Message], bool]
+        """
+        self._handlers.append(handler)
+
+    def remove_message_handler(self, handler: Callable[[Message], bool]):
+        """
+        Removes a handler for incoming messages.
+        :param handler: The handler.
+        :type handler: Callable[[dbus_next.Message], bool]
+        """
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    def send(self, message: Message) -> asyncio.Future:
+        """
+        Sends given message through the loopback daemon.
+        :param message: The message.
+        :type message: dbus_next.Message
+        :return: A future, done once the message is routed.
+        :rtype: asyncio.Future
+        """
+        result = asyncio.get_running_loop().create_future()
+        if self._unique_name is None:
+            result.set_exception(ConnectionError("Loopback bus not connected"))
+        elif message.unix_fds and not self._negotiate_unix_fd:
+            result.set_exception(
+                ValueError("File descriptors were not negotiated on this bus")
+            )
+        else:
+            self._serial += 1
+            message.serial = self._serial
+            message.sender = self._unique_name
+            if message.message_type == MessageType.SIGNAL:
+                self._daemon.route(message)
+            result.set_result(None)
+
+        return result
+
+    async def call(self, message: Message) -> Message:
+        """
+        Sends given method call. Only AddMatch and RemoveMatch on
+        org.freedesktop.DBus are supported.
+        :param message: The method call.
+        :type message: dbus_next.Message
+        :return: The reply.
+        :rtype: dbus_next.Message
+        """
+        if self._unique_name is None:
+            raise ConnectionError("Loopback bus not connected")
+        if message.destination != "org.freedesktop.DBus" or message.member not in (
+            "AddMatch",
+            "RemoveMatch",
+        ):
+            raise NotImplementedError(
+                f"Loopback buses do not support {message.destination} {message.member}"
+            )
+        if not message.serial:
+            self._serial += 1
+            message.serial = self._serial
+        if message.member == "AddMatch":
+            self._daemon.add_match(self._unique_name, message.body[0])
+        else:
+            self._daemon.remove_match(self._unique_name, message.body[0])
+
+        return Message.new_method_return(message)
+
+    def pause_reading(self):
+        """
+        Stops passing incoming signals to the handlers. They are kept, in
+        order, until resume_reading() is called.
+        """
+        if self._paused is None:
+            self._paused = []
+
+    def resume_reading(self):
+        """
+        Passes the signals kept while paused to the handlers, and goes on
+        passing the new ones.
+        """
+        paused = self._paused or []
+        self._paused = None
+        while paused and self._paused is None:
+            self._dispatch(paused.pop(0))
+        if paused:
+            # The handlers paused it again.
+            self._paused[:0] = paused
+
+    def deliver(self, message: Message):
+        """
+        Schedules given message for its handlers, as if it was read from a socket.
+        :param message: The message.
+        :type message: dbus_next.Message
+        """
+        asyncio.get_running_loop().call_soon(self._dispatch, message)
+
+    def _dispatch(self, message: Message):
+        """
+        Passes given message to the handlers, until one of them processes it,
+        unless reading is paused.
+        :param message: The message.
+        :type message: dbus_next.Message
+        """
+        if self._paused is not None:
+            self._paused.append(message)
+        else:
+            for handler in list(self._handlers):
+                try:
+                    if handler(message):
+                        break
+                except Exception as err:
+                    DbusLoopbackBus.logger().error(
+                        f"Error in message handler for {message.member}: {err}"
+                    )
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,259 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/dbus/dbus_loopback_daemon.py
+
+This file defines the DbusLoopbackDaemon class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from dbus_next import BusType, Message, MessageType
+import os
+from pythoneda.shared import BaseObject
+import re
+from typing import Dict
+
+
+class DbusLoopbackDaemon(BaseObject):
+    """
+    An in-process stand-in for the d-bus daemon, routing signals between loopback buses.
+
+    Class name: DbusLoopbackDaemon
+
+    Responsibilities:
+        - Keep track of the connected loopback buses, and their match rules.
+        - Deliver each signal to every bus with a matching rule, as the daemon does.
+        - Duplicate passed file descriptors for each receiver.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.dbus.DbusLoopbackBus: Connects to it.
+    """
+
+    _instances = {}
+
+    _rule_pattern = re.compile(r"(\w+)='([^']*)'")
+
+    _supported_keys = {
+        "type",
+        "sender",
+        "interface",
+        "member",
+        "path",
+        "path_namespace",
+        "destination",
+    }
+
+    _message_types = {
+        "signal": MessageType.SIGNAL,
+        "method_call": MessageType.METHOD_CALL,
+        "method_return": MessageType.METHOD_RETURN,
+        "error": MessageType.ERROR,
+    }
+
+    def __init__(self):
+        """
+        Creates a new DbusLoopbackDaemon instance.
+        """
+        super().__init__()
+        self._buses = {}
+        self._rules = {}
+        self._next_id = 1
+        self._routed = 0
+        self._delivered = 0
+
+    @classmethod
+    def instance(cls, busType: BusType) -> "DbusLoopbackDaemon":
+        """
+        Retrieves the daemon for given bus type, in this process.
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        :return: Such daemon.
+        :rtype: pythoneda.shared.infrastructure.dbus.DbusLoopbackDaemon
+        """
+        result = cls._instances.get(busType, None)
+        if result is None:
+            result = cls()
+            cls._instances[busType] = result
+
+        return result
+
+    @classmethod
+    def reset(cls):
+        """
+        Discards all daemons, along with their buses and rules.
+        """
+        cls._instances = {}
+
+    @property
+    def routed(self) -> int:
+        """
+        Retrieves the number of signals routed.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._routed
+
+    @property
+    def delivered(self) -> int:
+        """
+        Retrieves the number of signals delivered, counting each receiver.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._delivered
+
+    def attach(self, bus: "DbusLoopbackBus") -> str:
+        """
+        Connects given bus.
+        :param bus: The bus.
+        :type bus: pythoneda.shared.infrastructure.dbus.DbusLoopbackBus
+        :return: Its unique name.
+        :rtype: str
+        """
+        result = f":loopback.{self._next_id}"
+        self._next_id += 1
+        self._buses[result] = bus
+        self._rules[result] = []
+
+        return result
+
+    def detach(self, uniqueName: str):
+        """
+        Disconnects the bus with given name, dropping its rules.
+        :param uniqueName: The unique name of the bus.
+        :type uniqueName: str
+        """
+        self._buses.pop(uniqueName, None)
+        self._rules.pop(uniqueName, None)
+
+    def parse_rule(self, rule: str) -> Dict[str, str]:
+        """
+        Parses given match rule.
+        :param rule: The rule, e.g. "type='signal',interface='a.b',path_namespace='/a'".
+        :type rule: str
+        :return: Each key, with its value.
+        :rtype: Dict[str, str]
+        """
+        result = dict(self.__class__._rule_pattern.findall(rule))
+        unsupported = [
+            key for key in result if key not in self.__class__._supported_keys
+        ]
+        if unsupported:
+            raise ValueError(f"Unsupported match rule keys: {unsupported}")
+
+        return result
+
+    def add_match(self, uniqueName: str, rule: str):
+        """
+        Adds a match rule for given bus.
+        :param uniqueName: The unique name of the bus.
+        :type uniqueName: str
+        :param rule: The rule.
+        :type rule: str
+        """
+        self._rules[uniqueName].append((rule, self.parse_rule(rule)))
+
+    def remove_match(self, uniqueName: str, rule: str):
+        """
+        Removes a match rule of given bus.
+        :param uniqueName: The unique name of the bus.
+        :type uniqueName: str
+        :param rule: The rule.
+        :type rule: str
+        """
+        rules = self._rules[uniqueName]
+        for index, (text, _) in enumerate(rules):
+            if text == rule:
+                del rules[index]
+                break
+
+    def matches(self, criteria: Dict[str, str], message: Message) -> bool:
+        """
+        Checks whether given message matches given rule.
+        :param criteria: The parsed rule.
+        :type criteria: Dict[str, str]
+        :param message: The message.
+        :type message: dbus_next.Message
+        :return: True in such case.
+        :rtype: bool
+        """
+        result = True
+        for key, value in criteria.items():
+            if key == "type":
+                message_type = self.__class__._message_types.get(value, None)
+                result = message_type == message.message_type
+            elif key == "path_namespace":
+                path = message.path or ""
+                result = (
+                    value == "/"
+                    or path == value
+                    or path.startswith(value.rstrip("/") + "/")
+                )
+            else:
+                result = getattr(message, key, None) == value
+            if not result:
+                break
+
+        return result
+
+    def route(self, message: Message):
+        """
+        Delivers given signal to every bus with a matching rule, once per bus.
+        :param message: The signal.
+        :type message: dbus_next.Message
+        """
+        self._routed += 1
+        for unique_name, rules in list(self._rules.items()):
+            if any(self.matches(criteria, message) for _, criteria in rules):
+                bus = self._buses.get(unique_name, None)
+                if bus is not None:
+                    bus.deliver(self._copy_for_receiver(message))
+                    self._delivered += 1
+
+    def _copy_for_receiver(self, message: Message) -> Message:
+        """
+        Copies given message for a receiver. File descriptors are duplicated, as
+        the kernel does when passing them, so that each side closes its own.
+        :param message: The message.
+        :type message: dbus_next.Message
+        :return: The copy, or the same message if it has no file descriptors.
+        :rtype: dbus_next.Message
+        """
+        result = message
+        if message.unix_fds:
+            result = Message(
+                destination=message.destination,
+                path=message.path,
+                interface=message.interface,
+                member=message.member,
+                message_type=message.message_type,
+                sender=message.sender,
+                unix_fds=[os.dup(fd) for fd in message.unix_fds],
+                signature=message.signature,
+                body=message.body,
+                serial=message.serial,
+            )
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
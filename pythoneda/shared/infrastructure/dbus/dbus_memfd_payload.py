@@ -0,0 +1,129 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/dbus/dbus_memfd_payload.py
+
+This file defines the DbusMemfdPayload class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from dbus_next import Message
+import fcntl
+import mmap
+import os
+from pythoneda.shared import BaseObject
+from typing import Tuple
+
+
+class DbusMemfdPayload(BaseObject):
+    """
+    Moves large binary envelopes out of d-bus messages, into sealed memory files.
+
+    Class name: DbusMemfdPayload
+
+    Responsibilities:
+        - Write an envelope to a memfd, and seal it so that it cannot change.
+        - Replace the envelope in a signal with the file descriptor.
+        - Map a received memfd, after checking it's sealed.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.dbus.DbusSignalEmitter: Sends large envelopes this way.
+        - pythoneda.shared.infrastructure.dbus.SchemaDbusEvent: Reads them back.
+    """
+
+    _required_seals = (
+        getattr(fcntl, "F_SEAL_SEAL", 0)
+        | getattr(fcntl, "F_SEAL_SHRINK", 0)
+        | getattr(fcntl, "F_SEAL_GROW", 0)
+        | getattr(fcntl, "F_SEAL_WRITE", 0)
+    )
+
+    @classmethod
+    def available(cls) -> bool:
+        """
+        Checks whether sealed memory files are supported (Linux only).
+        :return: True in such case.
+        :rtype: bool
+        """
+        return hasattr(os, "memfd_create") and hasattr(fcntl, "F_ADD_SEALS")
+
+    @classmethod
+    def create(cls, data: bytes) -> int:
+        """
+        Writes given data to a new memfd, and seals it.
+        :param data: The data.
+        :type data: bytes
+        :return: The file descriptor. The caller must close it.
+        :rtype: int
+        """
+        result = os.memfd_create(
+            "pythoneda-dbus-payload", os.MFD_CLOEXEC | os.MFD_ALLOW_SEALING
+        )
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(result, view) :]
+            fcntl.fcntl(result, fcntl.F_ADD_SEALS, cls._required_seals)
+        except BaseException:
+            os.close(result)
+            raise
+
+        return result
+
+    @classmethod
+    def externalize(cls, message: Message) -> Tuple[Message, int]:
+        """
+        Builds a copy of given signal, with its binary envelope in a memfd.
+        :param message: The signal, with an "ay" signature.
+        :type message: dbus_next.Message
+        :return: The new signal, with an "h" signature, and the file descriptor. The caller must close it once sent.
+        :rtype: Tuple[dbus_next.Message, int]
+        """
+        fd = cls.create(message.body[0])
+        return (
+            Message.new_signal(
+                message.path,
+                message.interface,
+                message.member,
+                "h",
+                [0],
+                unix_fds=[fd],
+            ),
+            fd,
+        )
+
+    @classmethod
+    def map(cls, fd: int) -> mmap.mmap:
+        """
+        Maps given memfd read-only, after checking nobody can modify it anymore.
+        :param fd: The file descriptor.
+        :type fd: int
+        :return: The mapping. The caller must close it.
+        :rtype: mmap.mmap
+        """
+        seals = fcntl.fcntl(fd, fcntl.F_GET_SEALS)
+        if seals & cls._required_seals != cls._required_seals:
+            raise ValueError(f"Refusing to map an unsealed payload (seals {seals:#x})")
+        return mmap.mmap(fd, 0, prot=mmap.PROT_READ)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,274 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/dbus/dbus_message_compressor.py
+
+This file defines the DbusMessageCompressor class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from .compression import Compression
+from dbus_next import Message
+from .dbus_memfd_payload import DbusMemfdPayload
+import json
+import lzma
+import os
+from pythoneda.shared import BaseObject
+import struct
+import time
+import zlib
+
+
+class DbusMessageCompressor(BaseObject):
+    """
+    Compresses large d-bus signal bodies, and decompresses them back.
+
+    Class name: DbusMessageCompressor
+
+    Responsibilities:
+        - Compress bodies above a threshold, in binary envelopes flagged as compressed.
+        - Restore the original signal from such envelopes.
+        - Keep track of the compression ratio and the CPU time spent.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.dbus.DbusSignalEmitter: Compresses signals.
+        - pythoneda.shared.infrastructure.dbus.DbusSignalListener: Decompresses them.
+    """
+
+    # Same header as the binary envelopes of DbusEventCodec: version and flags.
+    _envelope_header = struct.Struct("<BB")
+    _envelope_version = 1
+    _algorithm_flags = {Compression.ZLIB: 0x01, Compression.LZMA: 0x02}
+    _algorithm_mask = 0x0F
+    # The envelope holds a JSON array with the original signature and body.
+    _wrapped_flag = 0x10
+
+    def __init__(self, threshold: int = 65536, level: int = 6):
+        """
+        Creates a new DbusMessageCompressor instance.
+        :param threshold: The minimum body size to compress, in bytes.
+        :type threshold: int
+        :param level: The compression level, from 0 to 9.
+        :type level: int
+        """
+        super().__init__()
+        self._threshold = threshold
+        self._level = level
+        self._compressed = 0
+        self._compressed_bytes_in = 0
+        self._compressed_bytes_out = 0
+        self._compression_seconds = 0.0
+        self._decompressed = 0
+        self._decompression_seconds = 0.0
+
+    @property
+    def threshold(self) -> int:
+        """
+        Retrieves the minimum body size to compress.
+        :return: Such size, in bytes.
+        :rtype: int
+        """
+        return self._threshold
+
+    @property
+    def compressed(self) -> int:
+        """
+        Retrieves the number of signals compressed.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._compressed
+
+    @property
+    def compressed_bytes_in(self) -> int:
+        """
+        Retrieves the size of the bodies before compressing them.
+        :return: Such size, in bytes.
+        :rtype: int
+        """
+        return self._compressed_bytes_in
+
+    @property
+    def compressed_bytes_out(self) -> int:
+        """
+        Retrieves the size of the bodies after compressing them.
+        :return: Such size, in bytes.
+        :rtype: int
+        """
+        return self._compressed_bytes_out
+
+    @property
+    def ratio(self) -> float:
+        """
+        Retrieves the overall compression ratio.
+        :return: The compressed size divided by the original size, or 1.0 if nothing was compressed.
+        :rtype: float
+        """
+        result = 1.0
+        if self._compressed_bytes_in > 0:
+            result = self._compressed_bytes_out / self._compressed_bytes_in
+
+        return result
+
+    @property
+    def compression_seconds(self) -> float:
+        """
+        Retrieves the CPU time spent compressing.
+        :return: Such time, in seconds.
+        :rtype: float
+        """
+        return self._compression_seconds
+
+    @property
+    def decompressed(self) -> int:
+        """
+        Retrieves the number of signals decompressed.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._decompressed
+
+    @property
+    def decompression_seconds(self) -> float:
+        """
+        Retrieves the CPU time spent decompressing.
+        :return: Such time, in seconds.
+        :rtype: float
+        """
+        return self._decompression_seconds
+
+    def compress(self, message: Message, algorithm: Compression) -> Message:
+        """
+        Compresses given signal, if its body is above the threshold.
+        Binary envelopes are compressed as they are. Other bodies are wrapped
+        first, along with their signature.
+        :param message: The signal.
+        :type message: dbus_next.Message
+        :param algorithm: The algorithm.
+        :type algorithm: pythoneda.shared.infrastructure.dbus.Compression
+        :return: The compressed signal, or the same one if not worth compressing.
+        :rtype: dbus_next.Message
+        """
+        result = message
+        cls = self.__class__
+        body = message.body
+        if message.signature == "ay":
+            size = len(body[0])
+        else:
+            size = sum(len(item) for item in body if isinstance(item, (str, bytes)))
+        if size >= self._threshold:
+            start = time.thread_time()
+            flags = cls._algorithm_flags[algorithm]
+            try:
+                if message.signature == "ay":
+                    header = cls._envelope_header.unpack_from(body[0])
+                    version, envelope_flags = header
+                    payload = body[0][cls._envelope_header.size :]
+                else:
+                    version, envelope_flags = cls._envelope_version, 0
+                    flags |= cls._wrapped_flag
+                    payload = json.dumps([message.signature, body]).encode("utf-8")
+                if envelope_flags == 0:
+                    if algorithm == Compression.LZMA:
+                        packed = lzma.compress(payload, preset=self._level)
+                    else:
+                        packed = zlib.compress(payload, self._level)
+                    if len(packed) < len(payload):
+                        result = Message.new_signal(
+                            message.path,
+                            message.interface,
+                            message.member,
+                            "ay",
+                            [cls._envelope_header.pack(version, flags) + packed],
+                        )
+                        self._compressed += 1
+                        self._compressed_bytes_in += len(payload)
+                        self._compressed_bytes_out += len(packed)
+            except (TypeError, ValueError) as err:
+                DbusMessageCompressor.logger().debug(
+                    f"Not compressing {message.member}: {err}"
+                )
+            self._compression_seconds += time.thread_time() - start
+
+        return result
+
+    def decompress(self, message: Message) -> Message:
+        """
+        Restores given signal, if it's compressed. Envelopes passed as file
+        descriptors are mapped to check, and the descriptor is closed if so.
+        :param message: The signal.
+        :type message: dbus_next.Message
+        :return: The original signal, or the same one if not compressed.
+        :rtype: dbus_next.Message
+        """
+        result = message
+        if message.signature == "ay":
+            result = self._decompress(message, message.body[0])
+        elif message.signature == "h" and message.unix_fds:
+            fd = message.unix_fds[message.body[0]]
+            with DbusMemfdPayload.map(fd) as data:
+                result = self._decompress(message, data)
+            if result is not message:
+                os.close(fd)
+
+        return result
+
+    def _decompress(self, message: Message, data: bytes) -> Message:
+        """
+        Restores given signal from given envelope, if it's compressed.
+        :param message: The signal.
+        :type message: dbus_next.Message
+        :param data: The envelope.
+        :type data: bytes
+        :return: The original signal, or the same one if not compressed.
+        :rtype: dbus_next.Message
+        """
+        result = message
+        cls = self.__class__
+        if len(data) > cls._envelope_header.size:
+            version, flags = cls._envelope_header.unpack_from(data)
+            algorithm = flags & cls._algorithm_mask
+            if (
+                version == cls._envelope_version
+                and algorithm in cls._algorithm_flags.values()
+            ):
+                start = time.thread_time()
+                payload = data[cls._envelope_header.size :]
+                if algorithm == cls._algorithm_flags[Compression.LZMA]:
+                    payload = lzma.decompress(payload)
+                else:
+                    payload = zlib.decompress(payload)
+                if flags & cls._wrapped_flag:
+                    signature, body = json.loads(payload)
+                else:
+                    signature = "ay"
+                    body = [cls._envelope_header.pack(version, 0) + payload]
+                result = Message.new_signal(
+                    message.path, message.interface, message.member, signature, body
+                )
+                self._decompressed += 1
+                self._decompression_seconds += time.thread_time() - start
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
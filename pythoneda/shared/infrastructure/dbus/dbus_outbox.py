@@ -0,0 +1,446 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/dbus/dbus_outbox.py
+
+This file defines the DbusOutbox class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import base64
+from dbus_next import (
+    BusType,
+    Message,
+    MessageType,
+    SignatureTree,
+    SignatureType,
+    Variant,
+)
+import json
+from pythoneda.shared import BaseObject
+import sqlite3
+import threading
+from typing import Any, Awaitable, Callable, List, Tuple
+
+
+class DbusOutbox(BaseObject):
+    """
+    A durable, SQLite-backed queue of d-bus signals that could not be sent.
+
+    Class name: DbusOutbox
+
+    Responsibilities:
+        - Store signals on disk, field by field, committing them in batches (group commit).
+        - Replay stored signals in order, once the bus is available again.
+
+    Collaborators:
+        - sqlite3: The storage, in WAL mode.
+        - pythoneda.shared.infrastructure.dbus.DbusSignalEmitter: Uses this class.
+    """
+
+    def __init__(self, path: str, batchSize: int = 256, flushInterval: float = 0.01):
+        """
+        Creates a new DbusOutbox instance.
+        :param path: The path of the SQLite database.
+        :type path: str
+        :param batchSize: The number of signals which triggers a commit right away.
+        :type batchSize: int
+        :param flushInterval: How long to wait for more signals before committing, in seconds.
+        :type flushInterval: float
+        """
+        super().__init__()
+        self._path = path
+        self._batch_size = max(1, batchSize)
+        self._flush_interval = flushInterval
+        self._connection = None
+        self._opening = None
+        self._db_lock = threading.Lock()
+        self._pending = []
+        self._waiters = []
+        self._batch_full = None
+        self._flush_task = None
+        self._replay_lock = None
+        self._backlog = 0
+
+    @property
+    def path(self) -> str:
+        """
+        Retrieves the path of the database.
+        :return: Such path.
+        :rtype: str
+        """
+        return self._path
+
+    @property
+    def backlog(self) -> int:
+        """
+        Retrieves the number of signals stored and not yet replayed, once the
+        database is open.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._backlog
+
+    async def has_backlog(self) -> bool:
+        """
+        Checks whether there are signals stored and not yet replayed, opening
+        the database if needed.
+        :return: True in such case.
+        :rtype: bool
+        """
+        await self.open()
+        return self._backlog > 0
+
+    async def open(self):
+        """
+        Opens the database, unless it's already open. It's done in a thread,
+        as the writes are, so that the event loop doesn't wait for the disk.
+        """
+        if self._connection is None:
+            if self._opening is None:
+                self._opening = asyncio.ensure_future(
+                    asyncio.to_thread(self._connect)
+                )
+            opening = self._opening
+            try:
+                await asyncio.shield(opening)
+            finally:
+                if opening.done() and self._opening is opening:
+                    self._opening = None
+
+    def _connect(self):
+        """
+        Connects to the database, creating its table if needed.
+        """
+        connection = sqlite3.connect(self._path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=FULL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS signals ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "bus_type INTEGER NOT NULL, "
+            "destination TEXT, "
+            "path TEXT NOT NULL, "
+            "interface TEXT NOT NULL, "
+            "member TEXT NOT NULL, "
+            "signature TEXT NOT NULL, "
+            "body TEXT NOT NULL)"
+        )
+        connection.commit()
+        (self._backlog,) = connection.execute(
+            "SELECT COUNT(*) FROM signals"
+        ).fetchone()
+        self._connection = connection
+
+    @classmethod
+    def to_row(cls, busType: BusType, message: Message) -> Tuple:
+        """
+        Converts given signal to a row. Its body is stored in JSON, following its
+        signature, so that byte arrays, structs, dictionaries and variants are
+        restored as they were.
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        :param message: The signal.
+        :type message: dbus_next.Message
+        :return: The row, without its id.
+        :rtype: Tuple
+        """
+        if message.unix_fds:
+            raise ValueError("Signals with file descriptors cannot be stored")
+        body = [
+            cls._to_json(signature_type, value)
+            for signature_type, value in zip(
+                SignatureTree(message.signature).types, message.body
+            )
+        ]
+
+        return (
+            busType.value,
+            message.destination,
+            message.path,
+            message.interface,
+            message.member,
+            message.signature,
+            json.dumps(body),
+        )
+
+    @classmethod
+    def from_row(cls, row: Tuple) -> Tuple[BusType, Message]:
+        """
+        Restores a signal converted by to_row().
+        :param row: The row, without its id.
+        :type row: Tuple
+        :return: The bus type, and the signal.
+        :rtype: Tuple[dbus_next.BusType, dbus_next.Message]
+        """
+        bus_type, destination, path, interface, member, signature, body = row
+        values = [
+            cls._from_json(signature_type, value)
+            for signature_type, value in zip(
+                SignatureTree(signature).types, json.loads(body)
+            )
+        ]
+
+        return BusType(bus_type), Message(
+            message_type=MessageType.SIGNAL,
+            destination=destination,
+            path=path,
+            interface=interface,
+            member=member,
+            signature=signature,
+            body=values,
+        )
+
+    @classmethod
+    def _to_json(cls, signatureType: SignatureType, value: Any) -> Any:
+        """
+        Converts given value to something JSON can represent.
+        :param signatureType: The d-bus type of the value.
+        :type signatureType: dbus_next.SignatureType
+        :param value: The value.
+        :type value: Any
+        :return: The converted value.
+        :rtype: Any
+        """
+        token = signatureType.token
+        children = signatureType.children
+        if token == "a" and children[0].token == "y":
+            result = base64.b64encode(bytes(value)).decode("ascii")
+        elif token == "a" and children[0].token == "{":
+            key_type, value_type = children[0].children
+            result = [
+                [cls._to_json(key_type, key), cls._to_json(value_type, item)]
+                for key, item in value.items()
+            ]
+        elif token == "a":
+            result = [cls._to_json(children[0], item) for item in value]
+        elif token == "(":
+            result = [
+                cls._to_json(child, item) for child, item in zip(children, value)
+            ]
+        elif token == "v":
+            result = [value.signature, cls._to_json(value.type, value.value)]
+        elif token == "h":
+            raise ValueError("Signals with file descriptors cannot be stored")
+        else:
+            result = value
+
+        return result
+
+    @classmethod
+    def _from_json(cls, signatureType: SignatureType, value: Any) -> Any:
+        """
+        Restores a value converted by _to_json().
+        :param signatureType: The d-bus type of the value.
+        :type signatureType: dbus_next.SignatureType
+        :param value: The converted value.
+        :type value: Any
+        :return: The value.
+        :rtype: Any
+        """
+        token = signatureType.token
+        children = signatureType.children
+        if token == "a" and children[0].token == "y":
+            result = base64.b64decode(value)
+        elif token == "a" and children[0].token == "{":
+            key_type, value_type = children[0].children
+            result = {
+                cls._from_json(key_type, key): cls._from_json(value_type, item)
+                for key, item in value
+            }
+        elif token == "a":
+            result = [cls._from_json(children[0], item) for item in value]
+        elif token == "(":
+            result = [
+                cls._from_json(child, item) for child, item in zip(children, value)
+            ]
+        elif token == "v":
+            signature, item = value
+            result = Variant(
+                signature, cls._from_json(SignatureTree(signature).types[0], item)
+            )
+        else:
+            result = value
+
+        return result
+
+    async def append(self, busType: BusType, message: Message):
+        """
+        Stores given signal. Returns once it's been committed to disk.
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        :param message: The signal.
+        :type message: dbus_next.Message
+        """
+        await self.append_many([(busType, message)])
+
+    async def append_many(self, signals: List[Tuple[BusType, Message]]):
+        """
+        Stores given signals. Returns once they've been committed to disk.
+        Concurrent calls share the same transaction, and therefore the same fsync.
+        :param signals: The bus types and signals.
+        :type signals: List[Tuple[dbus_next.BusType, dbus_next.Message]]
+        """
+        rows = [
+            self.__class__.to_row(bus_type, message) for bus_type, message in signals
+        ]
+        await self.open()
+        if self._batch_full is None:
+            self._batch_full = asyncio.Event()
+        waiter = asyncio.get_running_loop().create_future()
+        self._pending.extend(rows)
+        self._backlog += len(rows)
+        self._waiters.append(waiter)
+        if len(self._pending) >= self._batch_size:
+            self._batch_full.set()
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_batches())
+        await waiter
+
+    async def _flush_batches(self):
+        """
+        Commits pending signals in batches, until there are none left.
+        """
+        try:
+            while self._pending:
+                if len(self._pending) < self._batch_size:
+                    try:
+                        await asyncio.wait_for(
+                            self._batch_full.wait(), self._flush_interval
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                self._batch_full.clear()
+                rows, waiters = self._pending, self._waiters
+                self._pending, self._waiters = [], []
+                try:
+                    await asyncio.to_thread(self._insert, rows)
+                except Exception as err:
+                    self._backlog -= len(rows)
+                    DbusOutbox.logger().error(
+                        f"Could not store {len(rows)} signal(s) in {self._path}: {err}"
+                    )
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_exception(err)
+                else:
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_result(None)
+        finally:
+            self._flush_task = None
+
+    def _insert(self, rows: List[Tuple]):
+        """
+        Inserts given rows in a single transaction.
+        :param rows: The rows.
+        :type rows: List[Tuple]
+        """
+        with self._db_lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO signals (bus_type, destination, path, interface, "
+                "member, signature, body) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def _select(self, limit: int) -> List[Tuple]:
+        """
+        Retrieves the oldest stored rows.
+        :param limit: The maximum number of rows.
+        :type limit: int
+        :return: The rows.
+        :rtype: List[Tuple]
+        """
+        with self._db_lock:
+            return self._connection.execute(
+                "SELECT id, bus_type, destination, path, interface, member, "
+                "signature, body FROM signals ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+    def _delete_up_to(self, rowId: int):
+        """
+        Deletes all rows up to given one.
+        :param rowId: The id of the last row to delete.
+        :type rowId: int
+        """
+        with self._db_lock, self._connection:
+            self._connection.execute("DELETE FROM signals WHERE id <= ?", (rowId,))
+
+    async def flush(self):
+        """
+        Waits until all pending signals have been committed.
+        """
+        while self._flush_task is not None:
+            if self._batch_full is not None:
+                self._batch_full.set()
+            await asyncio.shield(self._flush_task)
+
+    async def replay(self, send: Callable[[BusType, Message], Awaitable]) -> int:
+        """
+        Sends the stored signals, in order, removing them once sent.
+        It stops at the first signal which cannot be sent, raising its error.
+        :param send: The coroutine function to send each signal.
+        :type send: Callable[[dbus_next.BusType, dbus_next.Message], Awaitable]
+        :return: The number of signals sent.
+        :rtype: int
+        """
+        await self.open()
+        if self._replay_lock is None:
+            self._replay_lock = asyncio.Lock()
+        result = 0
+        async with self._replay_lock:
+            while self._backlog > 0:
+                rows = await asyncio.to_thread(self._select, self._batch_size)
+                if not rows:
+                    if self._flush_task is None:
+                        break
+                    await self.flush()
+                    continue
+                last_sent = None
+                sent = 0
+                try:
+                    for row in rows:
+                        await send(*self.__class__.from_row(row[1:]))
+                        last_sent = row[0]
+                        sent += 1
+                finally:
+                    if last_sent is not None:
+                        await asyncio.to_thread(self._delete_up_to, last_sent)
+                        self._backlog -= sent
+                        result += sent
+
+        return result
+
+    async def close(self):
+        """
+        Commits pending signals, and closes the database.
+        """
+        await self.flush()
+        if self._connection is not None:
+            with self._db_lock:
+                self._connection.close()
+            self._connection = None
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -20,11 +20,28 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import abc
+import asyncio
 from dbus_next import BusType, Message, MessageType
 from dbus_next.aio import MessageBus
-from dbus_next.errors import SignatureBodyMismatchError
+from dbus_next.errors import (
+    AuthError,
+    InvalidAddressError,
+    SignatureBodyMismatchError,
+)
+import logging
+import os
+from .dbus_connection_pool import DbusConnectionPool
+from .dbus_emission_record import DbusEmissionRecord
 from .dbus_event import DbusEvent
+from .dbus_event_reference import DbusEventReference
+from .dbus_memfd_payload import DbusMemfdPayload
+from .dbus_message_compressor import DbusMessageCompressor
+from .dbus_outbox import DbusOutbox
 from .dbus_signals import DbusSignals
+from .dbus_work_queue import DbusWorkQueue
+from .discovery_mode import DiscoveryMode
+from .overflow_policy import OverflowPolicy
+from .wire_format import WireFormat
 from pythoneda.shared import attribute, Event, EventEmitter, full_class_name
 from typing import Dict, List, Tuple, Type
 
@@ -41,11 +58,27 @@ class DbusSignalEmitter(EventEmitter, abc.ABC):
 
     Collaborators:
         - pythoneda.shared.application.PythonEDA: Requests emitting events.
+        - pythoneda.shared.infrastructure.dbus.DbusConnectionPool: Provides the d-bus connections.
+        - pythoneda.shared.infrastructure.dbus.DbusWorkQueue: Sends signals in the background, if asked to.
+        - pythoneda.shared.infrastructure.dbus.DbusMemfdPayload: Sends large binary envelopes as file descriptors.
+        - pythoneda.shared.infrastructure.dbus.DbusMessageCompressor: Compresses large signals, if their classes ask for it.
     """
 
+    _compressor = None
+    _connect_timeout = None
+    _bus_factory = None
+    _connection_pool = None
     _count = 0
+    _dispatch = {}
     _events = None
-    _events_by_class = {}
+    _memfd_threshold = None
+    _outbox = None
+    _references = {}
+    _replay_interval = 1.0
+    _replay_task = None
+    _send_queue = None
+    _send_queue_settings = None
+    _wire_format = WireFormat.TEXT
 
     def __init__(self):
         """
@@ -63,21 +96,115 @@ class DbusSignalEmitter(EventEmitter, abc.ABC):
         :type kwargs: Dict
         """
         super().enable(*args, **kwargs)
+        if kwargs.get("async_mode", False):
+            cls._send_queue_settings = {
+                "maxSize": kwargs.get("queue_size", 1024),
+                "workers": kwargs.get("senders", 1),
+                "overflowPolicy": kwargs.get("overflow_policy", OverflowPolicy.BLOCK),
+                "name": f"{cls.__name__}-senders",
+            }
+        outbox_path = kwargs.get("outbox", None)
+        if outbox_path is not None:
+            cls._outbox = DbusOutbox(
+                outbox_path,
+                kwargs.get("outbox_batch_size", 256),
+                kwargs.get("outbox_flush_interval", 0.01),
+            )
+            cls._replay_interval = kwargs.get("outbox_replay_interval", 1.0)
+        cls._connect_timeout = kwargs.get(
+            "connect_timeout", None if outbox_path is None else 5.0
+        )
+        cls._wire_format = WireFormat(kwargs.get("wire_format", WireFormat.TEXT))
+        cls._compressor = DbusMessageCompressor(
+            kwargs.get("compression_threshold", 65536),
+            kwargs.get("compression_level", 6),
+        )
+        cls._bus_factory = kwargs.get("bus_factory", None)
+        cls._memfd_threshold = kwargs.get("memfd_threshold", None)
+        if cls._memfd_threshold is not None and not DbusMemfdPayload.available():
+            DbusSignalEmitter.logger().warning(
+                "memfd is not supported on this platform, sending payloads inline"
+            )
+            cls._memfd_threshold = None
         cls._events = kwargs.get("events", None)
         event_pkgs = cls.event_packages()
         if cls._events is None and event_pkgs is not None:
             cls._events = []
+            manifest_dir = kwargs.get("discovery_manifest_dir", None)
+            discovery = kwargs.get("discovery", DiscoveryMode.IMPORT)
             for pkg in event_pkgs:
-                for signal_name, value in DbusSignals(pkg).signals():
-                    cls._events.append({"event-class": value[0], "bus-type": value[1]})
-                    cls._events_by_class[full_class_name(value[0])] = value[1]
-        else:
-            for event_details in cls._events:
-                event_class = event_details.get("event-class", None)
-                cls._events_by_class[full_class_name(event_class.event_class())] = {
-                    "event-class": event_class,
-                    "bus-type": event_details.get("bus-type", BusType.SYSTEM),
-                }
+                signals = DbusSignals(pkg, manifest_dir).discover(discovery)
+                for dbus_event_class in signals.values():
+                    cls._events.append(
+                        {"event-class": dbus_event_class, "bus-type": BusType.SYSTEM}
+                    )
+        cls._dispatch = {}
+        cls._references = {}
+        for event_details in cls._events or []:
+            dbus_event_class = event_details.get("event-class", None)
+            bus_type = event_details.get("bus-type", BusType.SYSTEM)
+            if isinstance(dbus_event_class, DbusEventReference):
+                cls._references.setdefault(
+                    dbus_event_class.event_class_simple_name, []
+                ).append((dbus_event_class, bus_type))
+            else:
+                cls._dispatch[dbus_event_class.event_class()] = DbusEmissionRecord(
+                    dbus_event_class, bus_type, cls._wire_format
+                )
+
+    @classmethod
+    def record_for(cls, eventClass: Type[Event]) -> DbusEmissionRecord:
+        """
+        Retrieves the emission record for given event class.
+        Subclasses of supported events use the record of their closest supported
+        ancestor. Lookups are cached, so the class hierarchy is walked only once.
+        :param eventClass: The event class.
+        :type eventClass: Type[pythoneda.shared.Event]
+        :return: The record, or None if the event is not supported.
+        :rtype: pythoneda.shared.infrastructure.dbus.DbusEmissionRecord
+        """
+        try:
+            result = cls._dispatch[eventClass]
+        except KeyError:
+            result = None
+            for ancestor in eventClass.__mro__:
+                result = cls._dispatch.get(ancestor, None)
+                if result is None and cls._references:
+                    result = cls._resolve_reference(ancestor)
+                if result is not None:
+                    break
+            cls._dispatch[eventClass] = result
+
+        return result
+
+    @classmethod
+    def _resolve_reference(cls, eventClass: Type[Event]) -> DbusEmissionRecord:
+        """
+        Imports the d-bus event class for given event class, if it was discovered
+        without importing it.
+        References are indexed by the event class name only, so each candidate is
+        checked against the actual class once imported.
+        :param eventClass: The event class.
+        :type eventClass: Type[pythoneda.shared.Event]
+        :return: The emission record, or None if no reference matches.
+        :rtype: pythoneda.shared.infrastructure.dbus.DbusEmissionRecord
+        """
+        result = None
+        for reference, bus_type in cls._references.get(eventClass.__name__, []):
+            try:
+                dbus_event_class = reference.resolve()
+            except Exception as err:
+                DbusSignalEmitter.logger().error(
+                    f"Could not import {reference.interface}: {err}"
+                )
+                continue
+            if dbus_event_class.event_class() is eventClass:
+                result = DbusEmissionRecord(
+                    dbus_event_class, bus_type, cls._wire_format
+                )
+                break
+
+        return result
 
     @classmethod
     @abc.abstractmethod
@@ -89,47 +216,468 @@ class DbusSignalEmitter(EventEmitter, abc.ABC):
         """
         pass
 
+    @classmethod
+    def compressor(cls) -> DbusMessageCompressor:
+        """
+        Retrieves the compressor of large signals, along with its metrics.
+        :return: Such compressor.
+        :rtype: pythoneda.shared.infrastructure.dbus.DbusMessageCompressor
+        """
+        if cls._compressor is None:
+            cls._compressor = DbusMessageCompressor()
+        return cls._compressor
+
+    @classmethod
+    def connection_pool(cls) -> DbusConnectionPool:
+        """
+        Retrieves the pool of d-bus connections.
+        :return: Such pool.
+        :rtype: pythoneda.shared.infrastructure.dbus.DbusConnectionPool
+        """
+        if cls._connection_pool is None:
+            cls._connection_pool = DbusConnectionPool(
+                cls._bus_factory, negotiateUnixFd=cls._memfd_threshold is not None
+            )
+        return cls._connection_pool
+
+    @classmethod
+    def queue_depth(cls) -> int:
+        """
+        Retrieves the number of signals waiting to be sent, in asynchronous mode.
+        :return: Such number.
+        :rtype: int
+        """
+        if cls._send_queue is None:
+            return 0
+        return cls._send_queue.depth
+
+    def send_queue(self) -> DbusWorkQueue:
+        """
+        Retrieves the queue of pending signals, if asynchronous mode is enabled.
+        :return: Such queue, or None if signals are sent synchronously.
+        :rtype: pythoneda.shared.infrastructure.dbus.DbusWorkQueue
+        """
+        cls = self.__class__
+        if cls._send_queue is None and cls._send_queue_settings is not None:
+            cls._send_queue = DbusWorkQueue(
+                self._send_queued_signal, **cls._send_queue_settings
+            )
+        return cls._send_queue
+
+    async def _send_queued_signal(
+        self, signal: Tuple[BusType, str, DbusEvent, Message]
+    ):
+        """
+        Sends a signal taken from the queue.
+        :param signal: The bus type, the path, the d-bus event and the message.
+        :type signal: Tuple[dbus_next.BusType, str, pythoneda.shared.infrastructure.dbus.DbusEvent, dbus_next.Message]
+        """
+        bus_type, path, instance, message = signal
+        await self.send(bus_type, path, instance, message)
+
+    @classmethod
+    async def shutdown(cls, timeout: float = None):
+        """
+        Sends the pending signals, commits the outbox, and closes the d-bus connections.
+        :param timeout: How long to wait for pending signals, in seconds.
+        :type timeout: float
+        """
+        if cls._send_queue is not None:
+            try:
+                await asyncio.wait_for(cls._send_queue.join(), timeout)
+            except asyncio.TimeoutError:
+                DbusSignalEmitter.logger().warning(
+                    f"Discarding {cls._send_queue.depth} pending signal(s)"
+                )
+            await cls._send_queue.stop()
+        if cls._replay_task is not None:
+            cls._replay_task.cancel()
+            await asyncio.gather(cls._replay_task, return_exceptions=True)
+            cls._replay_task = None
+        if cls._outbox is not None:
+            await cls._outbox.close()
+        if cls._connection_pool is not None:
+            await cls._connection_pool.close()
+
+    @classmethod
+    def is_connection_error(cls, error: Exception, bus: MessageBus = None) -> bool:
+        """
+        Checks whether given error comes from the connection, rather than from
+        the signal itself. Only those are worth reconnecting, retrying, and
+        storing the signal in the outbox for.
+        :param error: The error.
+        :type error: Exception
+        :param bus: The connection the signal was sent through, if any.
+        :type bus: dbus_next.aio.MessageBus
+        :return: True in such case.
+        :rtype: bool
+        """
+        return isinstance(
+            error,
+            (
+                OSError,
+                EOFError,
+                BufferError,
+                asyncio.TimeoutError,
+                AuthError,
+                InvalidAddressError,
+            ),
+        ) or (bus is not None and not getattr(bus, "connected", True))
+
+    async def connection(self, busType: BusType) -> MessageBus:
+        """
+        Retrieves the pooled connection for given bus type, within the connect timeout.
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        :return: The connection.
+        :rtype: dbus_next.aio.MessageBus
+        """
+        return await asyncio.wait_for(
+            self.__class__.connection_pool().connection(busType),
+            self.__class__._connect_timeout,
+        )
+
+    async def send(
+        self, busType: BusType, path: str, instance: DbusEvent, message: Message
+    ):
+        """
+        Sends given message through the pooled connection for given bus type.
+        If the connection turns out to be broken, it reconnects and retries once.
+        If an outbox is configured, signals which cannot be sent because of the
+        connection are stored in it, and so are new ones until the stored signals
+        have been replayed. Signals which cannot be sent at all, e.g. because
+        they cannot be marshalled, are logged and discarded.
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        :param path: The d-bus path.
+        :type path: str
+        :param instance: The d-bus event.
+        :type instance: pythoneda.shared.infrastructure.dbus.DbusEvent
+        :param message: The message.
+        :type message: dbus_next.Message
+        """
+        cls = self.__class__
+        outbox = cls._outbox
+        if outbox is not None and await outbox.has_backlog():
+            await outbox.append(busType, message)
+            self._schedule_replay()
+        else:
+            try:
+                await self._send_now(busType, path, instance, message)
+            except Exception as err:
+                if not cls.is_connection_error(err):
+                    DbusSignalEmitter.logger().error(
+                        f"Discarding signal to {busType}:{path}, which cannot be sent: {err}"
+                    )
+                elif outbox is None:
+                    raise
+                else:
+                    DbusSignalEmitter.logger().warning(
+                        f"Could not send signal to {busType}:{path} ({err}), storing it in the outbox"
+                    )
+                    await outbox.append(busType, message)
+                    self._schedule_replay()
+
+    async def _send_now(
+        self, busType: BusType, path: str, instance: DbusEvent, message: Message
+    ):
+        """
+        Sends given message right away, reconnecting and retrying once if needed.
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        :param path: The d-bus path.
+        :type path: str
+        :param instance: The d-bus event, or None to skip exporting it.
+        :type instance: pythoneda.shared.infrastructure.dbus.DbusEvent
+        :param message: The message.
+        :type message: dbus_next.Message
+        """
+        pool = self.__class__.connection_pool()
+        message, fd = self._externalize(message)
+        try:
+            bus = await self.connection(busType)
+            if instance is not None:
+                pool.export(busType, path, instance)
+            try:
+                await bus.send(message)
+            except Exception as err:
+                if not self.__class__.is_connection_error(err, bus):
+                    raise
+                DbusSignalEmitter.logger().warning(
+                    f"Error sending signal to {busType}:{path} ({err}), reconnecting"
+                )
+                pool.invalidate(busType)
+                bus = await self.connection(busType)
+                if instance is not None:
+                    pool.export(busType, path, instance)
+                await bus.send(message)
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def _externalize(self, message: Message) -> Tuple[Message, int]:
+        """
+        Moves the binary envelope of given signal to a memfd, if it's above the
+        configured threshold. This happens right before sending, so that queued
+        and stored signals never hold file descriptors.
+        :param message: The signal.
+        :type message: dbus_next.Message
+        :return: The signal to send, and the file descriptor to close afterwards, if any.
+        :rtype: Tuple[dbus_next.Message, int]
+        """
+        result = (message, None)
+        threshold = self.__class__._memfd_threshold
+        if (
+            threshold is not None
+            and message.signature == "ay"
+            and len(message.body[0]) > threshold
+        ):
+            result = DbusMemfdPayload.externalize(message)
+
+        return result
+
+    def _schedule_replay(self):
+        """
+        Starts replaying the outbox in the background, unless it's already running.
+        """
+        cls = self.__class__
+        if cls._replay_task is None or cls._replay_task.done():
+            cls._replay_task = asyncio.create_task(self._replay_outbox())
+
+    async def _replay_outbox(self):
+        """
+        Replays the outbox until it's empty, waiting between failed attempts.
+        """
+        outbox = self.__class__._outbox
+        while outbox.backlog > 0:
+            try:
+                sent = await outbox.replay(self._replay_signal)
+                DbusSignalEmitter.logger().info(f"Replayed {sent} signal(s)")
+            except Exception as err:
+                DbusSignalEmitter.logger().debug(f"Outbox replay interrupted: {err}")
+            if outbox.backlog > 0:
+                await asyncio.sleep(self.__class__._replay_interval)
+
+    async def _replay_signal(self, busType: BusType, message: Message):
+        """
+        Sends a signal taken from the outbox. Signals which cannot be sent at
+        all are discarded, so that they don't block the ones after them.
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        :param message: The message.
+        :type message: dbus_next.Message
+        """
+        try:
+            await self._send_now(busType, message.path, None, message)
+        except Exception as err:
+            if self.__class__.is_connection_error(err):
+                raise
+            DbusSignalEmitter.logger().error(
+                f"Discarding stored signal to {busType}:{message.path}, which cannot be sent: {err}"
+            )
+
+    async def send_many(
+        self, busType: BusType, signals: List[Tuple[Event, str, DbusEvent, Message]]
+    ) -> List[Tuple[Event, Exception]]:
+        """
+        Sends given messages through the pooled connection for given bus type.
+        All messages are written before waiting for any of them to be flushed.
+        Messages which fail are retried once, after reconnecting. If an outbox is
+        configured, the ones which still fail because of the connection are stored
+        in it instead.
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        :param signals: The signals, as (event, path, d-bus event, message) tuples.
+        :type signals: List[Tuple[pythoneda.shared.Event, str, pythoneda.shared.infrastructure.dbus.DbusEvent, dbus_next.Message]]
+        :return: The events which could not be sent, along with the error.
+        :rtype: List[Tuple[pythoneda.shared.Event, Exception]]
+        """
+        result = []
+        outbox = self.__class__._outbox
+        if outbox is not None and await outbox.has_backlog():
+            failed = [(signal, None) for signal in signals]
+        else:
+            failed = await self._send_many_now(busType, signals)
+        if failed:
+            if outbox is None:
+                result = [(signal[0], outcome) for signal, outcome in failed]
+            else:
+                result = [
+                    (signal[0], outcome)
+                    for signal, outcome in failed
+                    if outcome is not None
+                    and not self.__class__.is_connection_error(outcome)
+                ]
+                stored = [
+                    (busType, signal[3])
+                    for signal, outcome in failed
+                    if outcome is None or self.__class__.is_connection_error(outcome)
+                ]
+                if stored:
+                    await outbox.append_many(stored)
+                    self._schedule_replay()
+
+        return result
+
+    async def _send_many_now(
+        self, busType: BusType, signals: List[Tuple[Event, str, DbusEvent, Message]]
+    ) -> List[Tuple[Tuple[Event, str, DbusEvent, Message], Exception]]:
+        """
+        Sends given messages right away, each on its own, retrying once after
+        reconnecting the ones which failed because of the connection.
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        :param signals: The signals, as (event, path, d-bus event, message) tuples.
+        :type signals: List[Tuple[pythoneda.shared.Event, str, pythoneda.shared.infrastructure.dbus.DbusEvent, dbus_next.Message]]
+        :return: The signals which could not be sent, along with the error.
+        :rtype: List[Tuple[Tuple[pythoneda.shared.Event, str, pythoneda.shared.infrastructure.dbus.DbusEvent, dbus_next.Message], Exception]]
+        """
+        result = []
+        cls = self.__class__
+        pool = cls.connection_pool()
+        pending = signals
+        for attempt in range(2):
+            bus = None
+            outcomes = [None] * len(pending)
+            fds = []
+            try:
+                bus = await self.connection(busType)
+                futures = {}
+                for index, (event, path, instance, message) in enumerate(pending):
+                    # Each message on its own: one that cannot be sent does not
+                    # affect the ones already written, nor the ones after it.
+                    try:
+                        pool.export(busType, path, instance)
+                        message, fd = self._externalize(message)
+                        if fd is not None:
+                            fds.append(fd)
+                        futures[index] = bus.send(message)
+                    except Exception as err:
+                        outcomes[index] = err
+                sent = await asyncio.gather(*futures.values(), return_exceptions=True)
+                for index, outcome in zip(futures.keys(), sent):
+                    outcomes[index] = outcome
+            except Exception as err:
+                outcomes = [err] * len(pending)
+            finally:
+                for fd in fds:
+                    os.close(fd)
+            failed = [
+                (signal, outcome)
+                for signal, outcome in zip(pending, outcomes)
+                if isinstance(outcome, Exception)
+            ]
+            if attempt > 0:
+                result.extend(failed)
+            else:
+                # Only the ones which failed because of the connection are retried.
+                retriable = []
+                for signal, outcome in failed:
+                    if cls.is_connection_error(outcome, bus):
+                        retriable.append(signal)
+                    else:
+                        result.append((signal, outcome))
+                if not retriable:
+                    break
+                DbusSignalEmitter.logger().warning(
+                    f"Error sending {len(retriable)} signal(s) to {busType}, reconnecting"
+                )
+                pool.invalidate(busType)
+                pending = retriable
+
+        return result
+
+    def build_signal(self, event: Event) -> Tuple[BusType, str, DbusEvent, Message]:
+        """
+        Builds the d-bus signal for given event.
+        :param event: The domain event.
+        :type event: pythoneda.shared.Event
+        :return: The bus type, the path, the d-bus event and the message; or None if the event is not supported.
+        :rtype: Tuple[dbus_next.BusType, str, pythoneda.shared.infrastructure.dbus.DbusEvent, dbus_next.Message]
+        """
+        result = None
+        record = self.__class__.record_for(event.__class__)
+        if record is not None:
+            path, message = record.build_signal(event)
+            if record.compression is not None:
+                message = self.__class__.compressor().compress(
+                    message, record.compression
+                )
+            logger = DbusSignalEmitter.logger()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"{event} -> {record.bus_type}:{path}")
+            result = (record.bus_type, path, record.instance, message)
+        else:
+            DbusSignalEmitter.logger().warning(
+                f"No d-bus emitter registered for event {event.__class__} ({event})"
+            )
+
+        return result
+
     async def emit(self, event: Event):
         """
         Emits given event as d-bus signal.
+        In asynchronous mode, the signal is queued and sent in the background.
         :param event: The domain event to emit.
         :type event: pythoneda.event.Event
         """
         if self._events:
-            event_class_name = full_class_name(event.__class__)
-            event_details = self._events_by_class.get(event_class_name, None)
-            if event_details is not None:
-                instance_class = event_details.get("event-class", None)
-                instance = instance_class()
-                path = instance.build_path(event)
-                bus_type = event_details.get("bus-type", BusType.SYSTEM)
-                bus = await MessageBus(bus_type=bus_type).connect()
-                bus.export(path, instance)
+            try:
+                signal = self.build_signal(event)
+                if signal is not None:
+                    send_queue = self.send_queue()
+                    if send_queue is None:
+                        await self.send(*signal)
+                    else:
+                        await send_queue.put(signal)
+            except SignatureBodyMismatchError as mismatch:
+                DbusSignalEmitter.logger().error(
+                    f"Bad implementation of class {event.__class__}: {mismatch}"
+                )
+                DbusSignalEmitter.logger().error(mismatch)
+        else:
+            DbusSignalEmitter.logger().warning(f"No d-bus emitters found")
+
+        return await super().emit(event)
+
+    async def emit_many(self, events: List[Event]) -> List[Tuple[Event, Exception]]:
+        """
+        Emits given events as d-bus signals, in batches.
+        Signals are grouped by bus type, preserving their order, and each group is
+        written through a single connection before waiting for it to be flushed.
+        A failing event does not prevent the rest from being sent.
+        :param events: The domain events to emit.
+        :type events: List[pythoneda.shared.Event]
+        :return: The events which could not be sent, along with the error.
+        :rtype: List[Tuple[pythoneda.shared.Event, Exception]]
+        """
+        result = []
+        if self._events:
+            signals_by_bus_type = {}
+            for event in events:
                 try:
-                    DbusSignalEmitter.logger().debug(f"{event} -> {bus_type}:{path}")
-                    await bus.send(
-                        Message.new_signal(
-                            path,
-                            full_class_name(instance_class),
-                            instance.name,
-                            instance.sign(event),
-                            instance.transform(event),
+                    signal = self.build_signal(event)
+                    if signal is not None:
+                        bus_type, path, instance, message = signal
+                        signals_by_bus_type.setdefault(bus_type, []).append(
+                            (event, path, instance, message)
                         )
-                    )
                 except SignatureBodyMismatchError as mismatch:
                     DbusSignalEmitter.logger().error(
                         f"Bad implementation of class {event.__class__}: {mismatch}"
                     )
-                    DbusSignalEmitter.logger().error(mismatch)
-
-            else:
-                DbusSignalEmitter.logger().warning(
-                    f"No d-bus emitter registered for event {event.__class__} ({event})"
-                )
+                    result.append((event, mismatch))
+            for bus_type, signals in signals_by_bus_type.items():
+                result.extend(await self.send_many(bus_type, signals))
+            for event, err in result:
+                DbusSignalEmitter.logger().error(f"Could not emit {event}: {err}")
         else:
             DbusSignalEmitter.logger().warning(f"No d-bus emitters found")
 
-        return await super().emit(event)
+        for event in events:
+            await super().emit(event)
+
+        return result
 
 
 # vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
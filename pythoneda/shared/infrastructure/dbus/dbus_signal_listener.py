@@ -21,10 +21,23 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import abc
 import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import functools
 from dbus_next.aio import MessageBus
 from dbus_next import BusType, Message, MessageType
+from .dbus_connection_pool import DbusConnectionPool
+from .dbus_dedup_window import DbusDedupWindow
 from .dbus_event import DbusEvent
+from .dbus_event_reference import DbusEventReference
+from .dbus_event_registry import DbusEventRegistry
+from .dbus_keyed_scheduler import DbusKeyedScheduler
+from .dbus_loop_lag_monitor import DbusLoopLagMonitor
+from .dbus_message_compressor import DbusMessageCompressor
 from .dbus_signals import DbusSignals
+from .dbus_work_queue import DbusWorkQueue
+from .discovery_mode import DiscoveryMode
+from .overflow_policy import OverflowPolicy
+from .parse_executor import ParseExecutor
 from pythoneda.shared import (
     attribute,
     Event,
@@ -34,7 +47,7 @@ from pythoneda.shared import (
     Invariants,
     PythonedaApplication,
 )
-from typing import Dict, List, Tuple, Type
+from typing import Callable, Dict, Hashable, List, Tuple, Type
 
 
 class DbusSignalListener(EventListenerPort, abc.ABC):
@@ -49,9 +62,26 @@ class DbusSignalListener(EventListenerPort, abc.ABC):
 
     Collaborators:
         - pythoneda.shared.application.PythonEDA: Gets notified back with domain events.
+        - pythoneda.shared.infrastructure.dbus.DbusConnectionPool: Provides the d-bus connections.
+        - pythoneda.shared.infrastructure.dbus.DbusWorkQueue: Processes incoming events, if configured.
+        - pythoneda.shared.infrastructure.dbus.DbusKeyedScheduler: Keeps events with the same key in order.
+        - pythoneda.shared.infrastructure.dbus.DbusMessageCompressor: Decompresses large signals.
+        - pythoneda.shared.infrastructure.dbus.DbusLoopLagMonitor: Measures how long the loop gets blocked, if configured.
+        - pythoneda.shared.infrastructure.dbus.DbusDedupWindow: Discards duplicate signals, if configured.
     """
 
+    _adapters_by_member = {}
+    _compressor = None
+    _bus_factory = None
+    _dedup_settings = None
+    _connection_pool = None
     _events = []
+    _loop_lag_interval = None
+    _order_by_path = False
+    _parse_executors = {}
+    _parse_workers = {}
+    _unix_fds = False
+    _worker_pool_settings = None
 
     def __init__(
         self,
@@ -64,6 +94,19 @@ class DbusSignalListener(EventListenerPort, abc.ABC):
         """
         super().__init__()
         self._app = None
+        self._app_invariant = None
+        self._routes = {}
+        self._worker_pool = None
+        self._dedup = None
+        self._scheduler = DbusKeyedScheduler(self.listen)
+        self._handlers = {}
+        self._reading_switches = {}
+        self._tasks = set()
+        self._accepting = False
+        self._stopped = None
+        self._last_offloaded = None
+        self._resume_task = None
+        self._loop_lag = None
 
     @classmethod
     def priority(cls) -> int:
@@ -84,12 +127,100 @@ class DbusSignalListener(EventListenerPort, abc.ABC):
         :type kwargs: Dict
         """
         super().enable(*args, **kwargs)
+        workers = kwargs.get("workers", None)
+        cls._worker_pool_settings = None
+        if workers is not None:
+            cls._worker_pool_settings = {
+                "maxSize": kwargs.get("queue_size", 1024),
+                "workers": workers,
+                "overflowPolicy": kwargs.get("overflow_policy", OverflowPolicy.BLOCK),
+                "name": f"{cls.__name__}-workers",
+            }
+        dedup_size = kwargs.get("dedup_size", None)
+        cls._dedup_settings = None
+        if dedup_size is not None:
+            cls._dedup_settings = {
+                "maxSize": dedup_size,
+                "ttl": kwargs.get("dedup_ttl", 60.0),
+            }
+        cls._order_by_path = kwargs.get("order_by_path", False)
+        cls._parse_executors = {}
+        cls._parse_workers = {
+            ParseExecutor.THREAD: kwargs.get("parse_threads", None),
+            ParseExecutor.PROCESS: kwargs.get("parse_processes", None),
+        }
+        cls._loop_lag_interval = kwargs.get("loop_lag_interval", None)
+        cls._unix_fds = kwargs.get("unix_fds", False)
+        cls._bus_factory = kwargs.get("bus_factory", None)
         cls._events = kwargs.get("events", None)
         if cls._events is None:
             cls._events = []
+            manifest_dir = kwargs.get("discovery_manifest_dir", None)
+            discovery = kwargs.get("discovery", DiscoveryMode.IMPORT)
             for pkg in cls.event_packages():
-                for signal_name, value in DbusSignals(pkg).signals():
-                    cls._events.append({"event-class": value[0], "bus-type": value[1]})
+                signals = DbusSignals(pkg, manifest_dir).discover(discovery)
+                for dbus_event_class in signals.values():
+                    cls._events.append(
+                        {"event-class": dbus_event_class, "bus-type": BusType.SYSTEM}
+                    )
+        cls._adapters_by_member = {}
+        for enabled_event in cls._events:
+            dbus_event_class = enabled_event.get("event-class", None)
+            if not isinstance(dbus_event_class, DbusEventReference):
+                dbus_event_class.compile()
+                DbusEventRegistry.register(dbus_event_class)
+                cls.index_adapter(dbus_event_class)
+
+    @classmethod
+    def index_adapter(cls, dbusEventClass: Type[DbusEvent]):
+        """
+        Adds given d-bus event class to the table of adapters by member name.
+        Members shared by several classes are left out, so they are found by
+        interface instead.
+        :param dbusEventClass: The d-bus event class.
+        :type dbusEventClass: Type[pythoneda.shared.infrastructure.dbus.DbusEvent]
+        """
+        member = dbusEventClass.name
+        existing = cls._adapters_by_member.get(member, dbusEventClass)
+        if existing is dbusEventClass:
+            cls._adapters_by_member[member] = dbusEventClass
+        else:
+            cls._adapters_by_member[member] = None
+
+    @classmethod
+    def find_adapter(cls, interface: str, member: str) -> Type[DbusEvent]:
+        """
+        Retrieves the d-bus event class of given signal: first from the table
+        built when enabled, then by interface, and last by the class name its
+        member suggests.
+        :param interface: The interface of the signal.
+        :type interface: str
+        :param member: The member of the signal.
+        :type member: str
+        :return: The d-bus event class, or None if not found.
+        :rtype: Type[pythoneda.shared.infrastructure.dbus.DbusEvent]
+        """
+        result = cls._adapters_by_member.get(member, None)
+        if result is None:
+            result = DbusEventRegistry.find_by_interface(interface)
+        if result is None:
+            result = DbusEventRegistry.find_by_name(cls.adapter_name(member))
+
+        return result
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def adapter_name(cls, member: str) -> str:
+        """
+        Retrieves the name of the d-bus event class for given member, remembering
+        it for members not in the table of adapters.
+        :param member: The member of the signal.
+        :type member: str
+        :return: The class name.
+        :rtype: str
+        """
+        tokens = cls.parse_signal_name(member)
+        return f"Dbus{tokens[-1]}"
 
     @classmethod
     @abc.abstractmethod
@@ -101,7 +232,8 @@ class DbusSignalListener(EventListenerPort, abc.ABC):
         """
         pass
 
-    def parse_signal_name(self, value) -> List:
+    @classmethod
+    def parse_signal_name(cls, value) -> List:
         """
         Parses a signal name into tokens.
         :param value: The value.
@@ -130,49 +262,367 @@ class DbusSignalListener(EventListenerPort, abc.ABC):
 
         return result
 
-    async def entrypoint(self, app: PythonedaApplication):
+    @classmethod
+    def compressor(cls) -> DbusMessageCompressor:
         """
-        Receives the notification to connect to d-bus.
-        :param app: The PythonEDA instance.
-        :type app: pythoneda.shared.PythonedaApplication
+        Retrieves the decompressor of large signals, along with its metrics.
+        :return: Such decompressor.
+        :rtype: pythoneda.shared.infrastructure.dbus.DbusMessageCompressor
         """
-        if len(self.__class__._events) > 0:
-            for enabled_event in self.__class__._events:
-                event_class = enabled_event.get("event-class", None)
-                bus_type = enabled_event.get("bus-type", BusType.SYSTEM)
+        if cls._compressor is None:
+            cls._compressor = DbusMessageCompressor()
+        return cls._compressor
+
+    @classmethod
+    def connection_pool(cls) -> DbusConnectionPool:
+        """
+        Retrieves the pool of d-bus connections.
+        :return: Such pool.
+        :rtype: pythoneda.shared.infrastructure.dbus.DbusConnectionPool
+        """
+        if cls._connection_pool is None:
+            cls._connection_pool = DbusConnectionPool(
+                cls._bus_factory, negotiateUnixFd=cls._unix_fds
+            )
+        return cls._connection_pool
+
+    @classmethod
+    def parse_executor(cls, kind: ParseExecutor) -> Executor:
+        """
+        Retrieves the executor to parse signals in, for d-bus events that
+        ask for it. The number of workers is configured with the "parse_threads"
+        and "parse_processes" settings.
+        :param kind: The kind of executor.
+        :type kind: pythoneda.shared.infrastructure.dbus.ParseExecutor
+        :return: Such executor, or None to parse them in the event loop.
+        :rtype: concurrent.futures.Executor
+        """
+        result = None
+        if kind != ParseExecutor.LOOP:
+            result = cls._parse_executors.get(kind, None)
+            if result is None:
+                workers = cls._parse_workers.get(kind, None)
+                if kind == ParseExecutor.PROCESS:
+                    result = ProcessPoolExecutor(max_workers=workers)
+                else:
+                    result = ThreadPoolExecutor(
+                        max_workers=workers, thread_name_prefix=f"{cls.__name__}-parse"
+                    )
+                cls._parse_executors[kind] = result
+
+        return result
+
+    @property
+    def loop_lag(self) -> DbusLoopLagMonitor:
+        """
+        Retrieves the loop lag metrics, if the "loop_lag_interval" setting is configured.
+        :return: Such metrics, or None.
+        :rtype: pythoneda.shared.infrastructure.dbus.DbusLoopLagMonitor
+        """
+        return self._loop_lag
+
+    @property
+    def worker_pool(self) -> DbusWorkQueue:
+        """
+        Retrieves the pool of workers processing incoming events, if configured.
+        :return: Such pool, or None if each event is processed in its own task.
+        :rtype: pythoneda.shared.infrastructure.dbus.DbusWorkQueue
+        """
+        if self._worker_pool is None and self.__class__._worker_pool_settings:
+            self._worker_pool = DbusWorkQueue(
+                self._schedule, **self.__class__._worker_pool_settings
+            )
+        return self._worker_pool
+
+    @property
+    def dedup(self) -> DbusDedupWindow:
+        """
+        Retrieves the window of recently seen signals, along with its hit and
+        miss counters, if the "dedup_size" setting is configured.
+        :return: Such window, or None if duplicates are not discarded.
+        :rtype: pythoneda.shared.infrastructure.dbus.DbusDedupWindow
+        """
+        if self._dedup is None and self.__class__._dedup_settings:
+            self._dedup = DbusDedupWindow(**self.__class__._dedup_settings)
+        return self._dedup
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Retrieves the number of events being processed, including those waiting
+        for an earlier event with the same ordering key.
+        :return: Such number.
+        :rtype: int
+        """
+        result = self._scheduler.pending
+        pool = self.worker_pool
+        if pool is not None:
+            # Workers wait for their turn, so the pool counts them already.
+            result = pool.in_flight
+        return result
+
+    @property
+    def queued(self) -> int:
+        """
+        Retrieves the number of events waiting for the worker pool.
+        :return: Such number.
+        :rtype: int
+        """
+        pool = self.worker_pool
+        if pool is None:
+            return 0
+        return pool.depth + pool.waiting
+
+    def build_routes(
+        self,
+    ) -> Dict[BusType, Dict[Tuple[str, str, str], Type[DbusEvent]]]:
+        """
+        Builds the routing table of the configured events.
+        D-bus events discovered without importing them are routed by reference if
+        their member and path are known, and imported when a signal arrives.
+        :return: For each bus type, the d-bus event class (or a reference to it) for each (interface, member, path namespace).
+        :rtype: Dict[dbus_next.BusType, Dict[Tuple[str, str, str], Type[pythoneda.shared.infrastructure.dbus.DbusEvent]]]
+        """
+        result = {}
+        for enabled_event in self.__class__._events:
+            event_class = enabled_event.get("event-class", None)
+            bus_type = enabled_event.get("bus-type", BusType.SYSTEM)
+            if (
+                isinstance(event_class, DbusEventReference)
+                and event_class.member is not None
+                and event_class.path is not None
+            ):
+                route = (event_class.interface, event_class.member, event_class.path)
+            else:
+                if isinstance(event_class, DbusEventReference):
+                    event_class = self.resolve_reference(event_class)
+                if event_class is None:
+                    continue
                 instance = event_class()
-                path = instance.path
-                fqdn_event_class = full_class_name(event_class)
-                bus = await MessageBus(bus_type=bus_type).connect()
+                route = (full_class_name(event_class), instance.name, instance.path)
+            result.setdefault(bus_type, {})[route] = event_class
+
+        return result
 
-                bus.add_message_handler(
-                    event_class.create_process_message_function(
-                        bus_type, path, self, app
+    def resolve_reference(self, reference: DbusEventReference) -> Type[DbusEvent]:
+        """
+        Imports the d-bus event class of given reference, and registers it.
+        :param reference: The reference.
+        :type reference: pythoneda.shared.infrastructure.dbus.DbusEventReference
+        :return: The d-bus event class, or None if it cannot be imported.
+        :rtype: Type[pythoneda.shared.infrastructure.dbus.DbusEvent]
+        """
+        result = None
+        try:
+            result = reference.resolve()
+            result.compile()
+            DbusEventRegistry.register(result)
+            self.__class__.index_adapter(result)
+        except Exception as err:
+            DbusSignalListener.logger().error(
+                f"Could not import {reference.interface}: {err}"
+            )
+
+        return result
+
+    def build_match_rules(
+        self, routes: Dict[Tuple[str, str, str], Type[DbusEvent]]
+    ) -> List[str]:
+        """
+        Builds the match rules to subscribe to the signals of given routes.
+        D-bus has no wildcards for interfaces or members, so routes sharing a path
+        namespace are merged into a single rule for the whole namespace, which
+        also covers the namespaces below it. Routes alone in their namespace keep
+        an exact rule. Either way, dispatch_message() discards what's not routed.
+        :param routes: The routes, for each (interface, member, path namespace).
+        :type routes: Dict[Tuple[str, str, str], Type[pythoneda.shared.infrastructure.dbus.DbusEvent]]
+        :return: The match rules.
+        :rtype: List[str]
+        """
+        result = []
+        by_path = {}
+        for interface, member, path in routes.keys():
+            by_path.setdefault(path, []).append((interface, member))
+        namespaces = [path for path, signals in by_path.items() if len(signals) > 1]
+        for path in sorted(by_path.keys()):
+            if any(
+                namespace != path
+                and (namespace == "/" or path.startswith(f"{namespace}/"))
+                for namespace in namespaces
+            ):
+                # Already covered by the rule of an enclosing namespace.
+                continue
+            if path in namespaces:
+                result.append(f"type='signal',path_namespace='{path}'")
+            else:
+                for interface, member in by_path[path]:
+                    result.append(
+                        f"type='signal',interface='{interface}',path_namespace='{path}',member='{member}'"
                     )
-                )
 
-                # Subscribe to the signal
-                await bus.call(
+        return result
+
+    async def subscribe(
+        self, busType: BusType, routes: Dict[Tuple[str, str, str], Type[DbusEvent]]
+    ):
+        """
+        Subscribes to the signals of given routes, sending all match rules at once.
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        :param routes: The routes, for each (interface, member, path namespace).
+        :type routes: Dict[Tuple[str, str, str], Type[pythoneda.shared.infrastructure.dbus.DbusEvent]]
+        """
+        bus = await self.__class__.connection_pool().connection(busType)
+        handler = self.create_message_handler(busType)
+        pool = self.worker_pool
+        if pool is not None and pool.overflow_policy == OverflowPolicy.BLOCK:
+            # Fails early if the bus cannot apply backpressure.
+            self._reading_switches[busType] = self.__class__.reading_switch(bus)
+        bus.add_message_handler(handler)
+        self._handlers[busType] = (bus, handler)
+
+        rules = self.build_match_rules(routes)
+        await asyncio.gather(
+            *[
+                bus.call(
                     Message(
                         destination="org.freedesktop.DBus",
                         path="/org/freedesktop/DBus",
                         interface="org.freedesktop.DBus",
                         member="AddMatch",
                         signature="s",
-                        body=[
-                            f"type='signal',interface='{fqdn_event_class}',path_namespace='{path}',member='{instance.name}'"
-                        ],
+                        body=[rule],
                     )
                 )
-                DbusSignalListener.logger().debug(
-                    f"Waiting for {instance.name} in {bus_type}:{path}"
-                )
+                for rule in rules
+            ]
+        )
+        DbusSignalListener.logger().debug(
+            f"Waiting for {len(routes)} signal(s) in {busType}, with {len(rules)} match rule(s)"
+        )
 
-            while True:
-                await asyncio.sleep(1)
+    async def entrypoint(self, app: PythonedaApplication):
+        """
+        Receives the notification to connect to d-bus.
+        :param app: The PythonEDA instance.
+        :type app: pythoneda.shared.PythonedaApplication
+        """
+        if len(self.__class__._events) > 0:
+            self._app = app
+            # Bound once: every event received shares it.
+            self._app_invariant = None
+            self.app_invariant(app)
+            self._stopped = asyncio.Event()
+            if self.__class__._loop_lag_interval is not None:
+                self._loop_lag = DbusLoopLagMonitor(self.__class__._loop_lag_interval)
+                self._loop_lag.start()
+            self._routes = self.build_routes()
+            await asyncio.gather(
+                *[
+                    self.subscribe(bus_type, routes)
+                    for bus_type, routes in self._routes.items()
+                ]
+            )
+
+            self._accepting = True
+            await self._stopped.wait()
         else:
             DbusSignalListener.logger().warning(f"No d-bus events configured!")
 
+    async def stop(self, timeout: float = None):
+        """
+        Stops listening: new signals are ignored, the events already received are
+        processed, and the d-bus connections are closed. Then entrypoint() returns.
+        :param timeout: How long to wait for the events already received, in seconds.
+        :type timeout: float
+        """
+        self._accepting = False
+        try:
+            await asyncio.wait_for(self._drain(), timeout)
+        except asyncio.TimeoutError:
+            DbusSignalListener.logger().warning(
+                f"Discarding {self.in_flight + self.queued} event(s) still being processed"
+            )
+            for task in list(self._tasks):
+                task.cancel()
+        if self._worker_pool is not None:
+            await self._worker_pool.stop()
+        if self._resume_task is not None:
+            self._resume_task.cancel()
+        if self._loop_lag is not None:
+            self._loop_lag.stop()
+        executors = self.__class__._parse_executors
+        self.__class__._parse_executors = {}
+        for executor in executors.values():
+            executor.shutdown(wait=False)
+        for bus, handler in self._handlers.values():
+            bus.remove_message_handler(handler)
+        self._handlers = {}
+        self._reading_switches = {}
+        await self.__class__.connection_pool().close()
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def _drain(self):
+        """
+        Waits until all received events have been processed.
+        """
+        pool = self._worker_pool
+        while self._tasks or (
+            pool is not None and (pool.depth + pool.waiting + pool.in_flight) > 0
+        ):
+            if self._tasks:
+                await asyncio.wait(set(self._tasks))
+            if pool is not None:
+                await pool.join()
+
+    def create_message_handler(self, busType: BusType) -> Callable[[Message], bool]:
+        """
+        Creates the function to process all messages received through given bus type.
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        :return: The function.
+        :rtype: Callable[[dbus_next.Message], bool]
+        """
+        return lambda message: self.dispatch_message(message, busType)
+
+    def dispatch_message(self, message: Message, busType: BusType) -> bool:
+        """
+        Routes an incoming message to the d-bus event it's subscribed with.
+        The lookup checks the message path and each of its ancestors, so its cost
+        does not depend on the number of configured events.
+        :param message: The message.
+        :type message: dbus_next.Message
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        :return: True if the message was processed.
+        :rtype: bool
+        """
+        result = False
+        routes = self._routes.get(busType, None)
+        if self._accepting and message.message_type == MessageType.SIGNAL and routes:
+            interface = message.interface
+            member = message.member
+            path = message.path or "/"
+            while True:
+                event_class = routes.get((interface, member, path), None)
+                if isinstance(event_class, DbusEventReference):
+                    event_class = self.resolve_reference(event_class)
+                    if event_class is None:
+                        del routes[(interface, member, path)]
+                    else:
+                        routes[(interface, member, path)] = event_class
+                if event_class is not None:
+                    result = self.process_message(
+                        message, event_class, busType, path, self._app
+                    )
+                    break
+                if path == "/":
+                    break
+                path = path.rsplit("/", 1)[0] or "/"
+
+        return result
+
     def process_message(
         self,
         message: Message,
@@ -204,19 +654,237 @@ class DbusSignalListener(EventListenerPort, abc.ABC):
                 f"{busType}:{path} -> {eventClass} / {message.member}"
             )
             result = True
-            event = self.parse(message, message.member, app)
-            if event:
-                asyncio.create_task(self.listen(event))
+            cls = self.__class__
+            dbus_event_class = cls.find_adapter(message.interface, message.member)
+            executor = None
+            if dbus_event_class is not None:
+                kind = dbus_event_class.parse_executor()
+                if kind == ParseExecutor.PROCESS and message.unix_fds:
+                    # File descriptors are only valid in this process.
+                    kind = ParseExecutor.THREAD
+                executor = cls.parse_executor(kind)
+            if executor is None:
+                event = self.parse(message, message.member, app)
+                self.enqueue(message, eventClass, event)
             else:
-                DbusSignalListener.logger().warning(
-                    f"Discarding unparseable message: {message}"
+                task = asyncio.create_task(
+                    self._parse_off_loop(
+                        message, eventClass, dbus_event_class, executor, app
+                    )
                 )
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
 
         else:
             result = False
 
         return result
 
+    def is_duplicate(
+        self, message: Message, eventClass: Type[DbusEvent], event: Event
+    ) -> bool:
+        """
+        Checks whether given event was already received recently, if
+        duplicates are to be discarded.
+        :param message: The message.
+        :type message: dbus_next.Message
+        :param eventClass: The d-bus event class.
+        :type eventClass: Type[pythoneda.shared.infrastructure.dbus.DbusEvent]
+        :param event: The parsed event.
+        :type event: pythoneda.shared.Event
+        :return: True if it's a duplicate.
+        :rtype: bool
+        """
+        result = False
+        dedup = self.dedup
+        if dedup is not None:
+            key = eventClass.dedup_key(message, event)
+            result = key is not None and dedup.seen(key)
+
+        return result
+
+    def pause_reading(self):
+        """
+        Stops reading signals until the worker pool has room for them again, so
+        the senders wait instead of signals piling up in memory. The signals
+        already read, at most a socket buffer, wait for room in the pool.
+        """
+        if self._resume_task is None:
+            for pause, _ in self._reading_switches.values():
+                pause()
+            self._resume_task = asyncio.create_task(self._resume_reading())
+
+    async def _resume_reading(self):
+        """
+        Goes on reading signals once the worker pool has room for them.
+        """
+        try:
+            await self.worker_pool.wait_for_room()
+        finally:
+            self._resume_task = None
+            for _, resume in list(self._reading_switches.values()):
+                # Handlers of the signals read so far can pause it again.
+                if self._resume_task is None:
+                    resume()
+
+    @classmethod
+    def reading_switch(
+        cls, bus: MessageBus
+    ) -> Tuple[Callable[[], None], Callable[[], None]]:
+        """
+        Retrieves how to pause and resume reading from given bus. The buses of
+        this package provide pause_reading() and resume_reading(); d-bus
+        connections stop watching their socket meanwhile.
+        :param bus: The bus.
+        :type bus: dbus_next.aio.MessageBus
+        :return: The functions to pause and resume reading.
+        :rtype: Tuple[Callable[[], None], Callable[[], None]]
+        """
+        if callable(getattr(bus, "pause_reading", None)) and callable(
+            getattr(bus, "resume_reading", None)
+        ):
+            result = (bus.pause_reading, bus.resume_reading)
+        elif isinstance(getattr(bus, "_fd", None), int) and callable(
+            getattr(bus, "_message_reader", None)
+        ):
+            loop = asyncio.get_running_loop()
+
+            def pause():
+                if bus.connected:
+                    loop.remove_reader(bus._fd)
+
+            def resume():
+                if bus.connected:
+                    loop.add_reader(bus._fd, bus._message_reader)
+
+            result = (pause, resume)
+        else:
+            raise NotImplementedError(
+                f"Cannot pause reading from {type(bus).__name__}: it provides no pause_reading(), and no socket reader as dbus_next.aio.MessageBus used to"
+            )
+
+        return result
+
+    def enqueue(self, message: Message, eventClass: Type[DbusEvent], event: Event):
+        """
+        Schedules given event to be passed to listen(), after the earlier events
+        with the same ordering key, unless it's a duplicate.
+        :param message: The message the event was parsed from.
+        :type message: dbus_next.Message
+        :param eventClass: The d-bus event class.
+        :type eventClass: Type[pythoneda.shared.infrastructure.dbus.DbusEvent]
+        :param event: The event, or None if it could not be parsed.
+        :type event: pythoneda.shared.Event
+        """
+        if event and self.is_duplicate(message, eventClass, event):
+            DbusSignalListener.logger().debug(
+                f"Discarding duplicate {message.member} in {message.path}"
+            )
+        elif event:
+            key = eventClass.ordering_key(message, event)
+            if key is None and self.__class__._order_by_path:
+                key = message.path
+            pool = self.worker_pool
+            if pool is None:
+                task = asyncio.create_task(self._scheduler.run(key, event))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            else:
+                pool.put_nowait((key, event))
+                if pool.waiting > 0:
+                    self.pause_reading()
+        else:
+            DbusSignalListener.logger().warning(
+                f"Discarding unparseable message: {message}"
+            )
+
+    async def _parse_off_loop(
+        self,
+        message: Message,
+        eventClass: Type[DbusEvent],
+        dbusEventClass: Type[DbusEvent],
+        executor: Executor,
+        app: PythonedaApplication,
+    ):
+        """
+        Parses given message in given executor, and schedules the event.
+        Messages parsed this way are scheduled in the order they arrived,
+        even if later ones are parsed sooner.
+        :param message: The message.
+        :type message: dbus_next.Message
+        :param eventClass: The d-bus event class it's routed to.
+        :type eventClass: Type[pythoneda.shared.infrastructure.dbus.DbusEvent]
+        :param dbusEventClass: The d-bus event class to parse it with.
+        :type dbusEventClass: Type[pythoneda.shared.infrastructure.dbus.DbusEvent]
+        :param executor: The executor.
+        :type executor: concurrent.futures.Executor
+        :param app: The PythonEDA instance.
+        :type app: pythoneda.shared.PythonedaApplication
+        """
+        loop = asyncio.get_running_loop()
+        previous = self._last_offloaded
+        scheduled = loop.create_future()
+        self._last_offloaded = scheduled
+        try:
+            event = None
+            try:
+                if isinstance(executor, ProcessPoolExecutor):
+                    message = self.decompress(dbusEventClass, message)
+                    parse = functools.partial(dbusEventClass.parse, message, None)
+                else:
+                    parse = functools.partial(
+                        self._decompress_and_parse, dbusEventClass, message, app
+                    )
+                invariants_json, event = await loop.run_in_executor(executor, parse)
+                self.bind_invariants(invariants_json, event, app)
+            except Exception as err:
+                DbusSignalListener.logger().error(err)
+            if previous is not None:
+                await asyncio.shield(previous)
+            self.enqueue(message, eventClass, event)
+        finally:
+            if not scheduled.done():
+                scheduled.set_result(None)
+            if self._last_offloaded is scheduled:
+                self._last_offloaded = None
+
+    def _decompress_and_parse(
+        self,
+        dbusEventClass: Type[DbusEvent],
+        message: Message,
+        app: PythonedaApplication,
+    ) -> Tuple[str, Event]:
+        """
+        Decompresses and parses given message, outside the event loop.
+        :param dbusEventClass: The d-bus event class to parse it with.
+        :type dbusEventClass: Type[pythoneda.shared.infrastructure.dbus.DbusEvent]
+        :param message: The message.
+        :type message: dbus_next.Message
+        :param app: The PythonEDA instance.
+        :type app: pythoneda.shared.PythonedaApplication
+        :return: A tuple with the invariants and the specific event.
+        :rtype: Tuple[str, pythoneda.shared.Event]
+        """
+        message = self.decompress(dbusEventClass, message)
+        return dbusEventClass.parse(message, app)
+
+    def decompress(self, dbusEventClass: Type[DbusEvent], message: Message) -> Message:
+        """
+        Decompresses given message, if its d-bus event class compresses signals.
+        Messages of other classes are returned as they are.
+        :param dbusEventClass: The d-bus event class to parse it with.
+        :type dbusEventClass: Type[pythoneda.shared.infrastructure.dbus.DbusEvent]
+        :param message: The message.
+        :type message: dbus_next.Message
+        :return: The decompressed message.
+        :rtype: dbus_next.Message
+        """
+        result = message
+        if dbusEventClass.compression() is not None:
+            result = self.__class__.compressor().decompress(message)
+
+        return result
+
     def parse(self, message: Message, signal: str, app: PythonedaApplication) -> Event:
         """
         Parses given signal.
@@ -231,49 +899,94 @@ class DbusSignalListener(EventListenerPort, abc.ABC):
         """
         result = None
 
-        tokens = self.parse_signal_name(signal)
-
         invariants_json = None
-        try:
-            module_name, dbus_event_class = self.find_class_in_imported_modules(
-                f"Dbus{tokens[-1]}"
+        dbus_event_class = self.__class__.find_adapter(message.interface, signal)
+        if dbus_event_class is None:
+            DbusSignalListener.logger().debug(
+                f"Discarding unparseable message: no d-bus event for {message.interface}.{signal}"
             )
-            invariants_json, result = dbus_event_class.parse(message, app)
-        except ImportError as err:
-            DbusSignalListener.logger().debug(f"Discarding unparseable message: {err}")
-        except Exception as err:
-            DbusSignalListener.logger().error(err)
+        else:
+            try:
+                message = self.decompress(dbus_event_class, message)
+                invariants_json, result = dbus_event_class.parse(message, app)
+            except Exception as err:
+                DbusSignalListener.logger().error(err)
 
-        invariants = Invariants.instance()
-        invariants.bind_all_from_json(invariants_json)
-        invariant = Invariant[PythonedaApplication](
-            app, "pythoneda.shared.PythonedaApplication"
-        )
-        invariants.bind(invariant, None)
-        invariants.bind(invariant, result)
+        self.bind_invariants(invariants_json, result, app)
 
         return result
 
+    def bind_invariants(
+        self, invariantsJson: str, event: Event, app: PythonedaApplication
+    ):
+        """
+        Binds the invariants received along with given event, if any, and the
+        invariant of the PythonEDA instance, which every event gets.
+        :param invariantsJson: The invariants, in JSON format, or None.
+        :type invariantsJson: str
+        :param event: The event.
+        :type event: pythoneda.shared.Event
+        :param app: The PythonEDA instance.
+        :type app: pythoneda.shared.PythonedaApplication
+        """
+        invariants = Invariants.instance()
+        if invariantsJson is not None:
+            invariants.bind_all_from_json(invariantsJson)
+        if event is not None:
+            invariants.bind(self.app_invariant(app), event)
+
+    def app_invariant(self, app: PythonedaApplication) -> Invariant:
+        """
+        Retrieves the invariant of the PythonEDA instance, created when
+        entrypoint() is called.
+        :param app: The PythonEDA instance, in case entrypoint() was not called.
+        :type app: pythoneda.shared.PythonedaApplication
+        :return: Such invariant.
+        :rtype: pythoneda.shared.Invariant
+        """
+        if self._app_invariant is None:
+            self._app_invariant = Invariant[PythonedaApplication](
+                app, "pythoneda.shared.PythonedaApplication"
+            )
+            Invariants.instance().bind(self._app_invariant, None)
+        return self._app_invariant
+
+    async def _schedule(self, item: Tuple[Hashable, Event]):
+        """
+        Processes an event taken from the worker pool, keeping the order of events
+        with the same key.
+        :param item: The ordering key and the event.
+        :type item: Tuple[Hashable, pythoneda.shared.Event]
+        """
+        key, event = item
+        await self._scheduler.run(key, event)
+
     async def listen(self, event):
         """
-        Gets notified of a signal.
+        Gets notified of a signal, and passes it to the PythonEDA instance
+        given to entrypoint().
         :param event: The event.
         :type event: pythoneda.Event
         """
-        app_invariant = Invariants.instance().apply(
-            "pythoneda.shared.PythonedaApplication", self
-        )
-        if app_invariant is None:
+        app = self._app
+        if app is None:
+            app_invariant = Invariants.instance().apply(
+                "pythoneda.shared.PythonedaApplication", self
+            )
+            if app_invariant is not None:
+                app = app_invariant.value
+        if app is None:
             DbusSignalListener.logger().error(
                 f"Event {event} received but there is no such invariant as pythoneda.shared.PythonedaApplication"
             )
         else:
-            await app_invariant.value.accept(event)
+            await app.accept(event)
 
     def find_class_in_imported_modules(self, className: str) -> List[Tuple[str, type]]:
         """
         Search through all currently imported modules for a class with the given name.
         Returns a list of tuples: (module_name, the_class_object)
+        It's expensive, and the first match wins. parse() uses DbusEventRegistry instead.
         :param className: The name of the class to search for.
         :type className: str
         :return: The list of tuples (module_name, the_class_object).
@@ -21,13 +21,22 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 from abc import ABCMeta
 from dbus_next import BusType
+import hashlib
 import importlib
+import importlib.metadata
+import importlib.util
 import inspect
+import json
+import os
 import pkgutil
 from pythoneda.shared import BaseObject, Event
-from pythoneda.shared.infrastructure.dbus import DbusEvent
-import pkgutil
-from typing import Dict, Type
+from pythoneda.shared.infrastructure.dbus import (
+    DbusEvent,
+    DbusEventReference,
+    DbusEventScanner,
+    DiscoveryMode,
+)
+from typing import Dict, List, Type, Union
 
 
 class DbusSignals(BaseObject):
@@ -42,16 +51,25 @@ class DbusSignals(BaseObject):
 
     Collaborators:
         - pythoneda.shared.Event
+        - pythoneda.shared.infrastructure.dbus.DbusEventScanner: Finds d-bus events without importing them.
+        - pythoneda.shared.infrastructure.dbus.DbusEventReference: Describes d-bus events not imported yet.
     """
 
-    def __init__(self, package: str):
+    _entry_points = None
+    _entry_points_group = "pythoneda.dbus.events"
+    _manifest_version = 1
+
+    def __init__(self, package: str, manifestDir: str = None):
         """
         Creates a new DbusSignals instance to discover events in given package.
         :param package: The package to analyze.
         :type package: str
+        :param manifestDir: The folder for discovery manifests, or None to always discover from scratch.
+        :type manifestDir: str
         """
         super().__init__()
         self._package = package
+        self._manifest_dir = manifestDir
 
     @property
     def package(self) -> str:
@@ -62,41 +80,243 @@ class DbusSignals(BaseObject):
         """
         return self._package
 
+    @property
+    def manifest_dir(self) -> str:
+        """
+        Retrieves the folder for discovery manifests.
+        :return: Such folder, or None if manifests are disabled.
+        :rtype: str
+        """
+        return self._manifest_dir
+
+    @classmethod
+    def default_manifest_dir(cls) -> str:
+        """
+        Retrieves a folder for discovery manifests, in $XDG_CACHE_HOME if defined.
+        Emitters and listeners only write manifests when given a folder in their
+        "discovery_manifest_dir" setting; this one is a sensible choice.
+        :return: Such folder.
+        :rtype: str
+        """
+        return os.path.join(
+            os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+            "pythoneda",
+            "dbus-signals",
+        )
+
     def find_subclasses_in_package(self, package_name, base_class):
+        """
+        Finds the concrete subclasses of given class in given package, importing
+        each of its modules once.
+        If a manifest folder is configured, a previous result is reused while none
+        of the package files has changed, importing only the modules it lists.
+        :param package_name: The package.
+        :type package_name: str
+        :param base_class: The base class.
+        :type base_class: type
+        :return: The subclasses.
+        :rtype: List[type]
+        """
         result = []
 
         package_spec = importlib.util.find_spec(package_name)
         if package_spec is not None and package_spec.submodule_search_locations:
-            subclasses = []
-
-            for importer, modname, ispkg in pkgutil.walk_packages(
-                package_spec.submodule_search_locations
-            ):
-                full_module_name = f"{package_name}.{modname}"
-                try:
-                    module = importlib.import_module(full_module_name)
-                    for name, obj in inspect.getmembers(module, inspect.isclass):
+            locations = list(package_spec.submodule_search_locations)
+            manifest_path = self.manifest_path(package_name, base_class, locations)
+            result = self.load_manifest(manifest_path, locations, base_class)
+            if result is None:
+                result = self.scan_package(package_name, locations, base_class)
+                self.save_manifest(manifest_path, locations, result)
+        else:
+            DbusSignals.logger().error(f"Could not find the package '{package_name}'.")
+
+        return result
+
+    def scan_package(
+        self, package_name: str, locations: List[str], base_class: type
+    ) -> List[type]:
+        """
+        Imports all modules in given package, looking for subclasses of given class.
+        :param package_name: The package.
+        :type package_name: str
+        :param locations: The package locations.
+        :type locations: List[str]
+        :param base_class: The base class.
+        :type base_class: type
+        :return: The subclasses.
+        :rtype: List[type]
+        """
+        result = {}
+        for importer, full_module_name, ispkg in pkgutil.walk_packages(
+            locations, prefix=f"{package_name}."
+        ):
+            try:
+                module = importlib.import_module(full_module_name)
+                for name, obj in inspect.getmembers(module, inspect.isclass):
+                    if (
+                        issubclass(obj, base_class)
+                        and obj is not base_class
+                        and not inspect.isabstract(obj)
+                    ):
+                        result[obj] = full_module_name
+            except ImportError:
+                DbusSignals.logger().error(
+                    f"Could not import module {full_module_name}."
+                )
+
+        return list(result.keys())
+
+    def manifest_path(
+        self, package_name: str, base_class: type, locations: List[str]
+    ) -> str:
+        """
+        Retrieves the path of the manifest for given package.
+        :param package_name: The package.
+        :type package_name: str
+        :param base_class: The base class.
+        :type base_class: type
+        :param locations: The package locations.
+        :type locations: List[str]
+        :return: The path, or None if manifests are disabled.
+        :rtype: str
+        """
+        result = None
+        if self._manifest_dir is not None:
+            key = hashlib.sha1(
+                "|".join(
+                    [package_name, self.__class__.full_class_name(base_class)]
+                    + locations
+                ).encode("utf-8")
+            ).hexdigest()
+            result = os.path.join(self._manifest_dir, f"{package_name}-{key}.json")
+
+        return result
+
+    def fingerprint(self, locations: List[str]) -> Dict[str, List[int]]:
+        """
+        Retrieves the modification time and size of all folders and Python files
+        under given locations.
+        :param locations: The package locations.
+        :type locations: List[str]
+        :return: For each path, its modification time (in nanoseconds) and size.
+        :rtype: Dict[str, List[int]]
+        """
+        result = {}
+        for location in locations:
+            for folder, folders, files in os.walk(location):
+                folders[:] = [name for name in folders if name != "__pycache__"]
+                stat = os.stat(folder)
+                result[folder] = [stat.st_mtime_ns, 0]
+                for name in files:
+                    if name.endswith(".py"):
+                        path = os.path.join(folder, name)
+                        stat = os.stat(path)
+                        result[path] = [stat.st_mtime_ns, stat.st_size]
+
+        return result
+
+    def load_manifest(
+        self, manifestPath: str, locations: List[str], base_class: type
+    ) -> List[type]:
+        """
+        Loads the classes listed in given manifest, if it's still valid.
+        It checks the recorded files and folders only, without walking the package.
+        Since adding or removing a file changes its folder, that's enough.
+        :param manifestPath: The manifest path.
+        :type manifestPath: str
+        :param locations: The package locations.
+        :type locations: List[str]
+        :param base_class: The base class.
+        :type base_class: type
+        :return: The classes, or None if there's no valid manifest.
+        :rtype: List[type]
+        """
+        result = None
+        if manifestPath is not None and os.path.exists(manifestPath):
+            try:
+                with open(manifestPath, "r") as file:
+                    manifest = json.load(file)
+                if (
+                    isinstance(manifest, dict)
+                    and manifest.get("version", None)
+                    == self.__class__._manifest_version
+                    and manifest.get("locations", None) == locations
+                    and all(
+                        self._matches(path, entry)
+                        for path, entry in manifest.get("fingerprint", {}).items()
+                    )
+                ):
+                    classes = []
+                    for module_name, class_name in manifest.get("classes", []):
+                        obj = getattr(
+                            importlib.import_module(module_name), class_name, None
+                        )
                         if (
-                            issubclass(obj, base_class)
-                            and obj is not base_class
-                            and not inspect.isabstract(obj)
+                            not inspect.isclass(obj)
+                            or not issubclass(obj, base_class)
+                            or inspect.isabstract(obj)
                         ):
-                            subclasses.append(obj)
-                except ImportError:
-                    DbusSignals.logger().error(
-                        f"Could not import module {full_module_name}."
-                    )
+                            raise ImportError(f"{module_name}.{class_name} is gone")
+                        classes.append(obj)
+                    result = classes
+            except (ImportError, OSError, ValueError) as err:
+                DbusSignals.logger().debug(f"Ignoring manifest {manifestPath}: {err}")
 
-            for subclass in subclasses:
-                result.append(subclass)
-                for child in subclass.__subclasses__():
-                    result.extend(self.find_subclasses_in_package(package_name, child))
-        else:
-            DbusSignals.logger().error(f"Could not find the package '{package_name}'.")
-            result = []
+        return result
+
+    def _matches(self, path: str, entry: List[int]) -> bool:
+        """
+        Checks whether given path still has the recorded modification time and size.
+        :param path: The path.
+        :type path: str
+        :param entry: The recorded modification time (in nanoseconds) and size.
+        :type entry: List[int]
+        :return: True in such case.
+        :rtype: bool
+        """
+        result = False
+        try:
+            stat = os.stat(path)
+            result = stat.st_mtime_ns == entry[0] and (
+                entry[1] == 0 or stat.st_size == entry[1]
+            )
+        except OSError:
+            pass
 
         return result
 
+    def save_manifest(
+        self, manifestPath: str, locations: List[str], classes: List[type]
+    ):
+        """
+        Saves the manifest for given classes. Failing to do so is not an error:
+        the package is scanned again next time.
+        :param manifestPath: The manifest path, or None if manifests are disabled.
+        :type manifestPath: str
+        :param locations: The package locations.
+        :type locations: List[str]
+        :param classes: The classes.
+        :type classes: List[type]
+        """
+        if manifestPath is not None:
+            try:
+                manifest = {
+                    "version": self.__class__._manifest_version,
+                    "package": self._package,
+                    "locations": locations,
+                    "fingerprint": self.fingerprint(locations),
+                    "classes": [[obj.__module__, obj.__name__] for obj in classes],
+                }
+                os.makedirs(os.path.dirname(manifestPath), exist_ok=True)
+                temporary_path = f"{manifestPath}.{os.getpid()}.tmp"
+                with open(temporary_path, "w") as file:
+                    json.dump(manifest, file)
+                os.replace(temporary_path, manifestPath)
+            except OSError as err:
+                DbusSignals.logger().warning(
+                    f"Could not save manifest {manifestPath}: {err}"
+                )
+
     def signals(self) -> Dict[str, Type[DbusEvent]]:
         """
         Retrieves the configured signals.
@@ -112,6 +332,95 @@ class DbusSignals(BaseObject):
 
         return result
 
+    def references(self) -> Dict[str, DbusEventReference]:
+        """
+        Retrieves the configured signals, without importing their modules.
+        The source files are parsed instead, and each module is imported the first
+        time one of its d-bus events is needed.
+        :return: For each event class, as imported by its d-bus event module, a reference to the d-bus event class.
+        :rtype: Dict[str, pythoneda.shared.infrastructure.dbus.DbusEventReference]
+        """
+        result = {}
+        package_spec = importlib.util.find_spec(self.package)
+        if package_spec is not None and package_spec.submodule_search_locations:
+            scanner = DbusEventScanner(
+                self.package, list(package_spec.submodule_search_locations)
+            )
+            for reference in scanner.scan():
+                result[reference.event_class_name] = reference
+        else:
+            DbusSignals.logger().error(f"Could not find the package '{self.package}'.")
+
+        return result
+
+    @classmethod
+    def declared_entry_points(cls) -> List[importlib.metadata.EntryPoint]:
+        """
+        Retrieves the entry points declaring d-bus events, in all installed
+        distributions. They are read once per process.
+        :return: Such entry points.
+        :rtype: List[importlib.metadata.EntryPoint]
+        """
+        if cls._entry_points is None:
+            entry_points = importlib.metadata.entry_points()
+            if hasattr(entry_points, "select"):
+                cls._entry_points = list(
+                    entry_points.select(group=cls._entry_points_group)
+                )
+            else:
+                cls._entry_points = list(
+                    entry_points.get(cls._entry_points_group, [])
+                )
+        return cls._entry_points
+
+    def entry_point_references(self) -> Dict[str, DbusEventReference]:
+        """
+        Retrieves the signals declared as entry points by the modules of the
+        package, without importing them.
+        Each entry point in the "pythoneda.dbus.events" group is named after the
+        fully-qualified event class, and points to its d-bus event class, e.g.:
+            [project.entry-points."pythoneda.dbus.events"]
+            "my.domain.events.ThingHappened" = "my.domain.dbus.dbus_thing_happened:DbusThingHappened"
+        :return: For each event class, a reference to the d-bus event class.
+        :rtype: Dict[str, pythoneda.shared.infrastructure.dbus.DbusEventReference]
+        """
+        result = {}
+        prefix = f"{self.package}."
+        for entry_point in self.__class__.declared_entry_points():
+            module_name, _, class_name = entry_point.value.partition(":")
+            module_name = module_name.strip()
+            class_name = class_name.strip()
+            if module_name == self.package or module_name.startswith(prefix):
+                if class_name:
+                    result[entry_point.name] = DbusEventReference(
+                        module_name, class_name, entry_point.name
+                    )
+                else:
+                    DbusSignals.logger().error(
+                        f"Entry point {entry_point.name} does not point to a class: {entry_point.value}"
+                    )
+
+        return result
+
+    def discover(
+        self, discovery: DiscoveryMode = DiscoveryMode.IMPORT
+    ) -> Dict[str, Union[Type[DbusEvent], DbusEventReference]]:
+        """
+        Retrieves the configured signals, using given discovery mechanism.
+        :param discovery: The discovery mechanism.
+        :type discovery: pythoneda.shared.infrastructure.dbus.DiscoveryMode
+        :return: For each event class, the d-bus event class, or a reference to it.
+        :rtype: Dict[str, Union[Type[pythoneda.shared.infrastructure.dbus.DbusEvent], pythoneda.shared.infrastructure.dbus.DbusEventReference]]
+        """
+        if discovery == DiscoveryMode.AST:
+            result = self.references()
+        elif discovery == DiscoveryMode.ENTRY_POINTS:
+            result = self.entry_point_references()
+        else:
+            result = self.signals()
+
+        return result
+
 
 # vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
 # Local Variables:
@@ -0,0 +1,317 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/dbus/dbus_work_queue.py
+
+This file defines the DbusWorkQueue class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from .overflow_policy import OverflowPolicy
+from pythoneda.shared import BaseObject
+from typing import Any, Awaitable, Callable
+
+
+class DbusWorkQueue(BaseObject):
+    """
+    A bounded in-memory queue drained by a fixed number of background workers.
+
+    Class name: DbusWorkQueue
+
+    Responsibilities:
+        - Accept work items, applying an overflow policy when full.
+        - Run a fixed number of workers that process the items.
+        - Expose the queue depth and counters.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.dbus.OverflowPolicy: What to do when full.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable],
+        maxSize: int = 1024,
+        workers: int = 1,
+        overflowPolicy: OverflowPolicy = OverflowPolicy.BLOCK,
+        name: str = "dbus-work-queue",
+    ):
+        """
+        Creates a new DbusWorkQueue instance.
+        :param handler: The coroutine function processing each item.
+        :type handler: Callable[[Any], Awaitable]
+        :param maxSize: The maximum number of queued items.
+        :type maxSize: int
+        :param workers: The number of workers.
+        :type workers: int
+        :param overflowPolicy: What to do when the queue is full.
+        :type overflowPolicy: pythoneda.shared.infrastructure.dbus.OverflowPolicy
+        :param name: The name of the queue, for logging purposes.
+        :type name: str
+        """
+        super().__init__()
+        self._handler = handler
+        self._max_size = max(1, maxSize)
+        self._workers = max(1, workers)
+        self._overflow_policy = OverflowPolicy(overflowPolicy)
+        self._name = name
+        self._queue = None
+        self._tasks = []
+        self._in_flight = 0
+        self._waiting = 0
+        self._last_waiting = None
+        self._processed = 0
+        self._dropped = 0
+        self._failed = 0
+
+    @property
+    def max_size(self) -> int:
+        """
+        Retrieves the maximum number of queued items.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._max_size
+
+    @property
+    def workers(self) -> int:
+        """
+        Retrieves the number of workers.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._workers
+
+    @property
+    def overflow_policy(self) -> OverflowPolicy:
+        """
+        Retrieves the overflow policy.
+        :return: Such policy.
+        :rtype: pythoneda.shared.infrastructure.dbus.OverflowPolicy
+        """
+        return self._overflow_policy
+
+    @property
+    def depth(self) -> int:
+        """
+        Retrieves the number of items waiting to be processed.
+        :return: Such number.
+        :rtype: int
+        """
+        if self._queue is None:
+            return 0
+        return self._queue.qsize()
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Retrieves the number of items being processed.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        """
+        Retrieves the number of items submitted without waiting, which are
+        waiting for room in the queue.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._waiting
+
+    @property
+    def processed(self) -> int:
+        """
+        Retrieves the number of items processed so far.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._processed
+
+    @property
+    def dropped(self) -> int:
+        """
+        Retrieves the number of items discarded because the queue was full.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._dropped
+
+    @property
+    def failed(self) -> int:
+        """
+        Retrieves the number of items whose processing raised an error.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._failed
+
+    @property
+    def started(self) -> bool:
+        """
+        Checks whether the workers are running.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return len(self._tasks) > 0
+
+    def start(self):
+        """
+        Starts the workers, unless they are already running.
+        It must be called from within a running event loop.
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(self._max_size)
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._work(), name=f"{self._name}-{index}")
+                for index in range(self._workers)
+            ]
+
+    async def put(self, item: Any) -> bool:
+        """
+        Enqueues given item, applying the overflow policy if the queue is full.
+        :param item: The item.
+        :type item: Any
+        :return: True if the item was enqueued.
+        :rtype: bool
+        """
+        self.start()
+        result = True
+        if self._overflow_policy == OverflowPolicy.BLOCK:
+            await self._queue.put(item)
+        else:
+            result = self._offer(item)
+
+        return result
+
+    def put_nowait(self, item: Any) -> bool:
+        """
+        Enqueues given item without waiting, for producers which cannot await.
+        Under the drop policies, it behaves as put(). Under the block policy, if the
+        queue is full, the item waits for room in the background, and it's counted
+        as waiting meanwhile; items submitted later wait behind it. Such producers
+        must stop producing until wait_for_room() returns, since waiting items are
+        never dropped.
+        It must be called from within a running event loop.
+        :param item: The item.
+        :type item: Any
+        :return: True if the item was enqueued, or is waiting to be.
+        :rtype: bool
+        """
+        self.start()
+        result = True
+        if self._overflow_policy != OverflowPolicy.BLOCK:
+            result = self._offer(item)
+        elif self._waiting > 0 or self._queue.full():
+            self._waiting += 1
+            self._last_waiting = asyncio.create_task(self._put_when_possible(item))
+        else:
+            self._queue.put_nowait(item)
+
+        return result
+
+    async def wait_for_room(self):
+        """
+        Waits until no item is waiting for room in the queue.
+        """
+        while self._waiting > 0:
+            await asyncio.shield(self._last_waiting)
+
+    async def _put_when_possible(self, item: Any):
+        """
+        Enqueues given item as soon as there's room for it.
+        :param item: The item.
+        :type item: Any
+        """
+        try:
+            await self._queue.put(item)
+        finally:
+            self._waiting -= 1
+
+    def _offer(self, item: Any) -> bool:
+        """
+        Enqueues given item without waiting, dropping an item if the queue is full.
+        :param item: The item.
+        :type item: Any
+        :return: True if the item was enqueued.
+        :rtype: bool
+        """
+        result = True
+        if self._queue.full():
+            self._dropped += 1
+            if self._overflow_policy == OverflowPolicy.DROP_OLDEST:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                DbusWorkQueue.logger().warning(
+                    f"{self._name} is full, dropping the oldest item"
+                )
+            else:
+                result = False
+                DbusWorkQueue.logger().warning(
+                    f"{self._name} is full, dropping the newest item"
+                )
+        if result:
+            self._queue.put_nowait(item)
+
+        return result
+
+    async def _work(self):
+        """
+        Processes queued items until cancelled.
+        """
+        while True:
+            item = await self._queue.get()
+            self._in_flight += 1
+            try:
+                await self._handler(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                self._failed += 1
+                DbusWorkQueue.logger().error(f"{self._name}: {err}")
+            finally:
+                self._in_flight -= 1
+                self._processed += 1
+                self._queue.task_done()
+
+    async def join(self):
+        """
+        Waits until all queued items have been processed.
+        """
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self):
+        """
+        Stops the workers. Items still queued are discarded.
+        """
+        tasks = self._tasks
+        self._tasks = []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
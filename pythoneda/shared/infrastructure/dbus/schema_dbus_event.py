@@ -0,0 +1,167 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/dbus/schema_dbus_event.py
+
+This file defines the SchemaDbusEvent class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import abc
+from dbus_next import Message
+from .dbus_event import DbusEvent
+from .dbus_event_codec import DbusEventCodec
+from .dbus_memfd_payload import DbusMemfdPayload
+import os
+from .wire_format import WireFormat
+from pythoneda.shared import Event, Invariants, PythonedaApplication
+from typing import Any, List, Tuple
+
+
+class SchemaDbusEvent(DbusEvent, abc.ABC):
+    """
+    D-Bus events whose signals are derived from the event class itself.
+
+    Class name: SchemaDbusEvent
+
+    Responsibilities:
+        - Implement sign(), transform() and parse() with a compiled codec.
+        - Send the invariants along with the event.
+        - Support the binary format, and accept both formats when parsing.
+        - Read large binary envelopes sent as file descriptors.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.dbus.DbusEventCodec: Encodes and decodes the events.
+        - pythoneda.shared.infrastructure.dbus.DbusMemfdPayload: Maps large envelopes.
+    """
+
+    @classmethod
+    def codec(cls) -> DbusEventCodec:
+        """
+        Retrieves the codec for the event class.
+        :return: Such codec.
+        :rtype: pythoneda.shared.infrastructure.dbus.DbusEventCodec
+        """
+        return DbusEventCodec.for_event_class(cls.event_class())
+
+    @classmethod
+    def compile(cls):
+        """
+        Creates the codec for the event class.
+        """
+        cls.codec()
+
+    @classmethod
+    def transmits_id(cls) -> bool:
+        """
+        Checks whether signals of this class carry the id of their events.
+        :return: True if the event class accepts reconstructedId.
+        :rtype: bool
+        """
+        return "reconstructedId" in cls.codec().fields
+
+    @classmethod
+    def has_fixed_signature(cls) -> bool:
+        """
+        Checks whether sign() returns the same signature for every event.
+        :return: True, since the signature derives from the constructor.
+        :rtype: bool
+        """
+        return True
+
+    @classmethod
+    def supports_wire_format(cls, wireFormat: WireFormat) -> bool:
+        """
+        Checks whether this class can lay out events in given format.
+        :param wireFormat: The format.
+        :type wireFormat: pythoneda.shared.infrastructure.dbus.WireFormat
+        :return: True, since both text and binary formats are supported.
+        :rtype: bool
+        """
+        return True
+
+    @classmethod
+    def to_binary(cls, event: Event) -> bytes:
+        """
+        Packs given event, and its invariants, in a binary envelope.
+        :param event: The event.
+        :type event: pythoneda.shared.Event
+        :return: The envelope.
+        :rtype: bytes
+        """
+        return cls.codec().encode_binary(event, Invariants.instance().to_json(event))
+
+    @classmethod
+    def sign(cls, event: Event) -> str:
+        """
+        Retrieves the signature for the parameters of given event.
+        :param event: The domain event.
+        :type event: pythoneda.shared.Event
+        :return: The signature of the event fields, followed by the invariants.
+        :rtype: str
+        """
+        return cls.codec().signature + "s"
+
+    @classmethod
+    def transform(cls, event: Event) -> List[Any]:
+        """
+        Transforms given event to signal parameters.
+        :param event: The event to transform.
+        :type event: pythoneda.shared.Event
+        :return: The event fields, followed by the invariants.
+        :rtype: List[Any]
+        """
+        result = cls.codec().encode(event)
+        result.append(Invariants.instance().to_json(event))
+
+        return result
+
+    @classmethod
+    def parse(cls, message: Message, app: PythonedaApplication) -> Tuple[str, Event]:
+        """
+        Parses given d-bus message containing an event, in either format.
+        Large binary envelopes might come in a memfd instead, which is mapped
+        rather than read.
+        :param message: The message.
+        :type message: dbus_next.Message
+        :param app: The application.
+        :type app: pythoneda.shared.PythonedaApplication
+        :return: A tuple with the invariants and the specific event.
+        :rtype: Tuple[str, pythoneda.shared.Event]
+        """
+        body = message.body
+        if message.signature == "ay":
+            result = cls.codec().decode_binary(body[0])
+        elif message.signature == "h":
+            fd = message.unix_fds[body[0]]
+            try:
+                with DbusMemfdPayload.map(fd) as payload:
+                    result = cls.codec().decode_binary(payload)
+            finally:
+                os.close(fd)
+        else:
+            result = body[-1], cls.codec().decode(body[:-1])
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,45 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/ipc/__init__.py
+
+This file ensures pythoneda.shared.infrastructure.ipc is a package.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+__path__ = __import__("pkgutil").extend_path(__path__, __name__)
+
+from .ipc_frame_codec import IpcFrameCodec
+from .unix_socket_subscription import UnixSocketSubscription
+from .unix_socket_hub import UnixSocketHub
+from .unix_socket_publisher_bus import UnixSocketPublisherBus
+from .unix_socket_subscriber_bus import UnixSocketSubscriberBus
+from .unix_socket_signal_emitter import UnixSocketSignalEmitter
+from .unix_socket_signal_listener import UnixSocketSignalListener
+from .shared_memory_ring import SharedMemoryRing
+from .shared_memory_ring_writer import SharedMemoryRingWriter
+from .shared_memory_publisher_bus import SharedMemoryPublisherBus
+from .shared_memory_subscriber_bus import SharedMemorySubscriberBus
+from .shared_memory_signal_emitter import SharedMemorySignalEmitter
+from .shared_memory_signal_listener import SharedMemorySignalListener
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,324 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/ipc/ipc_frame_codec.py
+
+This file defines the IpcFrameCodec class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import base64
+import copy
+from dbus_next import Message
+import functools
+import json
+from pythoneda.shared import BaseObject
+import struct
+from typing import Any, List, Tuple
+
+
+class IpcFrameCodec(BaseObject):
+    """
+    Encodes d-bus signals, and match rules, as length-prefixed frames.
+
+    Class name: IpcFrameCodec
+
+    Responsibilities:
+        - Write each signal as a frame: its path, interface, member, signature and body.
+        - Write AddMatch / RemoveMatch requests, and their replies, as frames.
+        - Read frames back, rejecting the ones above the maximum size.
+        - Split buffered data into frames, so that many are read at once.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.ipc.UnixSocketHub: Reads requests, and writes signals.
+        - pythoneda.shared.infrastructure.ipc.UnixSocketSubscriberBus: Writes requests, and reads signals.
+    """
+
+    SIGNAL = 1
+    ADD_MATCH = 2
+    REMOVE_MATCH = 3
+    REPLY = 4
+
+    # Every frame starts with its size, not counting these four bytes.
+    _length = struct.Struct("<I")
+    _kind = struct.Struct("<B")
+    _text_length = struct.Struct("<I")
+    _serial = struct.Struct("<I")
+    _max_frame_size = 64 * 1024 * 1024
+    _bytes_key = "$bytes"
+
+    @classmethod
+    def _pack_text(cls, value: str) -> bytes:
+        """
+        Encodes given text, prefixed with its size.
+        :param value: The text.
+        :type value: str
+        :return: The encoded text.
+        :rtype: bytes
+        """
+        data = (value or "").encode("utf-8")
+        return cls._text_length.pack(len(data)) + data
+
+    @classmethod
+    def _unpack_text(cls, data: bytes, offset: int) -> Tuple[str, int]:
+        """
+        Decodes the text at given offset.
+        :param data: The frame.
+        :type data: bytes
+        :param offset: The offset of the text.
+        :type offset: int
+        :return: The text, and the offset right after it.
+        :rtype: Tuple[str, int]
+        """
+        (size,) = cls._text_length.unpack_from(data, offset)
+        offset += cls._text_length.size
+        end = offset + size
+        if end > len(data):
+            raise ValueError("Truncated frame")
+        return (bytes(data[offset:end]).decode("utf-8"), end)
+
+    @classmethod
+    def _frame(cls, kind: int, payload: bytes) -> bytes:
+        """
+        Builds a frame.
+        :param kind: The kind of frame.
+        :type kind: int
+        :param payload: Its contents.
+        :type payload: bytes
+        :return: The frame, including its size.
+        :rtype: bytes
+        """
+        header = cls._length.pack(cls._kind.size + len(payload)) + cls._kind.pack(kind)
+        return header + payload
+
+    @classmethod
+    def _encode_value(cls, value: Any) -> Any:
+        """
+        Encodes the values JSON doesn't support, i.e. bytes.
+        :param value: The value.
+        :type value: Any
+        :return: Its JSON-friendly representation.
+        :rtype: Any
+        """
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return {cls._bytes_key: base64.b64encode(bytes(value)).decode("ascii")}
+        raise TypeError(f"{type(value).__name__} cannot be sent in a frame")
+
+    @classmethod
+    def _decode_value(cls, value: dict) -> Any:
+        """
+        Restores the values encoded by _encode_value().
+        :param value: The JSON object.
+        :type value: dict
+        :return: The original value.
+        :rtype: Any
+        """
+        result = value
+        if len(value) == 1 and cls._bytes_key in value:
+            result = base64.b64decode(value[cls._bytes_key])
+
+        return result
+
+    @classmethod
+    @functools.lru_cache(maxsize=1024)
+    def _signal_header(
+        cls, path: str, interface: str, member: str, signature: str
+    ) -> bytes:
+        """
+        Encodes the fields preceding the body of a signal. They repeat a lot,
+        so they are cached.
+        :param path: The d-bus path.
+        :type path: str
+        :param interface: The interface.
+        :type interface: str
+        :param member: The member.
+        :type member: str
+        :param signature: The signature.
+        :type signature: str
+        :return: The encoded fields.
+        :rtype: bytes
+        """
+        return (
+            cls._pack_text(path)
+            + cls._pack_text(interface)
+            + cls._pack_text(member)
+            + cls._pack_text(signature)
+        )
+
+    @classmethod
+    @functools.lru_cache(maxsize=1024)
+    def _signal_template(cls, header: bytes) -> Message:
+        """
+        Decodes the fields preceding the body of a signal, as a signal with no
+        body. They repeat a lot, so they are decoded, and validated, once.
+        :param header: The encoded fields, as in _signal_header().
+        :type header: bytes
+        :return: The signal, to be copied.
+        :rtype: dbus_next.Message
+        """
+        path, offset = cls._unpack_text(header, 0)
+        interface, offset = cls._unpack_text(header, offset)
+        member, offset = cls._unpack_text(header, offset)
+        signature, offset = cls._unpack_text(header, offset)
+        return Message.new_signal(path, interface, member, signature, [])
+
+    @classmethod
+    def encode_signal(cls, message: Message) -> bytes:
+        """
+        Encodes given signal. Binary envelopes ("ay") are written as they are;
+        other bodies, as JSON.
+        :param message: The signal.
+        :type message: dbus_next.Message
+        :return: The frame.
+        :rtype: bytes
+        """
+        if message.unix_fds:
+            raise ValueError("File descriptors cannot be sent in a frame")
+        if message.signature == "ay":
+            body = bytes(message.body[0])
+        else:
+            body = json.dumps(
+                message.body, separators=(",", ":"), default=cls._encode_value
+            ).encode("utf-8")
+        header = cls._signal_header(
+            message.path, message.interface, message.member, message.signature
+        )
+        return cls._frame(cls.SIGNAL, header + body)
+
+    @classmethod
+    def encode_request(cls, kind: int, serial: int, rule: str) -> bytes:
+        """
+        Encodes an AddMatch or RemoveMatch request.
+        :param kind: Either ADD_MATCH or REMOVE_MATCH.
+        :type kind: int
+        :param serial: The serial of the request, to match its reply.
+        :type serial: int
+        :param rule: The match rule.
+        :type rule: str
+        :return: The frame.
+        :rtype: bytes
+        """
+        return cls._frame(kind, cls._serial.pack(serial) + cls._pack_text(rule))
+
+    @classmethod
+    def encode_reply(cls, serial: int, error: str = None) -> bytes:
+        """
+        Encodes the reply to a request.
+        :param serial: The serial of the request.
+        :type serial: int
+        :param error: The error, if the request failed.
+        :type error: str
+        :return: The frame.
+        :rtype: bytes
+        """
+        return cls._frame(cls.REPLY, cls._serial.pack(serial) + cls._pack_text(error))
+
+    @classmethod
+    def decode(cls, payload: bytes) -> Tuple[int, Any]:
+        """
+        Decodes given frame.
+        :param payload: The frame, without its size.
+        :type payload: bytes
+        :return: The kind of frame, and either the signal, a (serial, rule) tuple for requests, or a (serial, error) tuple for replies.
+        :rtype: Tuple[int, Any]
+        """
+        (kind,) = cls._kind.unpack_from(payload)
+        offset = cls._kind.size
+        if kind == cls.SIGNAL:
+            start = offset
+            for _ in range(4):
+                (size,) = cls._text_length.unpack_from(payload, offset)
+                offset += cls._text_length.size + size
+            if offset > len(payload):
+                raise ValueError("Truncated frame")
+            value = copy.copy(cls._signal_template(bytes(payload[start:offset])))
+            if value.signature == "ay":
+                value.body = [bytes(payload[offset:])]
+            else:
+                value.body = json.loads(
+                    bytes(payload[offset:]), object_hook=cls._decode_value
+                )
+        elif kind in (cls.ADD_MATCH, cls.REMOVE_MATCH, cls.REPLY):
+            (serial,) = cls._serial.unpack_from(payload, offset)
+            text, offset = cls._unpack_text(payload, offset + cls._serial.size)
+            value = (serial, text)
+        else:
+            raise ValueError(f"Unknown frame kind: {kind}")
+
+        return (kind, value)
+
+    @classmethod
+    def decode_frame(cls, frame: bytes) -> Tuple[int, Any]:
+        """
+        Decodes given frame, including its size.
+        :param frame: The frame, as built by the encode methods.
+        :type frame: bytes
+        :return: The kind of frame, and its contents, as in decode().
+        :rtype: Tuple[int, Any]
+        """
+        (size,) = cls._length.unpack_from(frame)
+        if size != len(frame) - cls._length.size:
+            raise ValueError(f"Frame size mismatch: {size} bytes declared")
+        return cls.decode(memoryview(frame)[cls._length.size :])
+
+    @classmethod
+    def split(cls, buffer: bytearray) -> List[bytes]:
+        """
+        Takes the complete frames out of given buffer, leaving the rest in it.
+        :param buffer: The data read so far.
+        :type buffer: bytearray
+        :return: The frames, without their size, to be passed to decode().
+        :rtype: List[bytes]
+        """
+        result = []
+        offset = 0
+        with memoryview(buffer) as view:
+            while len(view) - offset >= cls._length.size:
+                (size,) = cls._length.unpack_from(view, offset)
+                if size > cls._max_frame_size:
+                    raise ValueError(f"Frame too large: {size} bytes")
+                end = offset + cls._length.size + size
+                if end > len(view):
+                    break
+                result.append(view[offset + cls._length.size : end].tobytes())
+                offset = end
+        del buffer[:offset]
+
+        return result
+
+    @classmethod
+    async def read(cls, reader: asyncio.StreamReader) -> Tuple[int, Any]:
+        """
+        Reads and decodes the next frame.
+        :param reader: The stream.
+        :type reader: asyncio.StreamReader
+        :return: The kind of frame, and its contents, as in decode().
+        :rtype: Tuple[int, Any]
+        """
+        (size,) = cls._length.unpack(await reader.readexactly(cls._length.size))
+        if size > cls._max_frame_size:
+            raise ValueError(f"Frame too large: {size} bytes")
+        return cls.decode(await reader.readexactly(size))
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
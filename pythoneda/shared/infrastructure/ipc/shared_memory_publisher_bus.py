@@ -0,0 +1,182 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/ipc/shared_memory_publisher_bus.py
+
+This file defines the SharedMemoryPublisherBus class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from dbus_next import BusType, Message, MessageType
+from dbus_next.service import ServiceInterface
+from .ipc_frame_codec import IpcFrameCodec
+from pythoneda.shared import BaseObject
+from .shared_memory_ring import SharedMemoryRing
+from .shared_memory_ring_writer import SharedMemoryRingWriter
+
+
+class SharedMemoryPublisherBus(BaseObject):
+    """
+    A replacement for dbus_next.aio.MessageBus, writing signals to a shared memory ring.
+
+    Class name: SharedMemoryPublisherBus
+
+    Responsibilities:
+        - Offer the subset of the MessageBus API used by emitters.
+        - Send signals to the listener process consuming the ring, with no d-bus daemon in between.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.ipc.SharedMemoryRingWriter: Writes to the ring.
+        - pythoneda.shared.infrastructure.ipc.SharedMemorySignalEmitter: Creates publisher buses.
+    """
+
+    def __init__(
+        self,
+        bus_type: BusType = BusType.SESSION,
+        negotiate_unix_fd: bool = False,
+        ring_name: str = None,
+        full_timeout: float = 1.0,
+    ):
+        """
+        Creates a new SharedMemoryPublisherBus instance.
+        Parameters are named after the ones of dbus_next.aio.MessageBus.
+        :param bus_type: The bus type. Each one has its own ring.
+        :type bus_type: dbus_next.BusType
+        :param negotiate_unix_fd: Whether file descriptors can be passed. They cannot, over this transport.
+        :type negotiate_unix_fd: bool
+        :param ring_name: The name of the ring, followed by the bus type.
+        :type ring_name: str
+        :param full_timeout: How long to wait for room in the ring, in seconds.
+        :type full_timeout: float
+        """
+        super().__init__()
+        if negotiate_unix_fd:
+            raise ValueError(
+                "File descriptors cannot be passed over shared memory buses"
+            )
+        self._bus_type = bus_type
+        name = SharedMemoryRing.default_name(bus_type)
+        if ring_name is not None:
+            name = f"{ring_name}-{bus_type.name.lower()}"
+        self._writer = SharedMemoryRingWriter.instance(name, full_timeout)
+        self._connected = False
+        self._serial = 0
+
+    @property
+    def writer(self) -> SharedMemoryRingWriter:
+        """
+        Retrieves the writer of the ring.
+        :return: Such writer.
+        :rtype: pythoneda.shared.infrastructure.ipc.SharedMemoryRingWriter
+        """
+        return self._writer
+
+    @property
+    def connected(self) -> bool:
+        """
+        Checks whether the bus is connected.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._connected
+
+    async def connect(self) -> "SharedMemoryPublisherBus":
+        """
+        Starts writing to the ring. The listener process might not have
+        created it yet; signals are dropped until it does.
+        :return: This bus.
+        :rtype: pythoneda.shared.infrastructure.ipc.SharedMemoryPublisherBus
+        """
+        if not self._connected:
+            self._writer.acquire()
+            self._connected = True
+        return self
+
+    def disconnect(self):
+        """
+        Stops writing to the ring.
+        """
+        if self._connected:
+            self._connected = False
+            self._writer.release()
+
+    async def wait_for_disconnect(self):
+        """
+        Returns right away, since disconnecting is immediate.
+        """
+        pass
+
+    def export(self, path: str, interface: ServiceInterface):
+        """
+        Exports given interface. There's nothing to export on a ring.
+        :param path: The d-bus path.
+        :type path: str
+        :param interface: The interface.
+        :type interface: dbus_next.service.ServiceInterface
+        """
+        pass
+
+    def unexport(self, path: str, interface: ServiceInterface = None):
+        """
+        Unexports given interface. There's nothing to unexport on a ring.
+        :param path: The d-bus path.
+        :type path: str
+        :param interface: The interface, or None for all of them.
+        :type interface: dbus_next.service.ServiceInterface
+        """
+        pass
+
+    def send(self, message: Message) -> asyncio.Future:
+        """
+        Writes given signal to the ring.
+        :param message: The signal.
+        :type message: dbus_next.Message
+        :return: A future, done once the signal is in the ring.
+        :rtype: asyncio.Future
+        """
+        if not self._connected:
+            result = asyncio.get_running_loop().create_future()
+            result.set_exception(ConnectionError("Shared memory bus not connected"))
+        elif message.unix_fds:
+            result = asyncio.get_running_loop().create_future()
+            result.set_exception(
+                ValueError("File descriptors cannot be passed over shared memory buses")
+            )
+        elif message.message_type != MessageType.SIGNAL:
+            result = asyncio.get_running_loop().create_future()
+            result.set_exception(
+                NotImplementedError("Shared memory buses only send signals")
+            )
+        else:
+            self._serial += 1
+            message.serial = self._serial
+            try:
+                result = self._writer.write(IpcFrameCodec.encode_signal(message))
+            except (TypeError, ValueError) as err:
+                result = asyncio.get_running_loop().create_future()
+                result.set_exception(err)
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
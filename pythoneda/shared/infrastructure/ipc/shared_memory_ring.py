@@ -0,0 +1,333 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/ipc/shared_memory_ring.py
+
+This file defines the SharedMemoryRing class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from dbus_next import BusType
+import _posixshmem
+import mmap
+from multiprocessing import shared_memory
+import os
+from pythoneda.shared import BaseObject
+import struct
+import tempfile
+
+
+class SharedMemoryRing(BaseObject):
+    """
+    A single-producer, single-consumer ring of frames, in shared memory.
+
+    Class name: SharedMemoryRing
+
+    Responsibilities:
+        - Create the shared memory segment (consumer), or map it (producer).
+        - Append frames without locks, and read them back in order.
+        - Keep the flags both sides use to coordinate: whether the consumer sleeps, and whether it's gone.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.ipc.SharedMemoryRingWriter: The producer side.
+        - pythoneda.shared.infrastructure.ipc.SharedMemorySubscriberBus: The consumer side.
+    """
+
+    # Head and tail are ever-growing 64-bit counters, each written by one side only,
+    # in its own cache line. Updates rely on aligned 8-byte stores being atomic and
+    # not reordered with the preceding stores, as on x86-64.
+    _header = struct.Struct("<IIQ")
+    _magic = 0x50454452
+    _version = 1
+    _counter = struct.Struct("<Q")
+    _flag = struct.Struct("<I")
+    _head_offset = 64
+    _tail_offset = 128
+    _waiting_offset = 192
+    _closed_offset = 256
+    _data_offset = 320
+    _length = struct.Struct("<I")
+    _padding = 0xFFFFFFFF
+    _alignment = 8
+
+    def __init__(self, name: str, capacity: int = None, create: bool = False):
+        """
+        Creates a new SharedMemoryRing instance.
+        :param name: The name of the shared memory segment.
+        :type name: str
+        :param capacity: The size of the ring, in bytes. Only used when creating it.
+        :type capacity: int
+        :param create: Whether to create the segment (consumer), or map it (producer).
+        :type create: bool
+        """
+        super().__init__()
+        self._name = name
+        cls = self.__class__
+        self._shm = None
+        self._mmap = None
+        if create:
+            capacity = (capacity or 8 * 1024 * 1024) // cls._alignment * cls._alignment
+            self._shm = shared_memory.SharedMemory(
+                name=name, create=True, size=cls._data_offset + capacity
+            )
+            self._buffer = self._shm.buf
+            self._buffer[: cls._data_offset] = bytes(cls._data_offset)
+            # The magic number goes last: producers take it as the ring being ready.
+            cls._header.pack_into(self._buffer, 0, 0, cls._version, capacity)
+            cls._flag.pack_into(self._buffer, 0, cls._magic)
+        else:
+            self._mmap = cls._map(name)
+            self._buffer = memoryview(self._mmap)
+            magic, version, capacity = cls._header.unpack_from(self._buffer, 0)
+            if magic != cls._magic or version != cls._version:
+                self.close()
+                raise ValueError(f"{name} is not a ring, or has an unsupported version")
+        self._capacity = capacity
+
+    @classmethod
+    def _map(cls, name: str) -> mmap.mmap:
+        """
+        Maps an existing segment. SharedMemory is not used for that, since
+        before Python 3.13 it registers the segment in the resource tracker of
+        this process, which would remove it on exit. The consumer owns it.
+        :param name: The name of the segment.
+        :type name: str
+        :return: The mapping.
+        :rtype: mmap.mmap
+        """
+        fd = _posixshmem.shm_open(f"/{name}", os.O_RDWR, mode=0o600)
+        try:
+            result = mmap.mmap(fd, 0)
+        finally:
+            os.close(fd)
+
+        return result
+
+    @classmethod
+    def remove(cls, name: str) -> bool:
+        """
+        Removes the segment with given name, if any, telling its producer the
+        consumer has gone away.
+        :param name: The name of the segment.
+        :type name: str
+        :return: True if it existed.
+        :rtype: bool
+        """
+        try:
+            stale = cls(name)
+        except FileNotFoundError:
+            stale = None
+        if stale is not None:
+            stale.mark_closed()
+            stale.close()
+            try:
+                _posixshmem.shm_unlink(f"/{name}")
+            except FileNotFoundError:
+                pass
+
+        return stale is not None
+
+    @classmethod
+    def default_name(cls, busType: BusType) -> str:
+        """
+        Retrieves the segment name used for given bus type, unless configured otherwise.
+        :param busType: The bus type.
+        :type busType: dbus_next.BusType
+        :return: Such name.
+        :rtype: str
+        """
+        return f"pythoneda-events-{busType.name.lower()}"
+
+    @classmethod
+    def wakeup_path(cls, name: str) -> str:
+        """
+        Retrieves the path of the FIFO used to wake up the consumer of given ring.
+        :param name: The name of the segment.
+        :type name: str
+        :return: Such path, in $XDG_RUNTIME_DIR if defined.
+        :rtype: str
+        """
+        return os.path.join(
+            os.environ.get("XDG_RUNTIME_DIR", tempfile.gettempdir()),
+            f"{name}.wakeup",
+        )
+
+    @property
+    def name(self) -> str:
+        """
+        Retrieves the name of the segment.
+        :return: Such name.
+        :rtype: str
+        """
+        return self._name
+
+    @property
+    def capacity(self) -> int:
+        """
+        Retrieves the size of the ring.
+        :return: Such size, in bytes.
+        :rtype: int
+        """
+        return self._capacity
+
+    @property
+    def max_frame_size(self) -> int:
+        """
+        Retrieves the size of the largest frame accepted.
+        :return: Such size, in bytes.
+        :rtype: int
+        """
+        return self._capacity // 2 - self.__class__._length.size
+
+    @property
+    def empty(self) -> bool:
+        """
+        Checks whether there's nothing to read.
+        :return: True in such case.
+        :rtype: bool
+        """
+        cls = self.__class__
+        (head,) = cls._counter.unpack_from(self._buffer, cls._head_offset)
+        (tail,) = cls._counter.unpack_from(self._buffer, cls._tail_offset)
+        return head == tail
+
+    @property
+    def consumer_waiting(self) -> bool:
+        """
+        Checks whether the consumer is sleeping, and needs to be woken up.
+        :return: True in such case.
+        :rtype: bool
+        """
+        cls = self.__class__
+        return cls._flag.unpack_from(self._buffer, cls._waiting_offset)[0] != 0
+
+    def flag_waiting(self, waiting: bool):
+        """
+        Flags whether the consumer is sleeping.
+        :param waiting: True in such case.
+        :type waiting: bool
+        """
+        cls = self.__class__
+        cls._flag.pack_into(self._buffer, cls._waiting_offset, 1 if waiting else 0)
+
+    @property
+    def closed(self) -> bool:
+        """
+        Checks whether the consumer has gone away.
+        :return: True in such case.
+        :rtype: bool
+        """
+        cls = self.__class__
+        return cls._flag.unpack_from(self._buffer, cls._closed_offset)[0] != 0
+
+    def mark_closed(self):
+        """
+        Tells the producer the consumer has gone away.
+        """
+        cls = self.__class__
+        cls._flag.pack_into(self._buffer, cls._closed_offset, 1)
+
+    def write(self, frame: bytes) -> bool:
+        """
+        Appends given frame. Producer only.
+        :param frame: The frame.
+        :type frame: bytes
+        :return: False if there's no room for it right now.
+        :rtype: bool
+        """
+        cls = self.__class__
+        size = len(frame)
+        if size > self.max_frame_size:
+            raise ValueError(f"Frame too large for the ring: {size} bytes")
+        (head,) = cls._counter.unpack_from(self._buffer, cls._head_offset)
+        (tail,) = cls._counter.unpack_from(self._buffer, cls._tail_offset)
+        position = head % self._capacity
+        record = -(-(cls._length.size + size) // cls._alignment) * cls._alignment
+        skip = 0
+        if position + record > self._capacity:
+            skip = self._capacity - position
+        result = head + skip + record - tail <= self._capacity
+        if result:
+            if skip > 0:
+                cls._length.pack_into(
+                    self._buffer, cls._data_offset + position, cls._padding
+                )
+                position = 0
+            start = cls._data_offset + position
+            cls._length.pack_into(self._buffer, start, size)
+            start += cls._length.size
+            self._buffer[start : start + size] = frame
+            cls._counter.pack_into(
+                self._buffer, cls._head_offset, head + skip + record
+            )
+
+        return result
+
+    def read(self) -> bytes:
+        """
+        Takes the next frame. Consumer only.
+        :return: The frame, or None if there's nothing to read.
+        :rtype: bytes
+        """
+        result = None
+        cls = self.__class__
+        (head,) = cls._counter.unpack_from(self._buffer, cls._head_offset)
+        (tail,) = cls._counter.unpack_from(self._buffer, cls._tail_offset)
+        if tail != head:
+            position = tail % self._capacity
+            (size,) = cls._length.unpack_from(
+                self._buffer, cls._data_offset + position
+            )
+            if size == cls._padding:
+                tail += self._capacity - position
+                position = 0
+                (size,) = cls._length.unpack_from(self._buffer, cls._data_offset)
+            start = cls._data_offset + position + cls._length.size
+            result = bytes(self._buffer[start : start + size])
+            record = -(-(cls._length.size + size) // cls._alignment) * cls._alignment
+            cls._counter.pack_into(self._buffer, cls._tail_offset, tail + record)
+
+        return result
+
+    def close(self):
+        """
+        Releases the mapping of the segment.
+        """
+        if self._shm is not None:
+            self._buffer = None
+            self._shm.close()
+        elif self._buffer is not None:
+            self._buffer.release()
+            self._buffer = None
+            self._mmap.close()
+
+    def unlink(self):
+        """
+        Removes the segment. Consumer only.
+        """
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
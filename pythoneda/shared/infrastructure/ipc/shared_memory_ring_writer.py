@@ -0,0 +1,282 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/ipc/shared_memory_ring_writer.py
+
+This file defines the SharedMemoryRingWriter class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from collections import deque
+import os
+from pythoneda.shared import BaseObject
+from .shared_memory_ring import SharedMemoryRing
+import time
+
+
+class SharedMemoryRingWriter(BaseObject):
+    """
+    The producer side of a shared memory ring, shared by all buses of this process.
+
+    Class name: SharedMemoryRingWriter
+
+    Responsibilities:
+        - Attach to the ring once the consumer has created it, and again if it restarts.
+        - Write frames in order, waiting for room when the ring is full.
+        - Wake up the consumer when it's sleeping.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.ipc.SharedMemoryRing: The ring.
+        - pythoneda.shared.infrastructure.ipc.SharedMemoryPublisherBus: Writes through it.
+    """
+
+    _instances = {}
+
+    # How often to look for the ring, while there's no consumer.
+    _attach_interval = 0.5
+    _full_poll_interval = 0.0005
+
+    def __init__(self, name: str, fullTimeout: float = 1.0):
+        """
+        Creates a new SharedMemoryRingWriter instance.
+        :param name: The name of the ring.
+        :type name: str
+        :param fullTimeout: How long to wait for room in the ring, in seconds.
+        :type fullTimeout: float
+        """
+        super().__init__()
+        self._name = name
+        self._full_timeout = fullTimeout
+        self._ring = None
+        self._wakeup_fd = None
+        self._next_attach = 0.0
+        self._pending = deque()
+        self._flusher = None
+        self._users = 0
+        self._written = 0
+        self._dropped = 0
+
+    @classmethod
+    def instance(cls, name: str, fullTimeout: float = 1.0) -> "SharedMemoryRingWriter":
+        """
+        Retrieves the writer for given ring, in this process.
+        :param name: The name of the ring.
+        :type name: str
+        :param fullTimeout: How long to wait for room in the ring, in seconds.
+        :type fullTimeout: float
+        :return: Such writer.
+        :rtype: pythoneda.shared.infrastructure.ipc.SharedMemoryRingWriter
+        """
+        result = cls._instances.get(name, None)
+        if result is None:
+            result = cls(name, fullTimeout)
+            cls._instances[name] = result
+
+        return result
+
+    @property
+    def attached(self) -> bool:
+        """
+        Checks whether the writer is attached to a ring with a consumer.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._ring is not None and not self._ring.closed
+
+    @property
+    def written(self) -> int:
+        """
+        Retrieves the number of frames written.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._written
+
+    @property
+    def dropped(self) -> int:
+        """
+        Retrieves the number of frames dropped, since there was no consumer.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._dropped
+
+    def acquire(self):
+        """
+        Registers a new user of the writer.
+        """
+        self._users += 1
+
+    def release(self):
+        """
+        Unregisters a user of the writer, detaching from the ring if it was the last one.
+        """
+        self._users = max(self._users - 1, 0)
+        if self._users == 0:
+            if self._flusher is not None:
+                self._flusher.cancel()
+                self._flusher = None
+            self._fail_pending(ConnectionError(f"Writer for {self._name} closed"))
+            self._detach()
+            self.__class__._instances.pop(self._name, None)
+
+    def _attach(self) -> bool:
+        """
+        Attaches to the ring, unless it's already attached, or it was checked recently.
+        :return: True if attached.
+        :rtype: bool
+        """
+        if self._ring is not None and self._ring.closed:
+            SharedMemoryRingWriter.logger().info(f"Consumer of {self._name} went away")
+            self._detach()
+        if self._ring is None and time.monotonic() >= self._next_attach:
+            try:
+                self._ring = SharedMemoryRing(self._name)
+            except FileNotFoundError:
+                self._next_attach = time.monotonic() + self.__class__._attach_interval
+            except ValueError as err:
+                # Most likely, the consumer is still initializing it.
+                SharedMemoryRingWriter.logger().debug(f"{self._name} not ready: {err}")
+                self._next_attach = time.monotonic() + self.__class__._attach_interval
+            if self._ring is not None:
+                if self._ring.closed:
+                    self._detach()
+                else:
+                    try:
+                        self._wakeup_fd = os.open(
+                            SharedMemoryRing.wakeup_path(self._name),
+                            os.O_WRONLY | os.O_NONBLOCK | os.O_CLOEXEC,
+                        )
+                    except OSError as err:
+                        SharedMemoryRingWriter.logger().warning(
+                            f"No wakeups for {self._name}, its consumer will poll: {err}"
+                        )
+                    SharedMemoryRingWriter.logger().debug(
+                        f"Writing to {self._name} ({self._ring.capacity} bytes)"
+                    )
+
+        return self._ring is not None
+
+    def _detach(self):
+        """
+        Releases the ring, and the wakeup FIFO.
+        """
+        if self._wakeup_fd is not None:
+            os.close(self._wakeup_fd)
+            self._wakeup_fd = None
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+
+    def _wake_up(self):
+        """
+        Wakes up the consumer, if it's sleeping.
+        """
+        if self._ring.consumer_waiting and self._wakeup_fd is not None:
+            self._ring.flag_waiting(False)
+            try:
+                os.write(self._wakeup_fd, b"\0")
+            except BlockingIOError:
+                # Plenty of wakeups pending already.
+                pass
+            except OSError as err:
+                SharedMemoryRingWriter.logger().debug(
+                    f"Could not wake up the consumer of {self._name}: {err}"
+                )
+
+    def write(self, frame: bytes) -> asyncio.Future:
+        """
+        Writes given frame, after the ones already waiting for room.
+        Frames are dropped while there's no consumer, as d-bus does with
+        signals no one listens to.
+        :param frame: The frame.
+        :type frame: bytes
+        :return: A future, done once the frame is in the ring (or dropped).
+        :rtype: asyncio.Future
+        """
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        if not self._attach():
+            self._dropped += 1
+            result.set_result(None)
+        elif len(frame) > self._ring.max_frame_size:
+            result.set_exception(
+                ValueError(f"Frame too large for {self._name}: {len(frame)} bytes")
+            )
+        elif not self._pending and self._ring.write(frame):
+            self._written += 1
+            self._wake_up()
+            result.set_result(None)
+        else:
+            self._pending.append((frame, result, time.monotonic() + self._full_timeout))
+            if self._flusher is None:
+                self._flusher = loop.create_task(self._flush())
+
+        return result
+
+    async def _flush(self):
+        """
+        Writes the frames waiting for room, in order, as the consumer makes it.
+        """
+        try:
+            while self._pending:
+                if not self._attach():
+                    self._dropped += len(self._pending)
+                    self._fail_pending(None)
+                    break
+                frame, future, deadline = self._pending[0]
+                if self._ring.write(frame):
+                    self._pending.popleft()
+                    self._written += 1
+                    if not future.done():
+                        future.set_result(None)
+                elif time.monotonic() >= deadline:
+                    self._pending.popleft()
+                    if not future.done():
+                        future.set_exception(
+                            BufferError(f"{self._name} is full, consumer too slow")
+                        )
+                else:
+                    self._wake_up()
+                    await asyncio.sleep(self.__class__._full_poll_interval)
+            if self._ring is not None:
+                self._wake_up()
+        finally:
+            self._flusher = None
+
+    def _fail_pending(self, error: Exception):
+        """
+        Completes the futures of the frames waiting for room.
+        :param error: The error to set, or None to complete them normally.
+        :type error: Exception
+        """
+        while self._pending:
+            frame, future, deadline = self._pending.popleft()
+            if not future.done():
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,75 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/ipc/shared_memory_signal_emitter.py
+
+This file defines the SharedMemorySignalEmitter class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import abc
+import functools
+from pythoneda.shared.infrastructure.dbus import DbusSignalEmitter
+from typing import Dict, Tuple
+from .shared_memory_publisher_bus import SharedMemoryPublisherBus
+
+
+class SharedMemorySignalEmitter(DbusSignalEmitter, abc.ABC):
+    """
+    A DbusSignalEmitter writing its signals to a shared memory ring, instead of d-bus.
+
+    Class name: SharedMemorySignalEmitter
+
+    Responsibilities:
+        - Send the same signals as DbusSignalEmitter, to a listener process on the same host.
+        - Accept the same configuration, plus the ring settings.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.ipc.SharedMemoryPublisherBus: Publishes the signals.
+        - pythoneda.shared.infrastructure.dbus.DbusEvent: Encodes the events, as usual.
+    """
+
+    @classmethod
+    def enable(cls, *args: Tuple, **kwargs: Dict):
+        """
+        Enables this port.
+        :param args: Additional positional arguments.
+        :type args: Tuple
+        :param kwargs: Additional keyword arguments. Besides the ones of DbusSignalEmitter, "ring_name" sets the ring to write to, and "full_timeout" how long to wait for room in it, in seconds.
+        :type kwargs: Dict
+        """
+        if kwargs.get("bus_factory", None) is None:
+            kwargs["bus_factory"] = functools.partial(
+                SharedMemoryPublisherBus,
+                ring_name=kwargs.get("ring_name", None),
+                full_timeout=kwargs.get("full_timeout", 1.0),
+            )
+        if kwargs.get("memfd_threshold", None) is not None:
+            SharedMemorySignalEmitter.logger().warning(
+                "File descriptors cannot be passed over shared memory buses, sending payloads inline"
+            )
+            kwargs["memfd_threshold"] = None
+        cls._connection_pool = None
+        super().enable(*args, **kwargs)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,77 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/ipc/shared_memory_signal_listener.py
+
+This file defines the SharedMemorySignalListener class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import abc
+import functools
+from pythoneda.shared.infrastructure.dbus import DbusSignalListener
+from typing import Dict, Tuple
+from .shared_memory_subscriber_bus import SharedMemorySubscriberBus
+
+
+class SharedMemorySignalListener(DbusSignalListener, abc.ABC):
+    """
+    A DbusSignalListener reading its signals from a shared memory ring, instead of d-bus.
+
+    Class name: SharedMemorySignalListener
+
+    Responsibilities:
+        - Receive the same signals as DbusSignalListener, from an emitter process on the same host.
+        - Accept the same configuration, plus the ring settings.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.ipc.SharedMemorySubscriberBus: Receives the signals.
+        - pythoneda.shared.infrastructure.dbus.DbusEvent: Decodes the events, as usual.
+    """
+
+    @classmethod
+    def enable(cls, *args: Tuple, **kwargs: Dict):
+        """
+        Enables this port.
+        :param args: Additional positional arguments.
+        :type args: Tuple
+        :param kwargs: Additional keyword arguments. Besides the ones of DbusSignalListener, "ring_name" and "ring_size" set the ring to create, "spin_iterations" how many times to check it before sleeping, and "poll_interval" the longest sleep, in seconds.
+        :type kwargs: Dict
+        """
+        if kwargs.get("bus_factory", None) is None:
+            kwargs["bus_factory"] = functools.partial(
+                SharedMemorySubscriberBus,
+                ring_name=kwargs.get("ring_name", None),
+                ring_size=kwargs.get("ring_size", 8 * 1024 * 1024),
+                spin_iterations=kwargs.get("spin_iterations", 100),
+                poll_interval=kwargs.get("poll_interval", 0.05),
+            )
+        if kwargs.get("unix_fds", False):
+            SharedMemorySignalListener.logger().warning(
+                "File descriptors cannot be passed over shared memory buses, ignoring unix_fds"
+            )
+            kwargs["unix_fds"] = False
+        cls._connection_pool = None
+        super().enable(*args, **kwargs)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,321 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/ipc/shared_memory_subscriber_bus.py
+
+This file defines the SharedMemorySubscriberBus class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from dbus_next import BusType, Message
+from .ipc_frame_codec import IpcFrameCodec
+import os
+from pythoneda.shared import BaseObject
+from .shared_memory_ring import SharedMemoryRing
+from typing import Callable
+
+
+class SharedMemorySubscriberBus(BaseObject):
+    """
+    A replacement for dbus_next.aio.MessageBus, reading signals from a shared memory ring.
+
+    Class name: SharedMemorySubscriberBus
+
+    Responsibilities:
+        - Offer the subset of the MessageBus API used by listeners.
+        - Create the ring and its wakeup FIFO, and remove them when disconnected.
+        - Pass the signals in the ring to its handlers, spinning for a while before sleeping.
+        - Pause reading when asked to, so the ring fills up.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.ipc.SharedMemoryRing: The ring.
+        - pythoneda.shared.infrastructure.ipc.SharedMemorySignalListener: Creates subscriber buses.
+    """
+
+    # Signals processed before letting other tasks run.
+    _batch_size = 256
+
+    def __init__(
+        self,
+        bus_type: BusType = BusType.SESSION,
+        negotiate_unix_fd: bool = False,
+        ring_name: str = None,
+        ring_size: int = 8 * 1024 * 1024,
+        spin_iterations: int = 100,
+        poll_interval: float = 0.05,
+    ):
+        """
+        Creates a new SharedMemorySubscriberBus instance.
+        Parameters are named after the ones of dbus_next.aio.MessageBus.
+        :param bus_type: The bus type. Each one has its own ring.
+        :type bus_type: dbus_next.BusType
+        :param negotiate_unix_fd: Whether file descriptors can be passed. They cannot, over this transport.
+        :type negotiate_unix_fd: bool
+        :param ring_name: The name of the ring, followed by the bus type.
+        :type ring_name: str
+        :param ring_size: The size of the ring, in bytes.
+        :type ring_size: int
+        :param spin_iterations: The times to check the ring, yielding to other tasks, before sleeping.
+        :type spin_iterations: int
+        :param poll_interval: The maximum time to sleep, in seconds, in case a wakeup gets lost.
+        :type poll_interval: float
+        """
+        super().__init__()
+        if negotiate_unix_fd:
+            raise ValueError(
+                "File descriptors cannot be passed over shared memory buses"
+            )
+        self._bus_type = bus_type
+        self._name = SharedMemoryRing.default_name(bus_type)
+        if ring_name is not None:
+            self._name = f"{ring_name}-{bus_type.name.lower()}"
+        self._ring_size = ring_size
+        self._spin_iterations = spin_iterations
+        self._poll_interval = poll_interval
+        self._handlers = []
+        self._ring = None
+        self._wakeup_path = SharedMemoryRing.wakeup_path(self._name)
+        self._wakeup_fds = None
+        self._wakeup = None
+        self._reading = asyncio.Event()
+        self._reading.set()
+        self._task = None
+        self._disconnected = None
+        self._received = 0
+        self._serial = 0
+
+    @property
+    def ring_name(self) -> str:
+        """
+        Retrieves the name of the ring.
+        :return: Such name.
+        :rtype: str
+        """
+        return self._name
+
+    @property
+    def connected(self) -> bool:
+        """
+        Checks whether the bus is connected.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._task is not None
+
+    @property
+    def received(self) -> int:
+        """
+        Retrieves the number of signals read from the ring.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._received
+
+    async def connect(self) -> "SharedMemorySubscriberBus":
+        """
+        Creates the ring, replacing any left behind by a previous listener, and
+        starts reading from it.
+        :return: This bus.
+        :rtype: pythoneda.shared.infrastructure.ipc.SharedMemorySubscriberBus
+        """
+        if self._task is None:
+            loop = asyncio.get_running_loop()
+            if SharedMemoryRing.remove(self._name):
+                SharedMemorySubscriberBus.logger().info(
+                    f"Replacing the ring left behind in {self._name}"
+                )
+            try:
+                os.unlink(self._wakeup_path)
+            except FileNotFoundError:
+                pass
+            os.mkfifo(self._wakeup_path, 0o600)
+            reader = os.open(self._wakeup_path, os.O_RDONLY | os.O_NONBLOCK)
+            # Keeping a writer open ourselves avoids end-of-file wakeups when
+            # emitters come and go.
+            writer = os.open(self._wakeup_path, os.O_WRONLY | os.O_NONBLOCK)
+            self._wakeup_fds = (reader, writer)
+            self._wakeup = asyncio.Event()
+            loop.add_reader(reader, self._woken_up)
+            self._ring = SharedMemoryRing(self._name, self._ring_size, create=True)
+            self._disconnected = loop.create_future()
+            self._task = loop.create_task(self._run())
+            SharedMemorySubscriberBus.logger().debug(
+                f"Reading signals from {self._name} ({self._ring.capacity} bytes)"
+            )
+        return self
+
+    def disconnect(self):
+        """
+        Stops reading, and removes the ring.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            reader, writer = self._wakeup_fds
+            asyncio.get_running_loop().remove_reader(reader)
+            os.close(reader)
+            os.close(writer)
+            self._wakeup_fds = None
+            try:
+                os.unlink(self._wakeup_path)
+            except FileNotFoundError:
+                pass
+            self._ring.mark_closed()
+            self._ring.unlink()
+            self._ring.close()
+            self._ring = None
+            if not self._disconnected.done():
+                self._disconnected.set_result(None)
+
+    async def wait_for_disconnect(self):
+        """
+        Waits until the bus is disconnected.
+        """
+        if self._disconnected is not None:
+            await self._disconnected
+
+    def add_message_handler(self, handler: Callable[[Message], bool]):
+        """
+        Adds a handler for incoming messages.
+        :param handler: The handler.
+        :type handler: Callable[[dbus_next.Message], bool]
+        """
+        self._handlers.append(handler)
+
+    def remove_message_handler(self, handler: Callable[[Message], bool]):
+        """
+        Removes a handler for incoming messages.
+        :param handler: The handler.
+        :type handler: Callable[[dbus_next.Message], bool]
+        """
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    async def call(self, message: Message) -> Message:
+        """
+        Sends given method call. Only AddMatch and RemoveMatch on
+        org.freedesktop.DBus are supported, and they have no effect: the ring
+        carries every signal of its emitter, and the listener keeps the ones
+        it has routes for.
+        :param message: The method call.
+        :type message: dbus_next.Message
+        :return: The reply.
+        :rtype: dbus_next.Message
+        """
+        if self._task is None:
+            raise ConnectionError("Shared memory bus not connected")
+        if message.destination != "org.freedesktop.DBus" or message.member not in (
+            "AddMatch",
+            "RemoveMatch",
+        ):
+            raise NotImplementedError(
+                f"Shared memory buses do not support {message.destination} {message.member}"
+            )
+
+        if not message.serial:
+            self._serial += 1
+            message.serial = self._serial
+
+        return Message.new_method_return(message)
+
+    def pause_reading(self):
+        """
+        Stops reading signals, so the ring fills up, until resume_reading() is
+        called.
+        """
+        self._reading.clear()
+
+    def resume_reading(self):
+        """
+        Goes on reading signals.
+        """
+        self._reading.set()
+
+    def _woken_up(self):
+        """
+        Consumes the pending wakeups.
+        """
+        try:
+            while os.read(self._wakeup_fds[0], 4096):
+                pass
+        except BlockingIOError:
+            pass
+        self._wakeup.set()
+
+    async def _run(self):
+        """
+        Reads signals until disconnected.
+        """
+        idle = 0
+        while True:
+            await self._reading.wait()
+            count = 0
+            while count < self.__class__._batch_size and self._reading.is_set():
+                frame = self._ring.read()
+                if frame is None:
+                    break
+                count += 1
+                try:
+                    kind, message = IpcFrameCodec.decode_frame(frame)
+                    self._received += 1
+                    self._dispatch(message)
+                except (ValueError, TypeError) as err:
+                    SharedMemorySubscriberBus.logger().error(
+                        f"Invalid frame in {self._name}: {err}"
+                    )
+            if count > 0:
+                idle = 0
+                await asyncio.sleep(0)
+            elif idle < self._spin_iterations:
+                idle += 1
+                await asyncio.sleep(0)
+            else:
+                self._wakeup.clear()
+                self._ring.flag_waiting(True)
+                if self._ring.empty:
+                    try:
+                        await asyncio.wait_for(
+                            self._wakeup.wait(), self._poll_interval
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                self._ring.flag_waiting(False)
+                idle = 0
+
+    def _dispatch(self, message: Message):
+        """
+        Passes given message to the handlers, until one of them processes it.
+        :param message: The message.
+        :type message: dbus_next.Message
+        """
+        for handler in list(self._handlers):
+            try:
+                if handler(message):
+                    break
+            except Exception as err:
+                SharedMemorySubscriberBus.logger().error(
+                    f"Error in message handler for {message.member}: {err}"
+                )
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,342 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/ipc/unix_socket_hub.py
+
+This file defines the UnixSocketHub class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from dbus_next import Message
+from .ipc_frame_codec import IpcFrameCodec
+import os
+from pythoneda.shared import BaseObject
+from pythoneda.shared.infrastructure.dbus import DbusLoopbackDaemon
+import socket
+import stat
+import tempfile
+from .unix_socket_subscription import UnixSocketSubscription
+
+
+class UnixSocketHub(BaseObject):
+    """
+    The Unix socket an emitter process publishes its signals on.
+
+    Class name: UnixSocketHub
+
+    Responsibilities:
+        - Listen on the socket, and accept listeners.
+        - Keep track of the match rules each listener asks for.
+        - Write each signal to every listener with a matching rule, encoding it once.
+        - Let emitters wait for listeners falling behind, for a while, sharing a single wait.
+        - Remove the socket once no bus uses it anymore.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.ipc.UnixSocketPublisherBus: Sends signals through it.
+        - pythoneda.shared.infrastructure.ipc.UnixSocketSubscription: The connected listeners.
+        - pythoneda.shared.infrastructure.dbus.DbusLoopbackDaemon: Matches the rules, as the d-bus daemon does.
+    """
+
+    _instances = {}
+
+    def __init__(
+        self,
+        path: str,
+        maxBuffer: int = 64 * 1024 * 1024,
+        drainTimeout: float = 1.0,
+    ):
+        """
+        Creates a new UnixSocketHub instance.
+        :param path: The path of the socket.
+        :type path: str
+        :param maxBuffer: The maximum number of bytes pending for a listener, before dropping its signals.
+        :type maxBuffer: int
+        :param drainTimeout: How long emitters wait for listeners falling behind, in seconds.
+        :type drainTimeout: float
+        """
+        super().__init__()
+        self._path = path
+        self._max_buffer = maxBuffer
+        self._drain_timeout = drainTimeout
+        self._daemon = DbusLoopbackDaemon()
+        self._subscriptions = {}
+        self._tasks = set()
+        self._draining = None
+        self._server = None
+        self._users = 0
+        self._closed = None
+        self._last_message = None
+        self._last_frame = None
+
+    @classmethod
+    def default_path(cls) -> str:
+        """
+        Retrieves the socket path used unless configured otherwise.
+        :return: Such path, in $XDG_RUNTIME_DIR if defined.
+        :rtype: str
+        """
+        return os.path.join(
+            os.environ.get("XDG_RUNTIME_DIR", tempfile.gettempdir()),
+            "pythoneda-events.sock",
+        )
+
+    @classmethod
+    def instance(cls, path: str) -> "UnixSocketHub":
+        """
+        Retrieves the hub for given socket path, in this process.
+        :param path: The path of the socket.
+        :type path: str
+        :return: Such hub.
+        :rtype: pythoneda.shared.infrastructure.ipc.UnixSocketHub
+        """
+        result = cls._instances.get(path, None)
+        if result is None:
+            result = cls(path)
+            cls._instances[path] = result
+
+        return result
+
+    @property
+    def path(self) -> str:
+        """
+        Retrieves the path of the socket.
+        :return: Such path.
+        :rtype: str
+        """
+        return self._path
+
+    @property
+    def listening(self) -> bool:
+        """
+        Checks whether the socket accepts listeners.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._server is not None
+
+    @property
+    def subscribers(self) -> int:
+        """
+        Retrieves the number of connected listeners.
+        :return: Such number.
+        :rtype: int
+        """
+        return len(self._subscriptions)
+
+    @property
+    def routed(self) -> int:
+        """
+        Retrieves the number of signals routed.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._daemon.routed
+
+    @property
+    def dropped(self) -> int:
+        """
+        Retrieves the number of signals dropped by slow listeners still connected.
+        :return: Such number.
+        :rtype: int
+        """
+        return sum(
+            subscription.dropped for subscription in self._subscriptions.values()
+        )
+
+    async def acquire(self):
+        """
+        Registers a new user of the hub, listening on the socket if it's the first one.
+        """
+        self._users += 1
+        if self._server is None:
+            try:
+                self._remove_stale_socket()
+                self._server = await asyncio.start_unix_server(
+                    self._serve, path=self._path
+                )
+            except BaseException:
+                self._users -= 1
+                raise
+            self._closed = asyncio.get_running_loop().create_future()
+            UnixSocketHub.logger().debug(f"Publishing signals on {self._path}")
+
+    def release(self):
+        """
+        Unregisters a user of the hub, closing the socket if it was the last one.
+        """
+        self._users = max(self._users - 1, 0)
+        if self._users == 0 and self._server is not None:
+            self._server.close()
+            self._server = None
+            for unique_name, subscription in list(self._subscriptions.items()):
+                subscription.close()
+                self._daemon.detach(unique_name)
+            self._subscriptions = {}
+            try:
+                os.unlink(self._path)
+            except FileNotFoundError:
+                pass
+            self.__class__._instances.pop(self._path, None)
+            if not self._closed.done():
+                self._closed.set_result(None)
+
+    async def wait_closed(self):
+        """
+        Waits until the socket is closed, and all listeners are disconnected.
+        """
+        if self._closed is not None:
+            await self._closed
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    @property
+    def congested(self) -> bool:
+        """
+        Checks whether any listener is falling behind.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return any(
+            subscription.congested for subscription in self._subscriptions.values()
+        )
+
+    async def drain(self):
+        """
+        Waits until no listener is falling behind, or the drain timeout expires.
+        In the latter case, signals are buffered until the maximum is reached.
+        """
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(
+                    *[
+                        subscription.drain()
+                        for subscription in self._subscriptions.values()
+                        if subscription.congested
+                    ]
+                ),
+                self._drain_timeout,
+            )
+        except asyncio.TimeoutError:
+            UnixSocketHub.logger().debug(
+                f"Listeners on {self._path} still behind after {self._drain_timeout}s"
+            )
+
+    def draining(self) -> asyncio.Future:
+        """
+        Retrieves a future done once drain() finishes. Emitters sending while
+        listeners fall behind share the same drain.
+        :return: Such future.
+        :rtype: asyncio.Future
+        """
+        if self._draining is None or self._draining.done():
+            self._draining = asyncio.get_running_loop().create_task(self.drain())
+        # Shielded, so that a cancelled emitter doesn't cancel it for the others.
+        return asyncio.shield(self._draining)
+
+    def route(self, message: Message):
+        """
+        Writes given signal to every listener with a matching rule.
+        :param message: The signal.
+        :type message: dbus_next.Message
+        """
+        self._daemon.route(message)
+        self._last_message = None
+        self._last_frame = None
+
+    def _frame_for(self, message: Message) -> bytes:
+        """
+        Encodes given signal, once for all listeners.
+        :param message: The signal.
+        :type message: dbus_next.Message
+        :return: The frame.
+        :rtype: bytes
+        """
+        if message is not self._last_message:
+            self._last_frame = IpcFrameCodec.encode_signal(message)
+            self._last_message = message
+        return self._last_frame
+
+    def _remove_stale_socket(self):
+        """
+        Removes the socket left behind by a previous emitter, if no one listens on it.
+        """
+        try:
+            mode = os.stat(self._path).st_mode
+        except FileNotFoundError:
+            mode = None
+        if mode is not None:
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(f"{self._path} exists and is not a socket")
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self._path)
+                raise OSError(f"Another emitter is publishing on {self._path}")
+            except ConnectionRefusedError:
+                os.unlink(self._path)
+            finally:
+                probe.close()
+        else:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serves a listener: applies its AddMatch / RemoveMatch requests until it
+        disconnects.
+        :param reader: The stream from the listener.
+        :type reader: asyncio.StreamReader
+        :param writer: The stream to the listener.
+        :type writer: asyncio.StreamWriter
+        """
+        subscription = UnixSocketSubscription(
+            writer, self._max_buffer, self._frame_for
+        )
+        unique_name = self._daemon.attach(subscription)
+        self._subscriptions[unique_name] = subscription
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            while True:
+                kind, (serial, rule) = await IpcFrameCodec.read(reader)
+                error = None
+                try:
+                    if kind == IpcFrameCodec.ADD_MATCH:
+                        self._daemon.add_match(unique_name, rule)
+                    elif kind == IpcFrameCodec.REMOVE_MATCH:
+                        self._daemon.remove_match(unique_name, rule)
+                    else:
+                        error = f"Unexpected frame kind: {kind}"
+                except ValueError as err:
+                    error = str(err)
+                writer.write(IpcFrameCodec.encode_reply(serial, error))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except (ValueError, TypeError) as err:
+            UnixSocketHub.logger().error(f"Dropping listener {unique_name}: {err}")
+        finally:
+            self._daemon.detach(unique_name)
+            self._subscriptions.pop(unique_name, None)
+            self._tasks.discard(task)
+            subscription.close()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
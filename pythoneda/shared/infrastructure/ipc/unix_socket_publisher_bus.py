@@ -0,0 +1,174 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/ipc/unix_socket_publisher_bus.py
+
+This file defines the UnixSocketPublisherBus class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from dbus_next import BusType, Message, MessageType
+from dbus_next.service import ServiceInterface
+from pythoneda.shared import BaseObject
+from .unix_socket_hub import UnixSocketHub
+
+
+class UnixSocketPublisherBus(BaseObject):
+    """
+    A replacement for dbus_next.aio.MessageBus, publishing signals on a Unix socket.
+
+    Class name: UnixSocketPublisherBus
+
+    Responsibilities:
+        - Offer the subset of the MessageBus API used by emitters.
+        - Send signals to the listeners connected to the socket, with no d-bus daemon in between.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.ipc.UnixSocketHub: Owns the socket.
+        - pythoneda.shared.infrastructure.ipc.UnixSocketSignalEmitter: Creates publisher buses.
+    """
+
+    def __init__(
+        self,
+        bus_type: BusType = BusType.SESSION,
+        negotiate_unix_fd: bool = False,
+        socket_path: str = None,
+    ):
+        """
+        Creates a new UnixSocketPublisherBus instance.
+        Parameters are named after the ones of dbus_next.aio.MessageBus.
+        :param bus_type: The bus type. Signals of all bus types share the socket.
+        :type bus_type: dbus_next.BusType
+        :param negotiate_unix_fd: Whether file descriptors can be passed. They cannot, over this transport.
+        :type negotiate_unix_fd: bool
+        :param socket_path: The path of the socket.
+        :type socket_path: str
+        """
+        super().__init__()
+        if negotiate_unix_fd:
+            raise ValueError("File descriptors cannot be passed over Unix socket buses")
+        self._bus_type = bus_type
+        self._hub = UnixSocketHub.instance(socket_path or UnixSocketHub.default_path())
+        self._connected = False
+        self._serial = 0
+
+    @property
+    def hub(self) -> UnixSocketHub:
+        """
+        Retrieves the hub owning the socket.
+        :return: Such hub.
+        :rtype: pythoneda.shared.infrastructure.ipc.UnixSocketHub
+        """
+        return self._hub
+
+    @property
+    def connected(self) -> bool:
+        """
+        Checks whether the bus is connected.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._connected
+
+    async def connect(self) -> "UnixSocketPublisherBus":
+        """
+        Starts publishing on the socket.
+        :return: This bus.
+        :rtype: pythoneda.shared.infrastructure.ipc.UnixSocketPublisherBus
+        """
+        if not self._connected:
+            await self._hub.acquire()
+            self._connected = True
+        return self
+
+    def disconnect(self):
+        """
+        Stops publishing on the socket.
+        """
+        if self._connected:
+            self._connected = False
+            self._hub.release()
+
+    async def wait_for_disconnect(self):
+        """
+        Waits until the socket is closed, or returns if other buses still use it.
+        """
+        if not self._hub.listening:
+            await self._hub.wait_closed()
+
+    def export(self, path: str, interface: ServiceInterface):
+        """
+        Exports given interface. There's nothing to export on a Unix socket.
+        :param path: The d-bus path.
+        :type path: str
+        :param interface: The interface.
+        :type interface: dbus_next.service.ServiceInterface
+        """
+        pass
+
+    def unexport(self, path: str, interface: ServiceInterface = None):
+        """
+        Unexports given interface. There's nothing to unexport on a Unix socket.
+        :param path: The d-bus path.
+        :type path: str
+        :param interface: The interface, or None for all of them.
+        :type interface: dbus_next.service.ServiceInterface
+        """
+        pass
+
+    def send(self, message: Message) -> asyncio.Future:
+        """
+        Writes given signal to the listeners interested in it.
+        :param message: The signal.
+        :type message: dbus_next.Message
+        :return: A future, done once the signal is queued for every listener, and none of them is falling behind.
+        :rtype: asyncio.Future
+        """
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        if not self._connected:
+            result.set_exception(ConnectionError("Unix socket bus not connected"))
+        elif message.unix_fds:
+            result.set_exception(
+                ValueError("File descriptors cannot be passed over Unix socket buses")
+            )
+        elif message.message_type != MessageType.SIGNAL:
+            result.set_exception(
+                NotImplementedError("Unix socket buses only send signals")
+            )
+        else:
+            self._serial += 1
+            message.serial = self._serial
+            try:
+                self._hub.route(message)
+                if self._hub.congested:
+                    result = self._hub.draining()
+                else:
+                    result.set_result(None)
+            except (TypeError, ValueError) as err:
+                result.set_exception(err)
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,73 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/ipc/unix_socket_signal_emitter.py
+
+This file defines the UnixSocketSignalEmitter class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import abc
+import functools
+from pythoneda.shared.infrastructure.dbus import DbusSignalEmitter
+from typing import Dict, Tuple
+from .unix_socket_publisher_bus import UnixSocketPublisherBus
+
+
+class UnixSocketSignalEmitter(DbusSignalEmitter, abc.ABC):
+    """
+    A DbusSignalEmitter publishing its signals on a Unix socket, instead of d-bus.
+
+    Class name: UnixSocketSignalEmitter
+
+    Responsibilities:
+        - Send the same signals as DbusSignalEmitter, to the listeners connected to the socket.
+        - Accept the same configuration, plus the socket path.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.ipc.UnixSocketPublisherBus: Publishes the signals.
+        - pythoneda.shared.infrastructure.dbus.DbusEvent: Encodes the events, as usual.
+    """
+
+    @classmethod
+    def enable(cls, *args: Tuple, **kwargs: Dict):
+        """
+        Enables this port.
+        :param args: Additional positional arguments.
+        :type args: Tuple
+        :param kwargs: Additional keyword arguments. Besides the ones of DbusSignalEmitter, "socket_path" sets the socket to publish on.
+        :type kwargs: Dict
+        """
+        if kwargs.get("bus_factory", None) is None:
+            kwargs["bus_factory"] = functools.partial(
+                UnixSocketPublisherBus, socket_path=kwargs.get("socket_path", None)
+            )
+        if kwargs.get("memfd_threshold", None) is not None:
+            UnixSocketSignalEmitter.logger().warning(
+                "File descriptors cannot be passed over Unix socket buses, sending payloads inline"
+            )
+            kwargs["memfd_threshold"] = None
+        cls._connection_pool = None
+        super().enable(*args, **kwargs)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
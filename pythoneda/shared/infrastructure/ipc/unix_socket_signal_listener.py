@@ -0,0 +1,75 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/ipc/unix_socket_signal_listener.py
+
+This file defines the UnixSocketSignalListener class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import abc
+import functools
+from pythoneda.shared.infrastructure.dbus import DbusSignalListener
+from typing import Dict, Tuple
+from .unix_socket_subscriber_bus import UnixSocketSubscriberBus
+
+
+class UnixSocketSignalListener(DbusSignalListener, abc.ABC):
+    """
+    A DbusSignalListener receiving its signals from a Unix socket, instead of d-bus.
+
+    Class name: UnixSocketSignalListener
+
+    Responsibilities:
+        - Receive the same signals as DbusSignalListener, from the emitter publishing on the socket.
+        - Accept the same configuration, plus the socket path.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.ipc.UnixSocketSubscriberBus: Receives the signals.
+        - pythoneda.shared.infrastructure.dbus.DbusEvent: Decodes the events, as usual.
+    """
+
+    @classmethod
+    def enable(cls, *args: Tuple, **kwargs: Dict):
+        """
+        Enables this port.
+        :param args: Additional positional arguments.
+        :type args: Tuple
+        :param kwargs: Additional keyword arguments. Besides the ones of DbusSignalListener, "socket_path" sets the socket of the emitter, and "reconnect_interval" how long to wait for it, in seconds.
+        :type kwargs: Dict
+        """
+        if kwargs.get("bus_factory", None) is None:
+            kwargs["bus_factory"] = functools.partial(
+                UnixSocketSubscriberBus,
+                socket_path=kwargs.get("socket_path", None),
+                reconnect_interval=kwargs.get("reconnect_interval", 1.0),
+            )
+        if kwargs.get("unix_fds", False):
+            UnixSocketSignalListener.logger().warning(
+                "File descriptors cannot be passed over Unix socket buses, ignoring unix_fds"
+            )
+            kwargs["unix_fds"] = False
+        cls._connection_pool = None
+        super().enable(*args, **kwargs)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,315 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/ipc/unix_socket_subscriber_bus.py
+
+This file defines the UnixSocketSubscriberBus class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from dbus_next import BusType, Message
+from .ipc_frame_codec import IpcFrameCodec
+from pythoneda.shared import BaseObject
+from typing import Callable
+from .unix_socket_hub import UnixSocketHub
+
+
+class UnixSocketSubscriberBus(BaseObject):
+    """
+    A replacement for dbus_next.aio.MessageBus, receiving signals from a Unix socket.
+
+    Class name: UnixSocketSubscriberBus
+
+    Responsibilities:
+        - Offer the subset of the MessageBus API used by listeners.
+        - Send its match rules to the emitter, and pass the signals it gets to its handlers.
+        - Wait for the emitter if it's not running yet, and reconnect when it restarts, sending the rules again.
+        - Pause reading when asked to, so the emitter waits.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.ipc.UnixSocketHub: The other end of the socket.
+        - pythoneda.shared.infrastructure.ipc.UnixSocketSignalListener: Creates subscriber buses.
+    """
+
+    # The bytes read from the socket at once.
+    _read_size = 256 * 1024
+
+    def __init__(
+        self,
+        bus_type: BusType = BusType.SESSION,
+        negotiate_unix_fd: bool = False,
+        socket_path: str = None,
+        reconnect_interval: float = 1.0,
+    ):
+        """
+        Creates a new UnixSocketSubscriberBus instance.
+        Parameters are named after the ones of dbus_next.aio.MessageBus.
+        :param bus_type: The bus type. Signals of all bus types share the socket.
+        :type bus_type: dbus_next.BusType
+        :param negotiate_unix_fd: Whether file descriptors can be passed. They cannot, over this transport.
+        :type negotiate_unix_fd: bool
+        :param socket_path: The path of the socket.
+        :type socket_path: str
+        :param reconnect_interval: The seconds to wait before connecting again.
+        :type reconnect_interval: float
+        """
+        super().__init__()
+        if negotiate_unix_fd:
+            raise ValueError("File descriptors cannot be passed over Unix socket buses")
+        self._bus_type = bus_type
+        self._socket_path = socket_path or UnixSocketHub.default_path()
+        self._reconnect_interval = reconnect_interval
+        self._handlers = []
+        self._rules = []
+        self._pending = {}
+        self._serial = 0
+        self._writer = None
+        self._reading = asyncio.Event()
+        self._reading.set()
+        self._task = None
+        self._disconnected = None
+
+    @property
+    def socket_path(self) -> str:
+        """
+        Retrieves the path of the socket.
+        :return: Such path.
+        :rtype: str
+        """
+        return self._socket_path
+
+    @property
+    def connected(self) -> bool:
+        """
+        Checks whether the bus is in use. It might be waiting for the emitter.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._task is not None
+
+    @property
+    def attached(self) -> bool:
+        """
+        Checks whether the bus is actually connected to the emitter.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._writer is not None
+
+    async def connect(self) -> "UnixSocketSubscriberBus":
+        """
+        Starts connecting to the socket, in the background.
+        :return: This bus.
+        :rtype: pythoneda.shared.infrastructure.ipc.UnixSocketSubscriberBus
+        """
+        if self._task is None:
+            loop = asyncio.get_running_loop()
+            self._disconnected = loop.create_future()
+            self._task = loop.create_task(self._run())
+        return self
+
+    def disconnect(self):
+        """
+        Disconnects from the socket, and stops reconnecting.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self._detach()
+            if not self._disconnected.done():
+                self._disconnected.set_result(None)
+
+    async def wait_for_disconnect(self):
+        """
+        Waits until the bus is disconnected.
+        """
+        if self._disconnected is not None:
+            await self._disconnected
+
+    def add_message_handler(self, handler: Callable[[Message], bool]):
+        """
+        Adds a handler for incoming messages.
+        :param handler: The handler.
+        :type handler: Callable[[dbus_next.Message], bool]
+        """
+        self._handlers.append(handler)
+
+    def remove_message_handler(self, handler: Callable[[Message], bool]):
+        """
+        Removes a handler for incoming messages.
+        :param handler: The handler.
+        :type handler: Callable[[dbus_next.Message], bool]
+        """
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    async def call(self, message: Message) -> Message:
+        """
+        Sends given method call. Only AddMatch and RemoveMatch on
+        org.freedesktop.DBus are supported. If the emitter is not reachable yet,
+        the rule is sent once it is.
+        :param message: The method call.
+        :type message: dbus_next.Message
+        :return: The reply.
+        :rtype: dbus_next.Message
+        """
+        if self._task is None:
+            raise ConnectionError("Unix socket bus not connected")
+        if message.destination != "org.freedesktop.DBus" or message.member not in (
+            "AddMatch",
+            "RemoveMatch",
+        ):
+            raise NotImplementedError(
+                f"Unix socket buses do not support {message.destination} {message.member}"
+            )
+        if not message.serial:
+            self._serial += 1
+            message.serial = self._serial
+        rule = message.body[0]
+        if message.member == "AddMatch":
+            kind = IpcFrameCodec.ADD_MATCH
+            self._rules.append(rule)
+        else:
+            kind = IpcFrameCodec.REMOVE_MATCH
+            if rule in self._rules:
+                self._rules.remove(rule)
+        if self._writer is not None:
+            self._serial += 1
+            reply = asyncio.get_running_loop().create_future()
+            self._pending[self._serial] = reply
+            self._writer.write(IpcFrameCodec.encode_request(kind, self._serial, rule))
+            error = await reply
+            if error:
+                if kind == IpcFrameCodec.ADD_MATCH:
+                    self._rules.remove(rule)
+                raise ValueError(error)
+
+        return Message.new_method_return(message)
+
+    def pause_reading(self):
+        """
+        Stops reading signals, so the emitter waits once the socket buffers
+        are full, until resume_reading() is called.
+        """
+        self._reading.clear()
+
+    def resume_reading(self):
+        """
+        Goes on reading signals.
+        """
+        self._reading.set()
+
+    async def _run(self):
+        """
+        Connects to the socket, and reads signals, until disconnected.
+        """
+        announced = False
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self._socket_path)
+            except (FileNotFoundError, ConnectionError) as err:
+                if not announced:
+                    UnixSocketSubscriberBus.logger().info(
+                        f"Waiting for an emitter on {self._socket_path}: {err}"
+                    )
+                    announced = True
+                await asyncio.sleep(self._reconnect_interval)
+                continue
+            announced = False
+            for rule in self._rules:
+                writer.write(
+                    IpcFrameCodec.encode_request(IpcFrameCodec.ADD_MATCH, 0, rule)
+                )
+            self._writer = writer
+            UnixSocketSubscriberBus.logger().debug(
+                f"Receiving signals from {self._socket_path}"
+            )
+            try:
+                await self._read(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                UnixSocketSubscriberBus.logger().info(
+                    f"Emitter on {self._socket_path} went away, reconnecting"
+                )
+            except (ValueError, TypeError) as err:
+                UnixSocketSubscriberBus.logger().error(
+                    f"Invalid frame from {self._socket_path}, reconnecting: {err}"
+                )
+            finally:
+                self._detach()
+            await asyncio.sleep(self._reconnect_interval)
+
+    async def _read(self, reader: asyncio.StreamReader):
+        """
+        Reads frames until the connection is closed, as many as available at once.
+        :param reader: The stream.
+        :type reader: asyncio.StreamReader
+        """
+        buffer = bytearray()
+        while True:
+            await self._reading.wait()
+            data = await reader.read(self.__class__._read_size)
+            if not data:
+                raise asyncio.IncompleteReadError(bytes(buffer), None)
+            buffer += data
+            for frame in IpcFrameCodec.split(buffer):
+                # Frames already read wait as well, while paused.
+                await self._reading.wait()
+                kind, value = IpcFrameCodec.decode(frame)
+                if kind == IpcFrameCodec.SIGNAL:
+                    self._dispatch(value)
+                elif kind == IpcFrameCodec.REPLY:
+                    serial, error = value
+                    reply = self._pending.pop(serial, None)
+                    if reply is not None and not reply.done():
+                        reply.set_result(error)
+
+    def _detach(self):
+        """
+        Closes the current connection, if any. The requests waiting for a reply
+        are considered done, since their rules get sent again on reconnection.
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for reply in self._pending.values():
+            if not reply.done():
+                reply.set_result(None)
+        self._pending = {}
+
+    def _dispatch(self, message: Message):
+        """
+        Passes given message to the handlers, until one of them processes it.
+        :param message: The message.
+        :type message: dbus_next.Message
+        """
+        for handler in list(self._handlers):
+            try:
+                if handler(message):
+                    break
+            except Exception as err:
+                UnixSocketSubscriberBus.logger().error(
+                    f"Error in message handler for {message.member}: {err}"
+                )
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
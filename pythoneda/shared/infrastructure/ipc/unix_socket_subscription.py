@@ -0,0 +1,170 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/infrastructure/ipc/unix_socket_subscription.py
+
+This file defines the UnixSocketSubscription class.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from dbus_next import Message
+from .ipc_frame_codec import IpcFrameCodec
+from pythoneda.shared import BaseObject
+from typing import Callable
+
+
+class UnixSocketSubscription(BaseObject):
+    """
+    A listener connected to a UnixSocketHub, as seen from the emitter process.
+
+    Class name: UnixSocketSubscription
+
+    Responsibilities:
+        - Write the signals routed to the listener, as frames, batching the ones
+          routed in the same loop iteration.
+        - Tell when the listener falls behind, so that the emitter slows down.
+        - Drop signals instead of buffering without limit, if the listener cannot keep up.
+
+    Collaborators:
+        - pythoneda.shared.infrastructure.ipc.UnixSocketHub: Creates subscriptions.
+        - pythoneda.shared.infrastructure.dbus.DbusLoopbackDaemon: Routes signals to them.
+    """
+
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        maxBuffer: int,
+        encoder: Callable[[Message], bytes] = IpcFrameCodec.encode_signal,
+    ):
+        """
+        Creates a new UnixSocketSubscription instance.
+        :param writer: The stream to the listener.
+        :type writer: asyncio.StreamWriter
+        :param maxBuffer: The maximum number of bytes pending to be written, before dropping signals.
+        :type maxBuffer: int
+        :param encoder: The function to build the frame of a signal.
+        :type encoder: Callable[[dbus_next.Message], bytes]
+        """
+        super().__init__()
+        self._writer = writer
+        self._encoder = encoder
+        self._max_buffer = maxBuffer
+        self._batch = bytearray()
+        self._delivered = 0
+        self._dropped = 0
+
+    @property
+    def writer(self) -> asyncio.StreamWriter:
+        """
+        Retrieves the stream to the listener.
+        :return: Such stream.
+        :rtype: asyncio.StreamWriter
+        """
+        return self._writer
+
+    @property
+    def congested(self) -> bool:
+        """
+        Checks whether more data is pending than the transport is willing to buffer.
+        :return: True in such case.
+        :rtype: bool
+        """
+        transport = self._writer.transport
+        return (
+            not self._writer.is_closing()
+            and transport.get_write_buffer_size() + len(self._batch)
+            > transport.get_write_buffer_limits()[1]
+        )
+
+    @property
+    def delivered(self) -> int:
+        """
+        Retrieves the number of signals written.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._delivered
+
+    @property
+    def dropped(self) -> int:
+        """
+        Retrieves the number of signals dropped because the listener was too slow.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._dropped
+
+    def deliver(self, message: Message):
+        """
+        Queues given signal, unless too much data is pending already. Signals
+        are written in batches, once per loop iteration.
+        :param message: The signal.
+        :type message: dbus_next.Message
+        """
+        if self._writer.is_closing():
+            pass
+        elif (
+            self._writer.transport.get_write_buffer_size() + len(self._batch)
+            > self._max_buffer
+        ):
+            self._dropped += 1
+            if self._dropped == 1 or self._dropped % 1000 == 0:
+                UnixSocketSubscription.logger().warning(
+                    f"Listener too slow, {self._dropped} signal(s) dropped"
+                )
+        else:
+            if not self._batch:
+                asyncio.get_running_loop().call_soon(self.flush)
+            self._batch += self._encoder(message)
+            self._delivered += 1
+
+    def flush(self):
+        """
+        Writes the signals queued so far, at once.
+        """
+        if self._batch:
+            if not self._writer.is_closing():
+                self._writer.write(bytes(self._batch))
+            self._batch.clear()
+
+    async def drain(self):
+        """
+        Waits until the pending data goes below the transport limits, or the
+        listener disconnects.
+        """
+        self.flush()
+        try:
+            await self._writer.drain()
+        except ConnectionError:
+            pass
+
+    def close(self):
+        """
+        Closes the stream to the listener.
+        """
+        self.flush()
+        if not self._writer.is_closing():
+            self._writer.close()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,85 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_dbus_dedup_window.py
+
+This file tests that DbusDedupWindow finds duplicates, and forgets keys when expired or full.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared.infrastructure.dbus import DbusDedupWindow
+from pythoneda.shared.infrastructure.dbus import dbus_dedup_window
+
+
+class Clock:
+    """
+    A clock moved by hand.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_repeated_keys_are_hits(monkeypatch):
+    monkeypatch.setattr(dbus_dedup_window, "time", Clock())
+    window = DbusDedupWindow(maxSize=10, ttl=5.0)
+
+    assert [window.seen(key) for key in ["a", "b", "a", "a", "c"]] == [
+        False,
+        False,
+        True,
+        True,
+        False,
+    ]
+    assert (window.hits, window.misses, window.size) == (2, 3, 3)
+
+
+def test_keys_are_forgotten_once_expired(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(dbus_dedup_window, "time", clock)
+    window = DbusDedupWindow(maxSize=10, ttl=5.0)
+    window.seen("a")
+    clock.now += 3.0
+    window.seen("b")
+
+    clock.now += 2.5
+
+    assert window.seen("a") is False
+    assert window.seen("b") is True
+    assert window.evicted == 0
+
+
+def test_the_oldest_keys_are_evicted_once_full(monkeypatch):
+    monkeypatch.setattr(dbus_dedup_window, "time", Clock())
+    window = DbusDedupWindow(maxSize=2, ttl=5.0)
+    for key in ["a", "b", "c"]:
+        window.seen(key)
+
+    assert (window.size, window.evicted) == (2, 1)
+    assert window.seen("c") is True
+    assert window.seen("a") is False
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,107 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_dbus_event_codec.py
+
+This file tests that DbusEventCodec round-trips events, including their ids.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared import Event
+from pythoneda.shared.infrastructure.dbus import DbusEventCodec
+from typing import List
+
+
+class SampleCommitted(Event):
+    """
+    The event used in the tests.
+    """
+
+    def __init__(
+        self,
+        commit: str,
+        count: int,
+        previousEventIds: List[str] = None,
+        reconstructedId: str = None,
+        reconstructedPreviousEventIds: List[str] = None,
+    ):
+        """
+        Creates a new SampleCommitted instance.
+        :param commit: A commit hash.
+        :type commit: str
+        :param count: A number.
+        :type count: int
+        :param previousEventIds: The ids of the events this one is a response to.
+        :type previousEventIds: List[str]
+        :param reconstructedId: The id of the event, when it's reconstructed.
+        :type reconstructedId: str
+        :param reconstructedPreviousEventIds: The previous ids, when it's reconstructed.
+        :type reconstructedPreviousEventIds: List[str]
+        """
+        super().__init__(
+            previousEventIds, reconstructedId, reconstructedPreviousEventIds
+        )
+        self._commit = commit
+        self._count = count
+
+    @property
+    def commit(self) -> str:
+        """
+        Retrieves the commit hash.
+        :return: Such hash.
+        :rtype: str
+        """
+        return self._commit
+
+    @property
+    def count(self) -> int:
+        """
+        Retrieves the number.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._count
+
+
+def test_text_round_trip_keeps_the_event_id():
+    codec = DbusEventCodec(SampleCommitted)
+    event = SampleCommitted("abc", 3, ["previous"])
+
+    decoded = codec.decode(codec.encode(event))
+
+    assert decoded.id == event.id
+    assert decoded.previous_event_ids == event.previous_event_ids
+    assert (decoded.commit, decoded.count) == ("abc", 3)
+
+
+def test_binary_round_trip_keeps_the_event_id():
+    codec = DbusEventCodec(SampleCommitted)
+    event = SampleCommitted("abc", 3, ["previous"])
+
+    invariants, decoded = codec.decode_binary(codec.encode_binary(event, "{}"))
+
+    assert invariants == "{}"
+    assert decoded.id == event.id
+    assert decoded.previous_event_ids == event.previous_event_ids
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
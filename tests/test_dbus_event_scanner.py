@@ -0,0 +1,106 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_dbus_event_scanner.py
+
+This file tests that DbusEventScanner finds d-bus events without importing them.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared.infrastructure.dbus import DbusEventScanner
+
+_EVENTS = """
+from pythoneda.shared import Event
+
+
+class ThingsFound(Event):
+    pass
+
+
+class ThingsLost(Event):
+    pass
+"""
+
+_ADAPTERS = """
+from .events import ThingsFound, ThingsLost
+from pythoneda.shared.infrastructure.dbus import DbusEvent
+
+
+class DbusBase(DbusEvent):
+    def __init__(self):
+        super().__init__("/pythoneda/base")
+
+    @classmethod
+    @property
+    def name(cls):
+        return "Pythoneda_Base"
+
+    @classmethod
+    def event_class(cls):
+        return ThingsFound
+
+
+class DbusFound(DbusBase):
+    pass
+
+
+class DbusThings(DbusBase):
+    def __init__(self):
+        super().__init__("/pythoneda/" + self.__class__.__name__.lower())
+
+    @classmethod
+    @property
+    def name(cls):
+        return "Pythoneda_" + cls.__name__[4:]
+
+    @classmethod
+    def event_class(cls):
+        return ThingsLost
+"""
+
+
+def scan(tmp_path):
+    package = tmp_path / "sample"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "events.py").write_text(_EVENTS)
+    (package / "adapters.py").write_text(_ADAPTERS)
+    references = DbusEventScanner("sample", [str(package)]).scan()
+    return {reference.class_name: reference for reference in references}
+
+
+def test_literals_are_inherited_from_bases(tmp_path):
+    found = scan(tmp_path)["DbusFound"]
+
+    assert found.event_class_name == "sample.events.ThingsFound"
+    assert (found.member, found.path) == ("Pythoneda_Base", "/pythoneda/base")
+
+
+def test_overridden_values_which_are_not_literals_are_left_unknown(tmp_path):
+    things = scan(tmp_path)["DbusThings"]
+
+    assert things.event_class_name == "sample.events.ThingsLost"
+    assert things.member is None
+    assert things.path is None
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,124 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_dbus_keyed_scheduler.py
+
+This file tests that DbusKeyedScheduler keeps the order of items per key.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.infrastructure.dbus import (
+    DbusKeyedScheduler,
+    DbusWorkQueue,
+    OverflowPolicy,
+)
+
+
+def test_items_with_the_same_key_run_in_order():
+    processed = []
+
+    async def handler(item):
+        await asyncio.sleep(0.001 * (5 - item))
+        processed.append(item)
+
+    async def main():
+        scheduler = DbusKeyedScheduler(handler)
+        await asyncio.gather(*[scheduler.run("key", item) for item in range(5)])
+
+    asyncio.run(main())
+
+    assert processed == [0, 1, 2, 3, 4]
+
+
+def test_items_with_different_keys_run_concurrently():
+    running = []
+    peak = []
+
+    async def handler(item):
+        running.append(item)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(item)
+
+    async def main():
+        scheduler = DbusKeyedScheduler(handler)
+        await asyncio.gather(*[scheduler.run(item, item) for item in range(5)])
+
+    asyncio.run(main())
+
+    assert max(peak) == 5
+
+
+def test_run_returns_once_its_item_is_processed():
+    processed = []
+
+    async def handler(item):
+        await asyncio.sleep(0.001)
+        processed.append(item)
+
+    async def main():
+        scheduler = DbusKeyedScheduler(handler)
+        first = asyncio.create_task(scheduler.run("key", 1))
+        await asyncio.sleep(0)
+        await scheduler.run("key", 2)
+        result = list(processed)
+        await first
+        return result, scheduler.pending, scheduler.active_keys
+
+    returned_after, pending, active_keys = asyncio.run(main())
+
+    assert returned_after == [1, 2]
+    assert (pending, active_keys) == (0, 0)
+
+
+def test_a_busy_key_keeps_the_worker_pool_bounded():
+    queue_size = 2
+    workers = 2
+    processed = []
+    outstanding = []
+
+    async def main():
+        scheduler = DbusKeyedScheduler(handler)
+        pool = DbusWorkQueue(
+            lambda item: scheduler.run("key", item),
+            maxSize=queue_size,
+            workers=workers,
+            overflowPolicy=OverflowPolicy.BLOCK,
+        )
+        for item in range(100):
+            await pool.put(item)
+            outstanding.append(item + 1 - len(processed))
+        await pool.join()
+        await pool.stop()
+
+    async def handler(item):
+        await asyncio.sleep(0.001)
+        processed.append(item)
+
+    asyncio.run(main())
+
+    assert processed == list(range(100))
+    assert max(outstanding) <= queue_size + workers
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
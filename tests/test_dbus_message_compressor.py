@@ -0,0 +1,97 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_dbus_message_compressor.py
+
+This file tests that DbusMessageCompressor round-trips large signals, and listeners only decompress when asked to.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from dbus_next import Message
+from pythoneda.shared.infrastructure.dbus import (
+    Compression,
+    DbusEvent,
+    DbusMessageCompressor,
+    DbusSignalListener,
+)
+import pytest
+
+
+class SampleListener(DbusSignalListener):
+    """
+    The listener used in the tests.
+    """
+
+    @classmethod
+    def event_packages(cls):
+        return []
+
+
+class DbusCompressing(DbusEvent):
+    """
+    A d-bus event compressing its large signals.
+    """
+
+    @classmethod
+    def compression(cls):
+        return Compression.ZLIB
+
+
+def signal(signature: str, body: list) -> Message:
+    return Message.new_signal(
+        "/pythoneda/compressed", "pythoneda.tests.Compressed", "Large", signature, body
+    )
+
+
+@pytest.mark.parametrize("algorithm", list(Compression))
+def test_large_bodies_round_trip(algorithm):
+    compressor = DbusMessageCompressor(threshold=1024)
+    original = signal("ss", ["a" * 4096, "b" * 4096])
+
+    compressed = compressor.compress(original, algorithm)
+
+    assert compressed.signature == "ay"
+    assert len(compressed.body[0]) < 1024
+    restored = compressor.decompress(compressed)
+    assert (restored.signature, restored.body) == ("ss", original.body)
+    assert (compressor.compressed, compressor.decompressed) == (1, 1)
+    assert compressor.ratio < 1.0
+
+
+def test_bodies_below_the_threshold_are_left_alone():
+    compressor = DbusMessageCompressor(threshold=1024)
+    original = signal("s", ["a" * 100])
+
+    assert compressor.compress(original, Compression.ZLIB) is original
+    assert compressor.compressed == 0
+
+
+def test_listeners_decompress_only_for_compressing_events():
+    compressor = DbusMessageCompressor(threshold=1024)
+    compressed = compressor.compress(signal("s", ["a" * 4096]), Compression.ZLIB)
+    listener = SampleListener()
+
+    assert listener.decompress(DbusEvent, compressed) is compressed
+    assert listener.decompress(DbusCompressing, compressed).body == ["a" * 4096]
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
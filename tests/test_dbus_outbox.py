@@ -0,0 +1,138 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_dbus_outbox.py
+
+This file tests that DbusOutbox stores signals durably, and replays them in order.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from dbus_next import BusType, Message, Variant
+from pythoneda.shared.infrastructure.dbus import DbusOutbox
+import pytest
+
+
+def signal(member: str, signature: str, body: list) -> Message:
+    return Message.new_signal(
+        "/pythoneda/outbox", "pythoneda.tests.Outbox", member, signature, body
+    )
+
+
+def test_rows_restore_every_kind_of_body():
+    message = signal(
+        "Everything",
+        "saya{sv}(ixd)ab",
+        [
+            "text",
+            b"\x00\xffbinary",
+            {"answer": Variant("i", 42), "blob": Variant("ay", b"\x01")},
+            [1, 2**40, 0.5],
+            [True, False],
+        ],
+    )
+
+    bus_type, restored = DbusOutbox.from_row(
+        DbusOutbox.to_row(BusType.SESSION, message)
+    )
+
+    assert bus_type == BusType.SESSION
+    assert (restored.path, restored.interface, restored.member) == (
+        message.path,
+        message.interface,
+        message.member,
+    )
+    assert restored.signature == message.signature
+    assert restored.body == message.body
+
+
+def test_signals_with_file_descriptors_are_rejected():
+    message = signal("Fd", "h", [0])
+    message.unix_fds = [0]
+
+    with pytest.raises(ValueError):
+        DbusOutbox.to_row(BusType.SESSION, message)
+
+
+def test_stored_signals_survive_a_restart_and_are_replayed_in_order(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    sent = []
+
+    async def send(busType, message):
+        sent.append((busType, message.body[0]))
+
+    async def store():
+        outbox = DbusOutbox(path, batchSize=2)
+        await asyncio.gather(
+            *[
+                outbox.append(BusType.SYSTEM, signal("Stored", "s", [str(index)]))
+                for index in range(5)
+            ]
+        )
+        await outbox.close()
+
+    async def replay():
+        outbox = DbusOutbox(path)
+        had_backlog = await outbox.has_backlog()
+        replayed = await outbox.replay(send)
+        await outbox.close()
+        return had_backlog, replayed, outbox.backlog
+
+    asyncio.run(store())
+    had_backlog, replayed, backlog = asyncio.run(replay())
+
+    assert had_backlog
+    assert replayed == 5
+    assert backlog == 0
+    assert sent == [(BusType.SYSTEM, str(index)) for index in range(5)]
+
+
+def test_replay_stops_at_the_first_failure_keeping_the_rest(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    sent = []
+
+    async def send(busType, message):
+        if message.body[0] == "2":
+            raise ConnectionError("bus unavailable")
+        sent.append(message.body[0])
+
+    async def main():
+        outbox = DbusOutbox(path)
+        await outbox.append_many(
+            [
+                (BusType.SESSION, signal("Stored", "s", [str(index)]))
+                for index in range(4)
+            ]
+        )
+        with pytest.raises(ConnectionError):
+            await outbox.replay(send)
+        backlog = outbox.backlog
+        await outbox.close()
+        return backlog
+
+    backlog = asyncio.run(main())
+
+    assert sent == ["0", "1"]
+    assert backlog == 2
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
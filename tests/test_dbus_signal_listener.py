@@ -0,0 +1,79 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_dbus_signal_listener.py
+
+This file tests how DbusSignalListener binds invariants to received events.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared import Event, PythonedaApplication
+from pythoneda.shared.infrastructure.dbus import DbusSignalListener
+from pythoneda.shared.infrastructure.dbus import dbus_signal_listener
+
+
+class SampleListener(DbusSignalListener):
+    """
+    The listener used in the tests.
+    """
+
+    @classmethod
+    def event_packages(cls):
+        return []
+
+
+class RecordingInvariants:
+    """
+    Records the bindings, instead of applying them.
+    """
+
+    def __init__(self):
+        self.bound = []
+        self.received = []
+
+    def bind(self, invariant, event):
+        self.bound.append((invariant, event))
+
+    def bind_all_from_json(self, invariantsJson):
+        self.received.append(invariantsJson)
+
+
+def test_every_event_gets_the_application_invariant(monkeypatch):
+    invariants = RecordingInvariants()
+    monkeypatch.setattr(
+        dbus_signal_listener.Invariants, "instance", classmethod(lambda cls: invariants)
+    )
+    listener = SampleListener()
+    app = PythonedaApplication()
+    plain, carrying = Event(), Event()
+
+    listener.bind_invariants(None, plain, app)
+    listener.bind_invariants("{}", carrying, app)
+
+    app_invariant = listener.app_invariant(app)
+    assert app_invariant.value is app
+    assert (app_invariant, plain) in invariants.bound
+    assert (app_invariant, carrying) in invariants.bound
+    assert invariants.received == ["{}"]
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
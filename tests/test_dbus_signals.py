@@ -0,0 +1,121 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_dbus_signals.py
+
+This file tests that DbusSignals reuses its discovery manifests only while they are valid.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import importlib
+import os
+from pythoneda.shared.infrastructure.dbus import DbusSignals
+
+_BASE = """
+class Base:
+    pass
+"""
+
+_THINGS = """
+from .base import Base
+
+
+class Thing(Base):
+    pass
+"""
+
+_MORE_THINGS = """
+from .base import Base
+
+
+class OtherThing(Base):
+    pass
+"""
+
+
+def package(tmp_path, monkeypatch, name: str) -> type:
+    folder = tmp_path / name
+    folder.mkdir()
+    (folder / "__init__.py").write_text("")
+    (folder / "base.py").write_text(_BASE)
+    (folder / "things.py").write_text(_THINGS)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return importlib.import_module(f"{name}.base").Base
+
+
+def names(classes: list) -> list:
+    return sorted(cls.__name__ for cls in classes)
+
+
+def test_a_valid_manifest_skips_the_scan(tmp_path, monkeypatch):
+    base = package(tmp_path, monkeypatch, "manifest_warm")
+    signals = DbusSignals("manifest_warm", str(tmp_path / "manifests"))
+    assert names(signals.find_subclasses_in_package("manifest_warm", base)) == [
+        "Thing"
+    ]
+
+    def scan_package(*args):
+        raise AssertionError("The package was scanned again")
+
+    monkeypatch.setattr(signals, "scan_package", scan_package)
+
+    assert names(signals.find_subclasses_in_package("manifest_warm", base)) == [
+        "Thing"
+    ]
+
+
+def test_adding_a_module_invalidates_the_manifest(tmp_path, monkeypatch):
+    base = package(tmp_path, monkeypatch, "manifest_changed")
+    signals = DbusSignals("manifest_changed", str(tmp_path / "manifests"))
+    signals.find_subclasses_in_package("manifest_changed", base)
+    folder = tmp_path / "manifest_changed"
+    (folder / "more_things.py").write_text(_MORE_THINGS)
+    # Make sure the folder looks modified, however coarse the clock is.
+    stat = os.stat(folder)
+    os.utime(folder, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert names(signals.find_subclasses_in_package("manifest_changed", base)) == [
+        "OtherThing",
+        "Thing",
+    ]
+
+
+def test_an_unwritable_manifest_folder_is_a_cache_miss(tmp_path, monkeypatch):
+    base = package(tmp_path, monkeypatch, "manifest_unwritable")
+    blocker = tmp_path / "not-a-folder"
+    blocker.write_text("")
+    signals = DbusSignals("manifest_unwritable", str(blocker / "manifests"))
+
+    for _ in range(2):
+        assert names(
+            signals.find_subclasses_in_package("manifest_unwritable", base)
+        ) == ["Thing"]
+
+
+def test_manifests_are_disabled_unless_a_folder_is_given(tmp_path, monkeypatch):
+    base = package(tmp_path, monkeypatch, "manifest_disabled")
+    signals = DbusSignals("manifest_disabled")
+
+    assert signals.manifest_path("manifest_disabled", base, [str(tmp_path)]) is None
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,114 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_dbus_work_queue.py
+
+This file tests the overflow policies of DbusWorkQueue, and listener backpressure.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.infrastructure.dbus import (
+    DbusSignalListener,
+    DbusWorkQueue,
+    OverflowPolicy,
+)
+import pytest
+
+
+def fill(policy: OverflowPolicy, items: int):
+    processed = []
+    release = None
+
+    async def handler(item):
+        await release.wait()
+        processed.append(item)
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        queue = DbusWorkQueue(handler, maxSize=2, workers=1, overflowPolicy=policy)
+        accepted = [queue.put_nowait(item) for item in range(items)]
+        await asyncio.sleep(0)
+        waiting = queue.waiting
+        release.set()
+        await queue.wait_for_room()
+        await queue.join()
+        await queue.stop()
+        return accepted, waiting, queue.dropped
+
+    accepted, waiting, dropped = asyncio.run(main())
+    return processed, accepted, waiting, dropped
+
+
+def test_block_never_drops_items_submitted_without_waiting():
+    processed, accepted, waiting, dropped = fill(OverflowPolicy.BLOCK, 10)
+
+    assert processed == list(range(10))
+    assert all(accepted)
+    assert waiting > 0
+    assert dropped == 0
+
+
+def test_drop_newest_rejects_items_once_full():
+    processed, accepted, _, dropped = fill(OverflowPolicy.DROP_NEWEST, 10)
+
+    assert processed == [0, 1]
+    assert accepted == [True] * 2 + [False] * 8
+    assert dropped == 8
+
+
+def test_drop_oldest_keeps_the_latest_items():
+    processed, _, _, dropped = fill(OverflowPolicy.DROP_OLDEST, 10)
+
+    assert processed == [8, 9]
+    assert dropped == 8
+
+
+class SampleListener(DbusSignalListener):
+    """
+    The listener used in the tests.
+    """
+
+    @classmethod
+    def event_packages(cls):
+        return []
+
+
+def test_enabling_without_workers_discards_the_previous_pool_settings():
+    SampleListener.enable(events=[], workers=2, queue_size=4)
+    assert SampleListener()._worker_pool_settings["maxSize"] == 4
+
+    SampleListener.enable(events=[])
+
+    assert SampleListener().worker_pool is None
+
+
+def test_buses_which_cannot_pause_reading_are_reported():
+    async def main():
+        SampleListener.reading_switch(object())
+
+    with pytest.raises(NotImplementedError):
+        asyncio.run(main())
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,82 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_ipc_frame_codec.py
+
+This file tests that IpcFrameCodec splits buffered frames, and decodes the signals in them.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from dbus_next import Message
+from pythoneda.shared.infrastructure.ipc import IpcFrameCodec
+import pytest
+
+
+def signal(member: str, signature: str, body: list) -> Message:
+    return Message.new_signal(
+        "/pythoneda/ipc", "pythoneda.tests.Ipc", member, signature, body
+    )
+
+
+def test_split_keeps_incomplete_frames_in_the_buffer():
+    first = IpcFrameCodec.encode_signal(signal("First", "s", ["one"]))
+    second = IpcFrameCodec.encode_signal(signal("Second", "ay", [b"\x00two"]))
+    buffer = bytearray(first + second[:7])
+
+    frames = IpcFrameCodec.split(buffer)
+
+    assert len(frames) == 1
+    assert buffer == second[:7]
+    buffer += second[7:]
+    frames += IpcFrameCodec.split(buffer)
+    assert buffer == b""
+    decoded = [IpcFrameCodec.decode(frame) for frame in frames]
+    assert [kind for kind, _ in decoded] == [IpcFrameCodec.SIGNAL] * 2
+    assert [message.member for _, message in decoded] == ["First", "Second"]
+    assert decoded[1][1].body == [b"\x00two"]
+
+
+def test_signals_sharing_a_header_get_their_own_body():
+    buffer = bytearray().join(
+        IpcFrameCodec.encode_signal(signal("Same", "sx", [f"text-{i}", i]))
+        for i in range(3)
+    )
+
+    messages = [IpcFrameCodec.decode(frame)[1] for frame in IpcFrameCodec.split(buffer)]
+
+    assert [message.body for message in messages] == [
+        ["text-0", 0],
+        ["text-1", 1],
+        ["text-2", 2],
+    ]
+    assert all(message.path == "/pythoneda/ipc" for message in messages)
+    assert all(message.signature == "sx" for message in messages)
+
+
+def test_split_rejects_frames_above_the_maximum_size():
+    buffer = bytearray(IpcFrameCodec._length.pack(IpcFrameCodec._max_frame_size + 1))
+
+    with pytest.raises(ValueError):
+        IpcFrameCodec.split(buffer)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
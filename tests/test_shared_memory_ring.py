@@ -0,0 +1,82 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_shared_memory_ring.py
+
+This file tests that SharedMemoryRing passes frames in order, wraps around, and reports when full.
+
+Copyright (C) 2023-today rydnr's pythoneda-shared-pythonlang/infrastructure
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+from pythoneda.shared.infrastructure.ipc import SharedMemoryRing
+import pytest
+
+
+@pytest.fixture
+def ring(request):
+    name = f"pythoneda-test-{os.getpid()}-{request.node.name}"
+    result = SharedMemoryRing(name, 64, create=True)
+    yield result
+    result.close()
+    result.unlink()
+
+
+def test_frames_are_read_in_order_by_the_consumer(ring):
+    producer = SharedMemoryRing(ring.name)
+    try:
+        assert producer.capacity == 64
+        assert producer.write(b"first")
+        assert producer.write(b"second")
+    finally:
+        producer.close()
+
+    assert [ring.read(), ring.read(), ring.read()] == [b"first", b"second", None]
+    assert ring.empty
+
+
+def test_a_full_ring_rejects_frames_until_read(ring):
+    frame = b"x" * 20
+    assert ring.write(frame)
+    assert ring.write(frame)
+    assert ring.write(frame) is False
+
+    assert ring.read() == frame
+    assert ring.write(frame)
+
+
+def test_frames_not_fitting_at_the_end_wrap_around(ring):
+    for frame in [b"a" * 20, b"b" * 20]:
+        ring.write(frame)
+    ring.read()
+    ring.read()
+
+    assert ring.write(b"c" * 20)
+    assert ring.read() == b"c" * 20
+    assert ring.empty
+
+
+def test_frames_above_half_the_capacity_are_rejected(ring):
+    with pytest.raises(ValueError):
+        ring.write(b"x" * (ring.max_frame_size + 1))
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End: